@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+AluBackend is the interface that the Calculator class forwards its operations
+to. A backend takes an operation type and two operands, each a big endian hex
+array of OPERAND_LENGTH bytes, and returns a hex array of the same length.
+The SpiBackend talks to the alchitry au+ fpga while the SoftwareBackend
+reproduces the fpga's ALU on the host with python ints.
+
+calculate is abstract, so a backend without it fails when it is made instead
+of on its first operation. calculateInt is the same operation with the 
+operands and the result as ints in the range [0, 2^1200), which is what 
+BigInt keeps. By default it converts to hex arrays and back, backends that 
+can do better override it.
+'''
+
+import abc
+
+
+class AluBackend(abc.ABC):
+
+    #each operand is 1200 bits which translates to 1200 / 8 = 150 bytes
+    OPERAND_LENGTH = 150
+    NUM_BITS_IN_BYTE = 8
+    NUM_BITS = OPERAND_LENGTH * NUM_BITS_IN_BYTE
+    
+    #opcode, two operands, the time to calculate and the result
+    FRAME_LENGTH = 1 + (4 * OPERAND_LENGTH)
+
+    LESS_THAN = 0
+    EQUALS = 1
+    ADDITION = 2
+    SUBTRACTION = 3
+    MULTIPLICATION = 4
+    DIVISION = 5
+
+    @abc.abstractmethod
+    def calculate(self, operationType, operand1, operand2):
+        pass
+    
+    '''
+    operations is a list of (operationType, operand1, operand2) tuples that
+    don't depend on each other. returns the results in the same order. 
+    Backends that can send several operations at once should override this.
+    '''
+    def calculateMany(self, operations):
+        results = []
+        for operationType, operand1, operand2 in operations:
+            results.append(self.calculate(operationType, operand1, operand2))
+        return results
+
+    def calculateInt(self, operationType, operand1, operand2):
+        result = self.calculate(operationType, self.getHexArr(operand1), self.getHexArr(operand2))
+        return int.from_bytes(bytes(result), "big")
+    
+    def calculateManyInt(self, operations):
+        hexOperations = []
+        for operationType, operand1, operand2 in operations:
+            hexOperations.append((operationType, self.getHexArr(operand1), self.getHexArr(operand2)))
+        return [int.from_bytes(bytes(result), "big") for result in self.calculateMany(hexOperations)]
+    
+    def getHexArr(self, value):
+        return list(value.to_bytes(self.OPERAND_LENGTH, "big"))
+
+    '''
+    backends that keep values on the device can use this to hold on to a 
+    constant so it doesn't have to be sent with every operation. returns the 
+    register index or None if the constant isn't kept
+    '''
+    def pinConstant(self, operand):
+        return None
+
+    #the number of bytes sent for one operation, for the statistics
+    def getFrameLength(self, operationType):
+        return self.FRAME_LENGTH
+    
+    '''
+    the CalculatorPool the operations end up on, or None. Backends that wrap
+    another backend return the pool of the one they wrap, so Calculator.map
+    still finds the pool under a cache, a recording or a hybrid backend
+    '''
+    def getPool(self):
+        return None
+
+    def close(self):
+        pass
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+AluCheck runs randomized operations through two ALU backends and reports every
+operation where their results differ. By default it checks the fpga over SPI
+against the SoftwareBackend.
+
+    $> python3 AluCheck.py 1000
+'''
+
+import random
+import sys
+import AluBackend
+import SoftwareBackend
+
+
+DEFAULT_NUM_TRIALS = 100
+
+OPERATION_TYPES = [AluBackend.AluBackend.LESS_THAN, 
+                   AluBackend.AluBackend.EQUALS,
+                   AluBackend.AluBackend.ADDITION,
+                   AluBackend.AluBackend.SUBTRACTION,
+                   AluBackend.AluBackend.MULTIPLICATION,
+                   AluBackend.AluBackend.DIVISION]
+
+
+'''
+returns a random operand as a hex array. The bit length is random as well so
+that small numbers, which are the common case in the simulation, are checked
+as often as full width ones.
+'''
+def getRandomOperand(rng):
+    numBits = rng.randint(0, AluBackend.AluBackend.NUM_BITS)
+    value = rng.getrandbits(numBits) if numBits > 0 else 0
+    return list(value.to_bytes(AluBackend.AluBackend.OPERAND_LENGTH, "big"))
+
+def getEdgeOperands():
+    length = AluBackend.AluBackend.OPERAND_LENGTH
+    zero = [0x00] * length
+    one = [0x00] * (length - 1) + [0x01]
+    allOnes = [0xff] * length
+    topBit = [0x80] + [0x00] * (length - 1)
+    return [zero, one, allOnes, topBit]
+
+def getOperations(numTrials, seed=None):
+    rng = random.Random(seed)
+    operations = []
+    
+    edgeOperands = getEdgeOperands()
+    for operationType in OPERATION_TYPES:
+        for operand1 in edgeOperands:
+            for operand2 in edgeOperands:
+                operations.append((operationType, operand1, operand2))
+    
+    for i in range(0, numTrials):
+        operationType = rng.choice(OPERATION_TYPES)
+        operations.append((operationType, getRandomOperand(rng), getRandomOperand(rng)))
+        
+    return operations
+
+'''
+returns a list of (operationType, operand1, operand2, result, expected) tuples
+for each operation where backend and reference disagree
+'''
+def compareBackends(backend, reference, operations):
+    mismatches = []
+    for operationType, operand1, operand2 in operations:
+        result = list(backend.calculate(operationType, operand1, operand2))
+        expected = list(reference.calculate(operationType, operand1, operand2))
+        if(result != expected):
+            mismatches.append((operationType, operand1, operand2, result, expected))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import SpiBackend
+    
+    numTrials = DEFAULT_NUM_TRIALS
+    if(len(sys.argv) > 1):
+        numTrials = int(sys.argv[1])
+        
+    operations = getOperations(numTrials)
+    backend = SpiBackend.SpiBackend()
+    mismatches = compareBackends(backend, SoftwareBackend.SoftwareBackend(), operations)
+    backend.close()
+    
+    for operationType, operand1, operand2, result, expected in mismatches:
+        print("mismatch for operation type " + str(operationType))
+        print(bytes(operand1).hex())
+        print(bytes(operand2).hex())
+        print("fpga:     " + bytes(result).hex())
+        print("software: " + bytes(expected).hex())
+        
+    print(str(len(mismatches)) + " mismatches out of " + str(len(operations)) + " operations")
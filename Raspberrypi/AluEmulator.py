@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+AluEmulator steps through spi_peripheral.luc and alu.luc one SPI bit at a 
+time, so the frame layouts the host uses can be checked against the state 
+machine on the fpga without the fpga. The multiplier and divider are modelled
+by how many iterations they get through in the 100MHz clock cycles of the 
+CALC state, so a frame that doesn't wait long enough for them gets the same
+unfinished result the fpga would send.
+
+It can be used as the device of a SpiBackend like the FakeSpiDevice. Run as a
+script, it sends random operations with the current and with the short frames
+and compares both against the SoftwareBackend.
+
+    $> python3 AluEmulator.py 200 7800000
+    
+With readsShortFrameFlag set to False it behaves like a bitstream built 
+before the short frames, whose alu.luc only reads the lowest 3 bits of the 
+opcode byte.
+'''
+
+import sys
+import AluBackend
+import AluCheck
+import FakeSpiDevice
+import SoftwareBackend
+import SpiBackend
+
+
+class AluEmulator(FakeSpiDevice.FakeSpiDevice):
+    
+    SYSTEM_CLOCK_HZ = 100000000
+    
+    #Operation in alu.luc
+    LT = 0
+    EQ = 1
+    MUL = 4
+    DIV = 5
+    SHORT_FRAME_BIT = 3
+    
+    #State in alu.luc
+    INIT = 0
+    OPER = 1
+    ARG1 = 7
+    ARG2 = 1207
+    CALC = 2407
+    RESP = 3599
+    BUFFER = 4807
+    DONE = 4831
+    RESP_SHORT = 2415
+    BUFFER_SHORT_COMPARE = 2431
+    DONE_SHORT_COMPARE = 2455
+    BUFFER_SHORT = 3623
+    DONE_SHORT = 3647
+    
+    #done_counter in spi_peripheral.luc
+    DONE_COUNTER_START = 4831
+    
+    #100MHz clock cycles between the first CALC bit and the divider or 
+    #multiplier finishing its first iteration, and the cycles per iteration
+    DIVIDER_START_CYCLES = 6
+    DIVIDER_ITERATION_CYCLES = 3
+    MULTIPLIER_START_CYCLES = 4
+    MULTIPLIER_ITERATION_CYCLES = 2
+    
+    NUM_BITS = AluBackend.AluBackend.NUM_BITS
+    MASK = (1 << AluBackend.AluBackend.NUM_BITS) - 1
+    BYTE_MASK = 0xff
+    
+    
+    def __init__(self, maxSpeedHz=SpiBackend.SpiBackend.MAX_SPEED_HZ, transferOverhead=0,
+                 simulateClock=False, readsShortFrameFlag=True):
+        FakeSpiDevice.FakeSpiDevice.__init__(self, transferOverhead, simulateClock)
+        self.maxSpeedHz = maxSpeedHz
+        self.readsShortFrameFlag = readsShortFrameFlag
+        
+        #alu.luc
+        self.state = self.INIT
+        self.counter = 0
+        self.op = 0
+        self.shortFrame = 0
+        self.arg1 = 0
+        self.arg2 = 0
+        self.argCounter = 0
+        self.result = 0
+        self.dataOut = 0
+        self.clearReg = 0
+        self.calcBits = 0
+        
+        #spi_peripheral.luc
+        self.data = 0
+        self.dataReady = 7
+        self.received = 0
+        self.doneCounter = self.DONE_COUNTER_START
+        
+    def isCompare(self):
+        return self.shortFrame and (self.op == self.LT or self.op == self.EQ)
+        
+    def getEnds(self):
+        if(self.shortFrame and self.op != self.MUL and self.op != self.DIV):
+            if(self.isCompare()):
+                return self.RESP_SHORT, self.BUFFER_SHORT_COMPARE, self.DONE_SHORT_COMPARE
+            return self.RESP_SHORT, self.BUFFER_SHORT, self.DONE_SHORT
+        return self.RESP, self.BUFFER, self.DONE
+    
+    #the number of iterations the multiplier or divider has finished
+    def getIterations(self, startCycles, iterationCycles, maxIterations):
+        cycles = (self.calcBits - 1) * self.SYSTEM_CLOCK_HZ / self.maxSpeedHz
+        iterations = int((cycles - startCycles) // iterationCycles) + 1
+        return max(0, min(iterations, maxIterations))
+        
+    def getCalcResult(self):
+        if(self.op == self.MUL):
+            iterations = self.getIterations(self.MULTIPLIER_START_CYCLES, 
+                            self.MULTIPLIER_ITERATION_CYCLES, self.NUM_BITS)
+            multiplierBits = self.arg2 & ((1 << iterations) - 1)
+            return (self.arg1 * multiplierBits) & self.MASK
+        if(self.op == self.DIV):
+            iterations = self.getIterations(self.DIVIDER_START_CYCLES, 
+                            self.DIVIDER_ITERATION_CYCLES, self.NUM_BITS + 1)
+            if(iterations == self.NUM_BITS + 1):
+                return self.alu.divide(self.arg1, self.arg2)
+            return self.alu.restoringDivide(self.arg1, self.arg2, iterations)
+        return self.alu.calculateInt(self.op, self.arg1, self.arg2)
+        
+    #one rising edge of alu_clk
+    def clockAlu(self, dataIn):
+        if(self.clearReg):
+            self.state = self.INIT
+            self.clearReg = 0
+            return
+        
+        calcEnd, respEnd, doneEnd = self.getEnds()
+        counter = self.counter
+        self.counter = counter + 1
+        
+        if(self.state == self.INIT):
+            self.counter = 1
+            self.argCounter = 0
+            self.arg1 = 0
+            self.arg2 = 0
+            self.op = 0
+            self.shortFrame = 0
+            self.state = self.OPER
+            
+        elif(self.state == self.OPER):
+            self.op = dataIn & 0x07
+            if(self.readsShortFrameFlag):
+                self.shortFrame = (dataIn >> self.SHORT_FRAME_BIT) & 1
+            if(counter == self.ARG1):
+                self.state = self.ARG1
+                self.argCounter = 2
+                
+        elif(self.state == self.ARG1 or self.state == self.ARG2):
+            if(self.argCounter == 7):
+                if(self.state == self.ARG1):
+                    self.arg1 = ((self.arg1 << 8) | dataIn) & self.MASK
+                else:
+                    self.arg2 = ((self.arg2 << 8) | dataIn) & self.MASK
+                self.argCounter = 0
+            else:
+                self.argCounter += 1
+                
+            if(self.state == self.ARG1 and counter == self.ARG2):
+                self.state = self.ARG2
+            elif(self.state == self.ARG2 and counter == self.CALC):
+                self.state = self.CALC
+                self.calcBits = 0
+                
+        elif(self.state == self.CALC):
+            self.argCounter = 0
+            self.calcBits += 1
+            
+            #result is overwritten on every CALC bit, only the last one is 
+            #worked out
+            if(counter == calcEnd):
+                self.result = self.getCalcResult()
+                self.state = self.RESP
+                
+        elif(self.state == self.RESP):
+            if(self.isCompare()):
+                self.dataOut = self.result & self.BYTE_MASK
+            else:
+                self.dataOut = self.result >> (self.NUM_BITS - 8)
+            if(self.argCounter == 7):
+                self.result = (self.result << 8) & self.MASK
+                self.argCounter = 0
+            else:
+                self.argCounter += 1
+            if(counter == respEnd):
+                self.state = self.BUFFER
+                
+        elif(self.state == self.BUFFER):
+            self.dataOut = 0
+            if(counter == doneEnd):
+                self.state = self.INIT
+    
+    '''
+    sends frame with the chip select held low the whole time, mode 3 so the 
+    fpga writes a bit on the falling edge and both sides read on the rising
+    edge
+    '''
+    def getResponse(self, frame):
+        #chip select is high before the frame
+        self.doneCounter = self.DONE_COUNTER_START
+        self.dataReady = 7
+        self.data = self.dataOut
+        
+        response = []
+        for byte in frame:
+            receivedByte = 0
+            for bit in range(7, -1, -1):
+                #falling edge, the peripheral writes sdo
+                sdo = (self.data >> self.dataReady) & 1
+                
+                #rising edge, both sides read
+                receivedByte = (receivedByte << 1) | sdo
+                start = (self.doneCounter == self.DONE_COUNTER_START)
+                
+                mosi = (byte >> bit) & 1
+                self.received = (self.received & ~(1 << self.dataReady)) | (mosi << self.dataReady)
+                if(self.dataReady == 0):
+                    self.data = self.dataOut
+                self.doneCounter -= 1
+                self.dataReady = (self.dataReady - 1) & 0x07
+                
+                #start stays high until the next bit, so the alu sees it 
+                #before and after its clock edge
+                if(start):
+                    self.clearReg = 1
+                self.clockAlu(self.received)
+                if(start):
+                    self.clearReg = 1
+                    
+            response.append(receivedByte)
+        return response
+    
+    
+'''
+returns the mismatches of the current frames and of the short frames against
+the SoftwareBackend, and the bytes each sent
+'''
+def checkFrames(operations, maxSpeedHz):
+    reference = SoftwareBackend.SoftwareBackend()
+    results = []
+    for useShortFrames in [False, True]:
+        emulator = AluEmulator(maxSpeedHz)
+        backend = SpiBackend.SpiBackend(spi=emulator, useShortFrames=useShortFrames)
+        emulator.setMaxSpeedHz(maxSpeedHz)
+        mismatches = AluCheck.compareBackends(backend, reference, operations)
+        results.append((mismatches, emulator.numBytes))
+    return results
+
+
+if __name__ == "__main__":
+    numOperations = 100
+    maxSpeedHz = SpiBackend.SpiBackend.MAX_SPEED_HZ
+    if(len(sys.argv) > 1):
+        numOperations = int(sys.argv[1])
+    if(len(sys.argv) > 2):
+        maxSpeedHz = int(sys.argv[2])
+        
+    operations = AluCheck.getOperations(numOperations)
+    results = checkFrames(operations, maxSpeedHz)
+    
+    for name, (mismatches, numBytes) in zip(["current frames", "short frames"], results):
+        print(name + ": " + str(len(mismatches)) + " mismatches out of " + 
+              str(len(operations)) + " operations, " + str(numBytes) + " bytes")
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+AluStats counts the operations the Calculator sends to the ALU: how many of 
+each opcode, how many bytes they took on SPI and how long they took, in 
+histograms with power of two buckets in microseconds. Everything is also 
+counted per calling function, which is the innermost BpnMath or LightCharge
+function on the stack, e.g. "BpnMath.sqrt", so it shows where a step spends 
+its operations.
+
+getSnapshot returns the counters while the simulation runs and dump writes 
+them to a json file. Setting LIGHT_CHARGE_STATS to a file path turns the 
+statistics on and dumps them when the program exits, see Calculator.
+    $> LIGHT_CHARGE_STATS=/home/silvermagnet2/light/aluStats.json python3 LightChargeSimulator.py
+'''
+
+import json
+import os
+import sys
+import threading
+import time
+
+
+class AluStats:
+    
+    OPERATION_NAMES = ["LESS_THAN", "EQUALS", "ADDITION", "SUBTRACTION",
+                       "MULTIPLICATION", "DIVISION"]
+    
+    #operations are attributed to the innermost function from these files
+    ATTRIBUTED_FILES = ["BpnMath.py", "LightCharge.py"]
+    OTHER_CALLER_STR = "other"
+    
+    MICROSECONDS_IN_SECOND = 1000000
+    
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+        
+    def reset(self):
+        with self.lock:
+            self.startTime = time.perf_counter()
+            self.total = self.getCounter()
+            self.callers = {}
+        
+    def getCounter(self):
+        counter = {}
+        for name in self.OPERATION_NAMES:
+            counter[name] = {"count": 0, "bytes": 0, "seconds": 0.0, "histogram": {}}
+        return counter
+    
+    '''
+    returns "Module.function" for the innermost BpnMath or LightCharge 
+    function that called the calculator
+    '''
+    def getCaller(self):
+        frame = sys._getframe(1)
+        while(frame is not None):
+            fileName = os.path.basename(frame.f_code.co_filename)
+            if(fileName in self.ATTRIBUTED_FILES):
+                return fileName[:-len(".py")] + "." + frame.f_code.co_name
+            frame = frame.f_back
+        return self.OTHER_CALLER_STR
+    
+    #the histogram bucket is the smallest power of two microseconds that is
+    #larger than the latency
+    def getBucket(self, seconds):
+        microseconds = int(seconds * self.MICROSECONDS_IN_SECOND)
+        return "<" + str(1 << microseconds.bit_length()) + "us"
+    
+    def addToCounter(self, counter, name, numBytes, seconds, bucket):
+        opCounter = counter[name]
+        opCounter["count"] += 1
+        opCounter["bytes"] += numBytes
+        opCounter["seconds"] += seconds
+        opCounter["histogram"][bucket] = opCounter["histogram"].get(bucket, 0) + 1
+        
+    def record(self, operationType, caller, numBytes, seconds):
+        name = self.OPERATION_NAMES[operationType]
+        bucket = self.getBucket(seconds)
+        with self.lock:
+            if(caller not in self.callers):
+                self.callers[caller] = self.getCounter()
+            self.addToCounter(self.total, name, numBytes, seconds, bucket)
+            self.addToCounter(self.callers[caller], name, numBytes, seconds, bucket)
+            
+    #the number of operations so far, either of one type or of all of them
+    def getCount(self, operationType=None):
+        with self.lock:
+            if(operationType is not None):
+                return self.total[self.OPERATION_NAMES[operationType]]["count"]
+            return sum([opCounter["count"] for opCounter in self.total.values()])
+    
+    #a copy of all of the counters that can be changed or dumped as json
+    def getSnapshot(self):
+        with self.lock:
+            return json.loads(json.dumps({
+                "seconds": time.perf_counter() - self.startTime,
+                "total": self.total,
+                "callers": self.callers}))
+            
+    def dump(self, path):
+        with open(path, "w") as outfile:
+            json.dump(self.getSnapshot(), outfile, indent=1)
+            
+    def printSummary(self):
+        snapshot = self.getSnapshot()
+        for name, opCounter in snapshot["total"].items():
+            print(name + ": " + str(opCounter["count"]) + " operations, " + 
+                  str(opCounter["bytes"]) + " bytes, " + f'{opCounter["seconds"]:.3f}' + "s")
+        callers = sorted(snapshot["callers"].items(), key=lambda item: -sum([opCounter["count"] for opCounter in item[1].values()]))
+        for caller, counter in callers:
+            print("    " + caller + ": " + str(sum([opCounter["count"] for opCounter in counter.values()])) + " operations")
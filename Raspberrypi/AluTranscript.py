@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+AluTranscript reads and writes transcripts of the operations a run sends to 
+the ALU. A transcript is a binary file that starts with the header "ALUT" and
+a version byte, followed by one record per operation:
+
+    opcode                            1 byte
+    operand1, operand2 and result     each a length byte and the operand's 
+                                      bytes without the leading zeros
+
+Most operands in the simulation are much smaller than 1200 bits, so this is a
+lot smaller than the 450 bytes an operation takes on SPI. 
+
+Transcripts are written by a RecordingBackend and played back by a 
+ReplayBackend. Two transcripts can be compared operation by operation to find
+where a change to BigInt, BigPreciseNum or BpnMath starts sending different 
+operations.
+
+    $> python3 AluTranscript.py info run.alut
+    $> python3 AluTranscript.py diff before.alut after.alut
+'''
+
+import sys
+import AluBackend
+import AluStats
+
+
+class TranscriptWriter:
+    
+    HEADER = b"ALUT"
+    VERSION = 1
+    
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(self.HEADER + bytes([self.VERSION]))
+        self.numOperations = 0
+        
+    def encode(self, operandBytes):
+        return bytes([len(operandBytes)]) + operandBytes
+        
+    def write(self, operationType, operand1, operand2, result):
+        self.writeStripped(operationType, getStripped(operand1), getStripped(operand2), getStripped(result))
+        
+    #the same as write for the int operands and result of calculateInt
+    def writeInt(self, operationType, operand1, operand2, result):
+        self.writeStripped(operationType, getStrippedInt(operand1), getStrippedInt(operand2), getStrippedInt(result))
+        
+    def writeStripped(self, operationType, operand1, operand2, result):
+        self.file.write(bytes([operationType]) + self.encode(operand1) + 
+                        self.encode(operand2) + self.encode(result))
+        self.numOperations += 1
+        
+    def close(self):
+        if(self.file is not None):
+            self.file.close()
+            self.file = None
+            
+            
+'''
+returns the records of the transcript at path as a list of (operationType, 
+operand1, operand2, result) tuples. The operands and the result are bytes 
+without the leading zeros, see getOperand for the full hex array.
+'''
+def readTranscript(path):
+    with open(path, "rb") as infile:
+        data = infile.read()
+        
+    headerLength = len(TranscriptWriter.HEADER) + 1
+    if(data[:len(TranscriptWriter.HEADER)] != TranscriptWriter.HEADER):
+        raise Exception(path + " is not an alu transcript")
+    if(data[len(TranscriptWriter.HEADER)] != TranscriptWriter.VERSION):
+        raise Exception("unsupported alu transcript version " + str(data[len(TranscriptWriter.HEADER)]))
+        
+    records = []
+    i = headerLength
+    while(i < len(data)):
+        operationType = data[i]
+        i += 1
+        fields = []
+        for j in range(0, 3):
+            length = data[i]
+            fields.append(data[i + 1:i + 1 + length])
+            i += 1 + length
+        records.append((operationType, fields[0], fields[1], fields[2]))
+    return records
+
+#the stripped bytes of an operand, for comparing it with a record
+def getStripped(operand):
+    return bytes(operand).lstrip(b"\x00")
+
+#the stripped bytes of an int operand, without making the hex array first
+def getStrippedInt(operand):
+    return operand.to_bytes((operand.bit_length() + 7) // 8, "big")
+
+#the full hex array for stripped bytes from a record
+def getOperand(strippedBytes):
+    return list(strippedBytes.rjust(AluBackend.AluBackend.OPERAND_LENGTH, b"\x00"))
+
+#the int for stripped bytes from a record
+def getOperandInt(strippedBytes):
+    return int.from_bytes(strippedBytes, "big")
+
+'''
+returns the indices of the operations where the two transcripts differ, in
+the opcode, the operands or the result. If one transcript is longer, the 
+extra operations count as differences as well.
+'''
+def diffTranscripts(records1, records2):
+    differences = []
+    for i in range(0, min(len(records1), len(records2))):
+        if(records1[i] != records2[i]):
+            differences.append(i)
+    for i in range(min(len(records1), len(records2)), max(len(records1), len(records2))):
+        differences.append(i)
+    return differences
+
+def printRecord(name, record):
+    operationType, operand1, operand2, result = record
+    print("    " + name + ": " + str(operationType) + " " + operand1.hex() + 
+          " " + operand2.hex() + " -> " + result.hex())
+    
+def printInfo(path):
+    records = readTranscript(path)
+    counts = [0] * len(AluStats.AluStats.OPERATION_NAMES)
+    for record in records:
+        counts[record[0]] += 1
+    print(path + ": " + str(len(records)) + " operations")
+    for operationType in range(0, len(counts)):
+        print("    " + AluStats.AluStats.OPERATION_NAMES[operationType] + ": " + str(counts[operationType]))
+        
+def printDiff(path1, path2, maxPrinted=10):
+    records1 = readTranscript(path1)
+    records2 = readTranscript(path2)
+    differences = diffTranscripts(records1, records2)
+    
+    print(str(len(records1)) + " and " + str(len(records2)) + " operations, " + 
+          str(len(differences)) + " differ")
+    for i in differences[:maxPrinted]:
+        print("operation " + str(i))
+        if(i < len(records1)):
+            printRecord(path1, records1[i])
+        if(i < len(records2)):
+            printRecord(path2, records2[i])
+            
+
+if __name__ == "__main__":
+    if(len(sys.argv) == 3 and sys.argv[1] == "info"):
+        printInfo(sys.argv[2])
+    elif(len(sys.argv) == 4 and sys.argv[1] == "diff"):
+        printDiff(sys.argv[2], sys.argv[3])
+    else:
+        print("usage: python3 AluTranscript.py info <transcript>")
+        print("       python3 AluTranscript.py diff <transcript1> <transcript2>")
@@ -24,10 +24,15 @@ THE SOFTWARE.
 '''
 
 '''
-    BigInt takes an integer and converts it to a hex array if the number is not
-    already a hex array. Operations are forwarded to the calculator class which
-    effectively encapsulates the alchitry au+ fpga's emulated functionality.
+    BigInt takes an integer and converts it to a python int in the range 
+    [0, 2^1200) if the number is not already a hex array or a BigInt. 
+    Operations are forwarded to the calculator class which effectively 
+    encapsulates the alchitry au+ fpga's emulated functionality. The int is 
+    only turned into the 150 byte hex array the fpga uses when it is sent, 
+    so copies just share the int and comparing or copying doesn't walk a 
+    list.
 '''
+import AluBackend
 import Calculator
 import time
 import sys
@@ -37,81 +42,82 @@ import sys
 
 class BigInt:
     
-    BASE_TWO = 2
+    #each number only holds its value, everything else is shared by the class
+    __slots__ = ("value",)
+    
     BASE_TEN = 10
-    BASE_HEX = 16
     
     NUM_BITS_IN_BYTE = 8
+    NUM_BITS = AluBackend.AluBackend.NUM_BITS
+    MASK = (1 << NUM_BITS) - 1
+    
+    #BigPreciseNum keeps negative numbers in two's complement, so this is 
+    #the sign
+    SIGN_BIT = 1 << (NUM_BITS - 1)
     
-    BINARY_STR_ONE = "1"
-    BINARY_STR_ZERO = "0"
     DECIMAL_STR_ZERO = "0"
-    HEX_STR_ZERO = "0"
     
-    MIN_HEX_STR_MIN_LOWER = 'a'
-    MIN_HEX_STR_MAX_LOWER = 'f'
-    MIN_HEX_STR_MIN_UPPER = 'A'
-    MIN_HEX_STR_MAX_UPPER = 'F'
+    #decimal strings up to this many digits are converted by python's int 
+    #and str directly, longer ones are split in half and the halves are 
+    #converted separately, which keeps the conversion subquadratic
+    DECIMAL_SPLIT_LENGTH = 256
+    LOG10_OF_TWO = 0.30102999566398120
+    
+    powersOfTen = {}
     
-    hexArr = []
     calculator = None
     
     
     
 
     #if the number is a string, assume it is a string containing a decimal 
-    #integer, otherwise, assume that the number is already hex array and copy
+    #integer, if it is a list, assume it is a hex array, otherwise assume 
+    #that it is a BigInt and share its value since ints are immutable
     def __init__(self, number):
-        self.hexArr = []
-        if(self.calculator is None):
-            self.calculator = Calculator.Calculator()
+        if(BigInt.calculator is None):
+            BigInt.calculator = Calculator.Calculator()
         
-        #convert to hex array
+        #convert to an int, like the hex array only the lowest 1200 bits 
+        #are kept
         if(isinstance(number, str)):
-            binaryStr = ""
-
-            while(len(number) > 0 and number != self.DECIMAL_STR_ZERO):
-                
-                if(int(number[len(number) - 1]) % self.BASE_TWO):
-                    binaryStr += self.BINARY_STR_ONE
-                else:
-                    binaryStr += self.BINARY_STR_ZERO
-                
-                number, remainder = self.getLongDivision(number, self.BASE_TWO, self.BASE_TEN)
-
-            while(len(binaryStr) < (self.calculator.OPERAND_LENGTH * self.NUM_BITS_IN_BYTE)):
-                binaryStr += self.BINARY_STR_ZERO
-                
-            #reverse string
-            binaryStr = binaryStr[::-1]
-            
-            
-            
-            for i in range(0, (self.calculator.OPERAND_LENGTH * self.NUM_BITS_IN_BYTE), self.NUM_BITS_IN_BYTE):
-                byte = int(binaryStr[i: (i + self.NUM_BITS_IN_BYTE)], self.BASE_TWO)
-                self.hexArr.append(byte)
+            self.value = self.fromDecimal(number) & self.MASK
         elif(isinstance(number, list)):
-            #deep copy the given hex array
-            self.hexArr = []
-            for elem in number:
-                self.hexArr.append(elem)
+            self.value = int.from_bytes(bytes(number), "big")
         else:
-            #deep copy the given hex array
-            self.hexArr = []
-            for elem in number.hexArr:
-                self.hexArr.append(elem)
+            self.value = number.value
+            
+    #makes a BigInt straight from an int without going through __init__, 
+    #which is the cheap way to copy one
+    @classmethod
+    def fromValue(cls, value):
+        if(cls.calculator is None):
+            BigInt.calculator = Calculator.Calculator()
+        bigInt = cls.__new__(cls)
+        bigInt.value = value
+        return bigInt
+    
+    def getCopy(self):
+        return BigInt.fromValue(self.value)
+            
+    #the value as an int in [0, 2^1200)
+    def getValue(self):
+        return self.value
+    
+    #the 150 byte hex array the fpga uses
+    def getHexArr(self):
+        return list(self.getValue().to_bytes(self.calculator.OPERAND_LENGTH, "big"))
 
     def __eq__(self, other):
         opType = self.calculator.OperationType.EQUALS.value
-        result = self.calculator.calculate(opType, self.hexArr, other.hexArr)
-        if(result != self.calculator.zeroArr):
+        result = self.calculator.calculateInt(opType, self.value, other.value)
+        if(result != 0):
             return True
         return False
         
     def __lt__(self, other):            
         opType = self.calculator.OperationType.LESS_THAN.value
-        result = self.calculator.calculate(opType, self.hexArr, other.hexArr)
-        if(result != self.calculator.zeroArr):
+        result = self.calculator.calculateInt(opType, self.value, other.value)
+        if(result != 0):
             return True
         return False
         
@@ -137,75 +143,72 @@ class BigInt:
             return False
         return True
         
+    #a BigInt never changes once it is made, so numbers can share them 
+    #freely. Every operator, including the in place ones, makes a new BigInt
+    #and += and friends just rebind the name to it
     def __add__(self, other):
-        a = BigInt(self.hexArr)
-        a += other
-        return a
-        
-    def __iadd__(self, other):
-        a = self
-        b = other
-
         opType = self.calculator.OperationType.ADDITION.value
-        a.hexArr = self.calculator.calculate(opType, a.hexArr, b.hexArr)
-        return a
-        
-    def __isub__(self, other):
-        a = self
-        b = other
-        
-        opType = self.calculator.OperationType.SUBTRACTION.value
-        a.hexArr = self.calculator.calculate(opType, a.hexArr, b.hexArr)
-        return a
+        return BigInt.fromValue(self.calculator.calculateInt(opType, self.value, other.value))
         
     def __sub__(self, other):
-        a = BigInt(self.hexArr)
-        a -= other
-        return a
+        opType = self.calculator.OperationType.SUBTRACTION.value
+        return BigInt.fromValue(self.calculator.calculateInt(opType, self.value, other.value))
         
     def __mul__(self, other):
-        a = BigInt(self.hexArr)
-        a *= other
-        return a
-        
-    def __imul__(self, other):
-        a = self
-        b = other
         opType = self.calculator.OperationType.MULTIPLICATION.value
-        a.hexArr = self.calculator.calculate(opType, a.hexArr, b.hexArr)
-        return a
-    
-    def __idiv__(self, other):
-
-        # Create new BigPreciseNum objects
-        a = BigInt(self.hexArr)
-        b = BigInt(other.hexArr)
-        
-
-        # Perform the division directly on the internal numbers
-        a /= b
-    
-    
-        return a
+        return BigInt.fromValue(self.calculator.calculateInt(opType, self.value, other.value))
     
     def __truediv__(self, other):
-        a = []
-        for elem in self.hexArr:
-            a.append(elem)
-            
-        b = []
-        for elem in other.hexArr:
-            b.append(elem)
-        # No need to create new variables; modify self in place
         if not isinstance(other, BigInt):
             raise TypeError("Division can only be performed with BigPreciseNum objects")
     
-
         opType = self.calculator.OperationType.DIVISION.value
-        self.hexArr = self.calculator.calculate(opType, a, b)
+        return BigInt.fromValue(self.calculator.calculateInt(opType, self.value, other.value))
+
+    '''
+    the same operation for a list of (a, b) pairs that don't depend on each
+    other, like the components of a vector. They are sent to the alu
+    together with Calculator.calculateManyInt, so the pairs share the
+    transfer overhead. Returns the results in the order of the pairs
+    '''
+    @classmethod
+    def calculateMany(cls, opType, pairs):
+        if(cls.calculator is None):
+            BigInt.calculator = Calculator.Calculator()
+        operations = [(opType, a.value, b.value) for a, b in pairs]
+        return [cls.fromValue(result) for result in cls.calculator.calculateManyInt(operations)]
+
+    @classmethod
+    def addMany(cls, pairs):
+        return cls.calculateMany(AluBackend.AluBackend.ADDITION, pairs)
+
+    @classmethod
+    def subtractMany(cls, pairs):
+        return cls.calculateMany(AluBackend.AluBackend.SUBTRACTION, pairs)
+
+    @classmethod
+    def multiplyMany(cls, pairs):
+        return cls.calculateMany(AluBackend.AluBackend.MULTIPLICATION, pairs)
+
+    @classmethod
+    def divideMany(cls, pairs):
+        return cls.calculateMany(AluBackend.AluBackend.DIVISION, pairs)
+
+    #a < b for each pair, as bools
+    @classmethod
+    def lessThanMany(cls, pairs):
+        return [result.value != 0 for result in cls.calculateMany(AluBackend.AluBackend.LESS_THAN, pairs)]
+
+    #negation and shifts are done on the host since the alu doesn't have 
+    #them. Like the alu's operations only the lowest 1200 bits are kept
+    def __neg__(self):
+        return BigInt.fromValue((-self.getValue()) & self.MASK)
     
-        
-        return self
+    def __lshift__(self, numBits):
+        return BigInt.fromValue((self.getValue() << numBits) & self.MASK)
+    
+    def __rshift__(self, numBits):
+        return BigInt.fromValue(self.getValue() >> numBits)
         
         
     def printStr(self):
@@ -213,75 +216,42 @@ class BigInt:
         print(outputStr)
         
     def getStr(self):
+        return self.toDecimal(self.getValue())
+    
+    @classmethod
+    def getPowerOfTen(cls, exponent):
+        power = cls.powersOfTen.get(exponent)
+        if(power is None):
+            power = cls.BASE_TEN ** exponent
+            cls.powersOfTen[exponent] = power
+        return power
+    
+    #returns the int for a string of decimal digits
+    @classmethod
+    def fromDecimal(cls, decimalStr):
+        if(len(decimalStr) <= cls.DECIMAL_SPLIT_LENGTH):
+            if(len(decimalStr) == 0):
+                return 0
+            return int(decimalStr)
         
-        hexStr = ""
-        output = ""
-        for i in range(0, self.calculator.OPERAND_LENGTH):
-            if(self.hexArr[i] < self.BASE_HEX):
-                hexStr += self.HEX_STR_ZERO
-            hexStr += (f'{self.hexArr[i]:x}')
-            
-        while(hexStr != self.HEX_STR_ZERO):
-            remainder = 0
-            hexStr, remainder = self.getLongDivision(hexStr, self.BASE_TEN, self.BASE_HEX)
-            output += str(remainder)
-            
-        #reverse string
-        output = output[::-1]
-        return output
-        
+        lowLength = len(decimalStr) // 2
+        high = cls.fromDecimal(decimalStr[:-lowLength])
+        low = cls.fromDecimal(decimalStr[-lowLength:])
+        return high * cls.getPowerOfTen(lowLength) + low
+    
     '''
-    dividendStr: must be a hex or decimal string
-    divider: must be decimal number
-    base: the base of the dividend string
-    quotient: returns a hex string if the dividend is in hex, 
-        otherwise it returns a decimal string
+    returns the decimal string for a non negative int. The lower halves of a
+    split are padded with zeros to numDigits digits.
     '''
-    def getLongDivision(self, dividendStr, divider, base):
-        output = ""
-        i = 0
-        digit = 0
-        carryover = 0
-        
-        while(i < len(dividendStr)):
-            num = dividendStr[i]
-            if(num >= self.MIN_HEX_STR_MIN_LOWER and num <= self.MIN_HEX_STR_MAX_LOWER):
-                digit = self.BASE_TEN + (ord(num) - ord(self.MIN_HEX_STR_MIN_LOWER))
-            elif(num >= self.MIN_HEX_STR_MIN_UPPER and num <= self.MIN_HEX_STR_MAX_UPPER):
-                digit = self.BASE_TEN + (ord(num) - ord(self.MIN_HEX_STR_MIN_UPPER))
-            else:
-                digit = int(num)
-                
-            digit += carryover
-            
-            multipleOfDivider = 0
-            while(multipleOfDivider * divider <= digit):
-                multipleOfDivider += 1
-            
-            if((multipleOfDivider - 1) >= 0):
-                if((multipleOfDivider - 1) < self.BASE_TEN):
-                    output += str(multipleOfDivider - 1) 
-                else:
-                    output += chr((multipleOfDivider - 1) - self.BASE_TEN + ord(self.MIN_HEX_STR_MIN_UPPER))
-            
-            remainder = (digit - ((multipleOfDivider - 1) * divider))
-            carryover = base * remainder
-            i += 1
-            
-        #get rid of leading zeros
-        quotient = ""
-        hasHitFirstNonZeroDigit = False
-        for i in range(0, len(output)):
-            if(hasHitFirstNonZeroDigit == True or output[i] != self.HEX_STR_ZERO):
-                quotient += output[i]
-            
-            if(hasHitFirstNonZeroDigit == False and output[i] != self.HEX_STR_ZERO):
-                hasHitFirstNonZeroDigit = True
-            
-            
-        if(len(quotient) == 0):
-            quotient = self.HEX_STR_ZERO
-        return quotient, remainder
+    @classmethod
+    def toDecimal(cls, value, numDigits=0):
+        if(value < cls.getPowerOfTen(cls.DECIMAL_SPLIT_LENGTH)):
+            decimalStr = str(value)
+        else:
+            lowLength = int(value.bit_length() * cls.LOG10_OF_TWO) // 2
+            high, low = divmod(value, cls.getPowerOfTen(lowLength))
+            decimalStr = cls.toDecimal(high) + cls.toDecimal(low, lowLength)
+        return decimalStr.rjust(numDigits, cls.DECIMAL_STR_ZERO)
         
             
 
@@ -294,9 +264,9 @@ class BigInt:
 
 '''
 def NthFibonacci(n, zero, one):
-    a = BigInt(one.hexArr)
-    b = BigInt(one.hexArr)
-    c = BigInt(zero.hexArr)
+    a = BigInt(one)
+    b = BigInt(one)
+    c = BigInt(zero)
     
     if(n <= 0):
         return c
@@ -311,18 +281,18 @@ def NthFibonacci(n, zero, one):
 
 
 def NthCatalan(n, zero, one):
-    a = BigInt(one.hexArr)
-    b = BigInt(zero.hexArr)
-    iBigInt = BigInt(one.hexArr)
+    a = BigInt(one)
+    b = BigInt(zero)
+    iBigInt = BigInt(one)
     iBigInt += one
     
     for i in range(2, (n + 1)):
         a *= iBigInt
         iBigInt += one
         
-    midPt = BigInt(iBigInt.hexArr)
+    midPt = BigInt(iBigInt)
     
-    b.hexArr = a.hexArr
+    b.value = a.value
     for i in range((n + 1), ((2 * n) + 1)):
         b *= iBigInt
         iBigInt += one
@@ -334,8 +304,8 @@ def NthCatalan(n, zero, one):
 
     
 def NthFactorial(n, one):
-    f = BigInt(one.hexArr)
-    iBigInt = BigInt(one.hexArr)
+    f = BigInt(one)
+    iBigInt = BigInt(one)
     iBigInt += one
     
     for i in range(2, (n + 1)):
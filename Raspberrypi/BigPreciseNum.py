@@ -26,18 +26,19 @@ THE SOFTWARE.
 
 '''
 BigPreciseNum either takes a string like "-1.22343545e-7" and converts it to a BigInt
-which is the internalNumber, and a boolean, isPositive, which indicates whether
- the number is positive or negative, or takes a BigPreciseNum and copies the 
-BigInt and whether it is positive or negative. Initializing from a string
+which is the internalNumber, holding negative numbers in two's complement, or 
+takes a BigPreciseNum and shares its BigInt. Initializing from a string
 like "-1.22343545e-7" is computationally expensive and should only be used in
 the initialization stage of the program.
 
 BigPreciseNum effectively just takes a BigInt and wraps it with some extra
-details like whether it is positive or negative and where the effective
-decimal point should be in the number. Additionally, the constructor has the
-capability to convert scientific number strings into the correct format.
+details like whether it is positive or negative, which is its top bit, and 
+where the effective decimal point should be in the number. Additionally, the 
+constructor has the capability to convert scientific number strings into the
+correct format.
 '''
 
+import os
 import Calculator
 import BigInt
 
@@ -69,35 +70,128 @@ class BigPreciseNum:
     NEGATIVE_STR = "-"
     EXPONENT_STR = "e"
     BASE_TEN_STR = "10"
-    NUM_NIBBLES_IN_BYTE = 2 
     BASE_HEX = 16 
     
-    isPositive = True
-    internalNumber = None
+    #the one's place as an int, parsed once when the class is defined
+    DECIMAL_SCALE = int(ONE_PLACE_HEX_STR, BASE_HEX)
+    
+    #in the binary scale the one's place is 2^FRACTION_BITS, the smallest
+    #power of two above 10^DECIMAL_POINT_LOCATION, so it is at least as 
+    #precise as the decimal scale. Multiplications are renormalized with a 
+    #shift on the host instead of a division by decimalNum on the alu, so 
+    #a multiplication is one alu operation instead of two and so is a 
+    #division. The scale is chosen per run with LIGHT_CHARGE_SCALE, e.g.
+    #    $> LIGHT_CHARGE_SCALE=binary python3 LightChargeSimulator.py
+    FRACTION_BITS = 532
+    SCALE_ENV_STR = "LIGHT_CHARGE_SCALE"
+    DECIMAL_SCALE_STR = "decimal"
+    BINARY_SCALE_STR = "binary"
+    
+    SCALE = DECIMAL_SCALE
+    scaleStr = DECIMAL_SCALE_STR
+    isBinaryScale = False
+    
+    #each number only holds its value as a two's complement 1200 bit word,
+    #the rest is the same for every number and is shared by the class. The
+    #alu's addition and subtraction already wrap around at 1200 bits, so 
+    #they work on negative numbers as they are and the sign is just the top
+    #bit, which the host can check without a comparison on the alu
+    __slots__ = ("internalNumber",)
+    
+    numDigits = NUM_DIGITS
+    decimalPtLocation = DECIMAL_POINT_LOCATION
     decimalNum = None 
     zeroNum = None
-    numDigits = None
-    decimalPtLocation = None
     calculator = None
     
     
-    def __init__(self, bigPreciseNum, numDigits=NUM_DIGITS, \
-                 decimalPtLocation=DECIMAL_POINT_LOCATION ):
+    #the shared constants need the calculator, so they are made when the 
+    #first number is. They are shared by every number, so they must never be
+    #changed in place
+    @classmethod
+    def initConstants(cls):
+        cls.calculator = Calculator.Calculator()
+        cls.zeroNum = BigInt.BigInt.fromValue(0)
+        cls.setScale(os.environ.get(cls.SCALE_ENV_STR, cls.DECIMAL_SCALE_STR))
         
-        self.numDigits = numDigits
-        self.decimalPtLocation = decimalPtLocation
-        self.calculator = Calculator.Calculator()
-        self.zeroNum = BigInt.BigInt(self.calculator.zeroArr)
-            
-        # Split the hex string into pairs and convert them to a hex array
-        hex_array = []
-        for i in range(0, len(self.ONE_PLACE_HEX_STR), self.NUM_NIBBLES_IN_BYTE):
-            hex_array.append(int(self.ONE_PLACE_HEX_STR[i:i + self.NUM_NIBBLES_IN_BYTE], self.BASE_HEX))
-
-        self.decimalNum = BigInt.BigInt(hex_array)
-
+    #numbers made with one scale mean something else in the other, so the 
+    #scale has to be set before the first number is made
+    @classmethod
+    def setScale(cls, scaleStr):
+        if(scaleStr == cls.DECIMAL_SCALE_STR):
+            cls.SCALE = cls.DECIMAL_SCALE
+            cls.isBinaryScale = False
+        elif(scaleStr == cls.BINARY_SCALE_STR):
+            cls.SCALE = 1 << cls.FRACTION_BITS
+            cls.isBinaryScale = True
+        else:
+            raise Exception("unknown scale " + scaleStr + ", choose from " + 
+                            str([cls.DECIMAL_SCALE_STR, cls.BINARY_SCALE_STR]))
+        cls.scaleStr = scaleStr
+        cls.decimalNum = BigInt.BigInt.fromValue(cls.SCALE)
         
+    '''
+    makes a number straight from its two's complement word without going 
+    through __init__. Numbers are never changed once they are made, every 
+    operator returns a new one and += and friends just rebind the name, so 
+    the word can be shared with whatever it came from
+    '''
+    @classmethod
+    def fromInternal(cls, internalNumber):
+        number = cls.__new__(cls)
+        number.internalNumber = internalNumber
+        return number
+    
+    #makes a number from a sign and a magnitude
+    @classmethod
+    def fromParts(cls, isPositive, magnitude):
+        if(isPositive):
+            return cls.fromInternal(magnitude)
+        return cls.fromInternal(-magnitude)
+    
+    '''
+    numbers are immutable so a copy shares the word with the original and 
+    only costs the one object
+    '''
+    def getCopy(self):
+        return BigPreciseNum.fromInternal(self.internalNumber)
+    
+    #zero counts as positive, there is no negative zero
+    @property
+    def isPositive(self):
+        return (self.internalNumber.getValue() & BigInt.BigInt.SIGN_BIT) == 0
+    
+    def getMagnitude(self):
+        if(self.isPositive):
+            return self.internalNumber
+        return -self.internalNumber
+    
+    #the closest float, e.g. for a first guess that is refined on the alu
+    def getFloat(self):
+        value = self.getMagnitude().getValue() / self.SCALE
+        if(self.isPositive):
+            return value
+        return -value
+    
+    #the number for the fraction numerator / denominator of two ints, 
+    #calculated on the host and rounded towards zero to the scale
+    @classmethod
+    def fromRatio(cls, numerator, denominator):
+        magnitude = (abs(numerator) * cls.SCALE) // abs(denominator)
+        isPositive = ((numerator >= 0) == (denominator > 0))
+        return cls.fromParts(isPositive, BigInt.BigInt.fromValue(magnitude & BigInt.BigInt.MASK))
+    
+    #the number for a float, rounded towards zero to the scale
+    @classmethod
+    def fromFloat(cls, value):
+        return cls.fromRatio(*value.as_integer_ratio())
+    
+    def __init__(self, bigPreciseNum):
+        if(BigPreciseNum.decimalNum is None):
+            BigPreciseNum.initConstants()
+            
         if(isinstance(bigPreciseNum, str)):
+            isPositive = True
             power = self.ZERO_STR
             fraction = ""
             integerPart = ""
@@ -110,46 +204,45 @@ class BigPreciseNum:
                 
             integerPart = bigPreciseNum
             if(integerPart.find(self.NEGATIVE_STR) >= 0):
-                self.isPositive = False
+                isPositive = False
                 negative, integerPart = integerPart.split(self.NEGATIVE_STR)
                 
                 
-            #move the integer to the beginning of the decimal point
+            #the magnitude is built on the host, moving the integer to the 
+            #beginning of the decimal point and applying the power with one 
+            #multiplication or division by a power of ten. It is the same 
+            #magnitude the alu would get to by multiplying and dividing by ten
+            #one digit at a time, since those keep the low 1200 bits and 
+            #round down the same way
+            magnitude = 0
             if(len(integerPart) > 0):
-                self.internalNumber = BigInt.BigInt(integerPart)
-                for i in range(0, self.decimalPtLocation):
-                    self.internalNumber *= BigInt.BigInt(self.BASE_TEN_STR)
+                magnitude = BigInt.BigInt.fromDecimal(integerPart) * self.DECIMAL_SCALE
                     
             #add the fraction part
-            if(len(fraction) > self.decimalPtLocation):
-                while(len(fraction) > self.decimalPtLocation):
-                    fraction = fraction[0:self.decimalPtLocation]
-            else:
-                while(len(fraction) < self.decimalPtLocation):
-                    fraction += self.ZERO_STR
-            
-            fractionBigInt = BigInt.BigInt(fraction)
-            self.internalNumber += fractionBigInt
+            fraction = fraction[0:self.decimalPtLocation].ljust(self.decimalPtLocation, self.ZERO_STR)
+            magnitude = (magnitude + BigInt.BigInt.fromDecimal(fraction)) & BigInt.BigInt.MASK
             
             #multiply the number by the power if any
-            ten = BigInt.BigInt(self.BASE_TEN_STR)
-            
-            
-
             isPositivePower = True
             if(power.find(self.NEGATIVE_STR) >= 0):
                 isPositivePower = False
                 negative, power = power.split(self.NEGATIVE_STR)
                 
             if(isPositivePower):
-                for i in range(0, int(power)):
-                    self.internalNumber *= ten
+                magnitude = (magnitude * BigInt.BigInt.getPowerOfTen(int(power))) & BigInt.BigInt.MASK
             else:
-                for i in range(0, int(power)):
-                    self.internalNumber /= ten
+                magnitude //= BigInt.BigInt.getPowerOfTen(int(power))
+                
+            #the binary scale converts the decimal magnitude in one go, so 
+            #both scales round the string down at the same decimal place
+            if(self.isBinaryScale):
+                magnitude = ((magnitude << self.FRACTION_BITS) // self.DECIMAL_SCALE) & BigInt.BigInt.MASK
+                
+            self.internalNumber = BigInt.BigInt.fromValue(magnitude)
+            if(not isPositive):
+                self.internalNumber = -self.internalNumber
         else:
-            self.isPositive = bigPreciseNum.isPositive
-            self.internalNumber = BigInt.BigInt(bigPreciseNum.internalNumber)
+            self.internalNumber = bigPreciseNum.internalNumber
             
 
         
@@ -159,36 +252,21 @@ class BigPreciseNum:
         if(False == self.isPositive):
             retStr += self.NEGATIVE_STR
             
-        intPartExists = False
-        firstNumReached = False
-        digits = self.internalNumber.getStr()
+        magnitude = self.getMagnitude().getValue()
+        if(self.isBinaryScale):
+            magnitude = (magnitude * self.DECIMAL_SCALE) >> self.FRACTION_BITS
+        digits = BigInt.BigInt.toDecimal(magnitude)
         
-        #reverse string
-        digits = digits[::-1]
+        #the last decimalPtLocation digits are the fraction, anything before
+        #that is the integer part
+        splitIndex = max(len(digits) - self.decimalPtLocation, 0)
+        integerPart = digits[:splitIndex].lstrip(self.ZERO_STR)
+        fraction = digits[splitIndex:].rjust(self.decimalPtLocation, self.ZERO_STR)
         
-        #strip leading zeros
-        i = len(digits) - 1
-        while(i > self.decimalPtLocation - 1):
-            if(firstNumReached == True):
-                retStr += str(digits[i])
-            elif((firstNumReached == False) and (digits[i] != self.ZERO_STR)):
-                firstNumReached = True
-                retStr += digits[i]
-            i -= 1
-            intPartExists = True
-            
-        if(False == intPartExists):
-            retStr += self.ZERO_STR
-        retStr += "."
-        i = self.decimalPtLocation - 1
-        while(i >= 0):
-            if(i >= len(digits)):
-                retStr += self.ZERO_STR
-            else:
-                retStr += digits[i]
-            i -= 1
+        if(len(integerPart) == 0):
+            integerPart = self.ZERO_STR
         
-        return retStr
+        return retStr + integerPart + self.DECIMAL_POINT_STR + fraction
         
 
     
@@ -196,154 +274,98 @@ class BigPreciseNum:
         print(self.getStr())
         
     def __add__(self, other):
-        a = BigPreciseNum(self)
-        a += other
-        return a
-        
-    def __iadd__(self, other):
-        a = self
-        b = other
-        
-        if(a.isPositive == True and b.isPositive == True):
-            a.internalNumber += b.internalNumber
-            
-        elif(a.isPositive == True and b.isPositive == False):
-            if(a.internalNumber > b.internalNumber):
-                a.internalNumber -= b.internalNumber
-            else:
-                a.isPositive = False
-                a.internalNumber = b.internalNumber - a.internalNumber
-        
-        elif(a.isPositive == False and b.isPositive == True):
-            if(a.internalNumber > b.internalNumber):
-                a.internalNumber -= b.internalNumber
-            else:
-                a.isPositive = True
-                a.internalNumber = b.internalNumber - a.internalNumber
-            
-        else:
-            a.internalNumber += b.internalNumber
-            
-            
-        return a
+        return BigPreciseNum.fromInternal(self.internalNumber + other.internalNumber)
     
     def __sub__(self, other):
-        a = BigPreciseNum(self)
-        a -= other
-        return a
+        return BigPreciseNum.fromInternal(self.internalNumber - other.internalNumber)
     
-    def __isub__(self, other):
-        a = self 
-        b = other
-        
-        if(a.isPositive == True and b.isPositive == True):
-            if(a.internalNumber > b.internalNumber):
-                a.internalNumber -= b.internalNumber
-            else:
-                a.isPositive = False
-                a.internalNumber = b.internalNumber - a.internalNumber
-                
-        elif(a.isPositive == True and b.isPositive == False):
-            a.internalNumber += b.internalNumber
-            
-        elif(a.isPositive == False and b.isPositive == True):
-            a.internalNumber += b.internalNumber
-            
-        else:
-            if(a.internalNumber > b.internalNumber):
-                a.internalNumber -= b.internalNumber
-            else:
-                a.isPositive = True
-                a.internalNumber = b.internalNumber - a.internalNumber
-        
-
-        
-        return a
+    def __neg__(self):
+        return BigPreciseNum.fromInternal(-self.internalNumber)
     
-    def __mul__(self, other):
-        a = BigPreciseNum(self)
-        a *= other
-        return a
+    def __abs__(self):
+        if(self.isPositive):
+            return self
+        return -self
     
-    def __imul__(self, other):
+    #the alu's multiplication and division are unsigned, so they are done on
+    #the magnitudes and the sign is put back on the host, which rounds 
+    #towards zero like the magnitudes do
+    def __mul__(self, other):
         a = self 
         b = other
         
-        if(a.isPositive == False and b.isPositive == False):
-            a.isPositive = True
-        elif(a.isPositive == True and b.isPositive == False):
-            a.isPositive = False
-
-
-        a.internalNumber *= b.internalNumber 
-
-        a.internalNumber /= self.decimalNum
-
-        
-
+        isPositive = (a.isPositive == b.isPositive)
         
-        return a
-    
-    def __idiv__(self, other):
-
-        # Create new BigPreciseNum objects
-        a = self
-        b = BigPreciseNum(other)
-        
-
-        # Perform the division directly on the internal numbers
-        a /= b
+        product = a.getMagnitude() * b.getMagnitude()
+        if(self.isBinaryScale):
+            return BigPreciseNum.fromParts(isPositive, product >> self.FRACTION_BITS)
+        return BigPreciseNum.fromParts(isPositive, product / self.decimalNum)
     
-        # Adjust the sign based on the positivity of a and b
-        if a.isPositive != b.isPositive:
-            a.isPositive = False
-        else:
-            a.isPositive = True
-    
-        return a
     def __truediv__(self, other):
-
-        # Create new BigPreciseNum objects
-        a = BigPreciseNum(self)
-        b = BigPreciseNum(other)
-        
-        # No need to create new variables; modify self in place
         if not isinstance(other, BigPreciseNum):
             raise TypeError("Division can only be performed with BigPreciseNum objects")
+        
+        a = self
+        b = other
     
-        # Modify self based on the positivity rules
-        if a.isPositive != b.isPositive:
-            a.isPositive = False
+        isPositive = (a.isPositive == b.isPositive)
+        
+        if(self.isBinaryScale):
+            numerator = a.getMagnitude() << self.FRACTION_BITS
         else:
-            a.isPositive = True
+            numerator = a.getMagnitude() * b.decimalNum
     
-        a.internalNumber *= b.decimalNum
-        # Perform in-place division
-        a.internalNumber /= b.internalNumber
-        
-        return a
+        return BigPreciseNum.fromParts(isPositive, numerator / b.getMagnitude())
 
+    '''
+    the operators for a list of (a, b) pairs that don't depend on each other,
+    like the components of a vector. Each alu step of the operator is sent
+    for all the pairs at once with BigInt.calculateMany, so a vector of four
+    components takes one transfer per step instead of four. The results are
+    the same as the operators'
+    '''
+    @classmethod
+    def addMany(cls, pairs):
+        sums = BigInt.BigInt.addMany([(a.internalNumber, b.internalNumber) for a, b in pairs])
+        return [cls.fromInternal(total) for total in sums]
 
-        
-        
-    
-    def __lt__(self, b):
-        a = BigPreciseNum(self)
-        
-        if(a.isPositive == True and b.isPositive == True):
-            return a.internalNumber < b.internalNumber
-        elif(a.isPositive == True and b.isPositive == False):
-            return False
-        elif(a.isPositive == False and b.isPositive == True):
-            return True
+    @classmethod
+    def subtractMany(cls, pairs):
+        differences = BigInt.BigInt.subtractMany([(a.internalNumber, b.internalNumber) for a, b in pairs])
+        return [cls.fromInternal(difference) for difference in differences]
+
+    @classmethod
+    def multiplyMany(cls, pairs):
+        signs = [a.isPositive == b.isPositive for a, b in pairs]
+        products = BigInt.BigInt.multiplyMany([(a.getMagnitude(), b.getMagnitude()) for a, b in pairs])
+        if(cls.isBinaryScale):
+            products = [product >> cls.FRACTION_BITS for product in products]
         else:
-            return a.internalNumber > b.internalNumber
+            products = BigInt.BigInt.divideMany([(product, cls.decimalNum) for product in products])
+        return [cls.fromParts(isPositive, product) for isPositive, product in zip(signs, products)]
+
+    @classmethod
+    def divideMany(cls, pairs):
+        signs = [a.isPositive == b.isPositive for a, b in pairs]
+        if(cls.isBinaryScale):
+            numerators = [a.getMagnitude() << cls.FRACTION_BITS for a, b in pairs]
+        else:
+            numerators = BigInt.BigInt.multiplyMany([(a.getMagnitude(), cls.decimalNum) for a, b in pairs])
+        quotients = BigInt.BigInt.divideMany([(numerator, b.getMagnitude()) for numerator, (a, b) in zip(numerators, pairs)])
+        return [cls.fromParts(isPositive, quotient) for isPositive, quotient in zip(signs, quotients)]
+
+    #numbers with different signs are ordered by the sign bit alone. With 
+    #the same sign, two's complement words are in the same order as the 
+    #numbers, so the alu's unsigned comparison works for negative numbers too
+    def __lt__(self, b):
+        a = self
         
-        raise Exception("error with less than operator")
+        if(a.isPositive != b.isPositive):
+            return b.isPositive
+        return a.internalNumber < b.internalNumber
         
     def __eq__(self, b):
-        a = BigPreciseNum(self)
-        return ((a.internalNumber == b.internalNumber) and (a.isPositive == b.isPositive))
+        return self.internalNumber == b.internalNumber
 
     def __ne__(self, b):
         return not(self == b)  
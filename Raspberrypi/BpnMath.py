@@ -28,7 +28,13 @@ THE SOFTWARE.
 BpnMath is stripped down version of what would be the python math library for
 BigPreciseNum types. 
 '''
+import math
+import threading
+import BigInt
 import BigPreciseNum
+import Calculator
+import ConstantSnapshot
+import TrigTable
 from Singleton import singleton
 
 @singleton
@@ -44,6 +50,22 @@ class BpnMath():
     zero = None
     two = None
     
+    LN_OF_TEN = math.log(10)
+    
+    #the largest argument the sin and cos series have coefficients for. 
+    #Reduced arguments are at most just past pi/4, and so are the knots of a 
+    #TrigTable.
+    SERIES_MAX_ARGUMENT = 1.0
+    
+    #the same for the arctan series. arctan2 leaves it at most 1e-15 with 
+    #the float angle, or at most tan of half a step of a TrigTable, which has
+    #at least TrigTable.MIN_STEP_BITS
+    ARCTAN_MAX_ARGUMENT = 0.3
+    
+    #sincos uses the cos series instead of a sqrt up to this many terms, 
+    #each term is about 3 transfers and the sqrt about 30
+    SINCOS_SERIES_TERMS = 10
+    
     #scientific constants
     speed_of_light = None
     planck_length = None
@@ -69,6 +91,21 @@ class BpnMath():
         self.three = BigPreciseNum.BigPreciseNum("3.0")
         self.ten = BigPreciseNum.BigPreciseNum("10.0")
         self.piOverTwo = self.pi / self.two
+        
+        #the coefficients are all calculated here rather than when they are 
+        #first needed, since Calculator.map runs BpnMath on a thread per 
+        #device and filling a shared list from several threads isn't safe
+        self.seriesCoefficients = self.getSeriesCoefficients(self.SERIES_MAX_ARGUMENT)
+        self.arctanCoefficients = self.getArctanCoefficients(self.ARCTAN_MAX_ARGUMENT)
+        
+        #numSqrtIterations, numSeriesTerms and numArctanTerms are kept per 
+        #thread for the same reason
+        self.counters = threading.local()
+        
+        #used by arcsin and arccos to switch to the half-angle identity
+        self.half = BigPreciseNum.BigPreciseNum("0.5")
+        self.negHalf = -self.half
+        self.sqrtOfHalf = BigPreciseNum.BigPreciseNum("0.70710678118654752440084436210484903928483593768847403658833986899536623923105351942519376716382078636750692311545614851246241802792536860632206074854996791570661133296375")
 
         #while calculating terms for the trig function series, new terms are 
         #found until they are smaller than this precision. Roughly based off of
@@ -98,11 +135,57 @@ class BpnMath():
         self.planck_constant = BigPreciseNum.BigPreciseNum("6.62607015e-34")
         
         #https://en.wikipedia.org/wiki/Coulomb_constant
-        self.coulumb_constant = BigPreciseNum.BigPreciseNum("1.0") / (BigPreciseNum.BigPreciseNum("4.0") * self.pi * self.electric_permittivity)
+        snapshot = ConstantSnapshot.ConstantSnapshot()
+        four = BigPreciseNum.BigPreciseNum("4.0")
+        self.coulumb_constant = snapshot.getConstant("coulumb_constant", 
+                                                     lambda: self.one / (four * self.pi * self.electric_permittivity),
+                                                     [self.one, four, self.pi, self.electric_permittivity])
+        
+        #sin, cos and arctan2 start from the nearest knot when there is a 
+        #table for the current settings, see TrigTable.py
+        self.trigTable = TrigTable.TrigTable()
+        
+        #these constants are used in almost every calculation, so they are kept
+        #in the ALU's registers when the backend has them. one's internal
+        #number is the same as BigPreciseNum.decimalNum which every 
+        #multiplication divides by.
+        calculator = Calculator.Calculator()
+        for constant in [self.one, self.zero, self.two, self.pi, 
+                         self.piOverTwo, self.planck_length, self.precision]:
+            calculator.pinConstant(constant.internalNumber.getHexArr())
         
         
 
 
+    '''
+    how many iterations the last sqrt took and how many terms the last sin, 
+    cos or arctan series took, on the current thread. With a CalculatorPool
+    every device's thread has its own.
+    '''
+    @property
+    def numSqrtIterations(self):
+        return getattr(self.counters, "numSqrtIterations", 0)
+    
+    @numSqrtIterations.setter
+    def numSqrtIterations(self, numIterations):
+        self.counters.numSqrtIterations = numIterations
+    
+    @property
+    def numSeriesTerms(self):
+        return getattr(self.counters, "numSeriesTerms", 0)
+    
+    @numSeriesTerms.setter
+    def numSeriesTerms(self, numTerms):
+        self.counters.numSeriesTerms = numTerms
+    
+    @property
+    def numArctanTerms(self):
+        return getattr(self.counters, "numArctanTerms", 0)
+    
+    @numArctanTerms.setter
+    def numArctanTerms(self, numTerms):
+        self.counters.numArctanTerms = numTerms
+    
     '''
     Some vectors can be quite small, like [0, 0, planck_length, 0]. By scaling
     them to unity first, less precision is lost during calculations like
@@ -124,11 +207,10 @@ class BpnMath():
             
         
         while(allComponentsBelowOne):
-            for i in range(0, len(vectorCpy)):
-                vectorCpy[i] *= self.ten
-            for i in range(0, len(vectorCpy)):
-                if(vectorCpy[i].internalNumber >= self.one.internalNumber):
-                    allComponentsBelowOne = False
+            vectorCpy = BigPreciseNum.BigPreciseNum.multiplyMany([(component, self.ten) for component in vectorCpy])
+            isBelowOne = BigInt.BigInt.lessThanMany([(component.getMagnitude(), self.one.internalNumber) for component in vectorCpy])
+            if(not all(isBelowOne)):
+                allComponentsBelowOne = False
                     
         return vectorCpy
         
@@ -149,18 +231,16 @@ class BpnMath():
         vector2 = self.scaleVectorAboveOne(vector2)
                 
         vector1Mag = self.getMagnitude(vector1)
-        vector1Norm = []
-        for i in range(0, len(vector1)):
-            vector1Norm.append(vector1[i] / vector1Mag)
-            
         vector2Mag = self.getMagnitude(vector2)
-        vector2Norm = []
-        for i in range(0, len(vector2)):
-            vector2Norm.append(vector2[i] / vector2Mag)
+        
+        #both vectors are normalized with the same transfers
+        pairs = [(component, vector1Mag) for component in vector1]
+        pairs.extend([(component, vector2Mag) for component in vector2])
+        norms = BigPreciseNum.BigPreciseNum.divideMany(pairs)
+        vector1Norm = norms[:len(vector1)]
+        vector2Norm = norms[len(vector1):]
             
-        dot_product = BigPreciseNum.BigPreciseNum(self.zero)
-        for i in range(0, len(vector1)):
-            dot_product += vector1Norm[i] * vector2Norm[i]  
+        dot_product = self.getDotProduct(vector1Norm, vector2Norm)
             
         if(dot_product > self.one):
             return BigPreciseNum.BigPreciseNum(self.zero)
@@ -187,16 +267,14 @@ class BpnMath():
             return BigPreciseNum.BigPreciseNum(self.zero)
         
         reciprocal_planck_length = self.one / self.planck_length
-        vector1Norm = []
-        vector2Norm = []
-        for i in range(0, len(vector1)):
-            vector1Norm.append(vector1[i] * reciprocal_planck_length)
-            vector2Norm.append(vector2[i] * reciprocal_planck_length)
+        pairs = [(component, reciprocal_planck_length) for component in vector1]
+        pairs.extend([(component, reciprocal_planck_length) for component in vector2])
+        norms = BigPreciseNum.BigPreciseNum.multiplyMany(pairs)
+        vector1Norm = norms[:len(vector1)]
+        vector2Norm = norms[len(vector1):]
         
             
-        dot_product = BigPreciseNum.BigPreciseNum(self.zero)
-        for i in range(0, len(vector1)):
-            dot_product += vector1Norm[i] * vector2Norm[i]  
+        dot_product = self.getDotProduct(vector1Norm, vector2Norm)
             
 
         if(dot_product > self.one):
@@ -208,239 +286,372 @@ class BpnMath():
 
         
     def getNormalizedVector(self, vector):
-        length = len(vector)
-        magnitude = BigPreciseNum.BigPreciseNum(self.zero)
-        for i in range(0, length):
-            magnitude += vector[i] * vector[i]
-
-        magnitude = self.sqrt(magnitude)
-        
-        norm_vector = []
-        for i in range(0, length):
-            norm_vector.append(vector[i] / magnitude)
-        return norm_vector
+        magnitude = self.getMagnitude(vector)
+        return BigPreciseNum.BigPreciseNum.divideMany([(component, magnitude) for component in vector])
 
     def normalizeAndScale(self, vector, scalar):
         magnitude = self.getMagnitude(vector)
         adjustment = scalar / magnitude
-        
-        vector_cpy = []
-        for i in range(0, len(vector)):
-            vector_cpy.append(BigPreciseNum.BigPreciseNum(vector[i]))
-        
-        for i in range(0, len(vector_cpy)):
-            vector_cpy[i] *= adjustment
-        return vector_cpy
+        return BigPreciseNum.BigPreciseNum.multiplyMany([(component, adjustment) for component in vector])
 
     def getMagnitude(self, vector):
-        magnitude = BigPreciseNum.BigPreciseNum(self.zero)
-        for i in range(0, len(vector)):
-            magnitude += vector[i] * vector[i]
-            
-        return self.sqrt(magnitude)
-        
-    def arccos(self, BigPreciseNum):
-        return ((self.pi / self.two) - self.arcsin(BigPreciseNum))
-    
-    #arcsin is found to an accuracy of 150 decimal places. Typically, most 
-    #computers store the trig function values to an accuracy of 8 decimal 
-    #places via LUT(look up tables) for an execution time of O(1) and then
-    #intelligently approximate the remaining decimal places. However, these
-    #approximations are close to the true value but still technically incorrect.
-    #this project needs this value to be incredibly accurate and precise.
-    #
-    #this function uses the series expansion and keeps calculating terms until
-    #the new term is less than self.precision. If self.precision is 1e-150, 
-    #that means arcsin is accurate to 150 places past the decimal place.
+        squares = BigPreciseNum.BigPreciseNum.multiplyMany([(component, component) for component in vector])
+        return self.sqrt(self.getSum(squares))
+    
+    def getDotProduct(self, vector1, vector2):
+        return self.getSum(BigPreciseNum.BigPreciseNum.multiplyMany(list(zip(vector1, vector2))))
+    
+    '''
+    adds the numbers up in pairs, so each round of additions is one transfer
+    and four components take two. The alu's additions wrap around at 1200 
+    bits, so the order doesn't change the sum
+    '''
+    def getSum(self, numbers):
+        if(len(numbers) == 0):
+            return self.zero
+        while(len(numbers) > 1):
+            sums = BigPreciseNum.BigPreciseNum.addMany(list(zip(numbers[0::2], numbers[1::2])))
+            if(len(numbers) % 2 == 1):
+                sums.append(numbers[-1])
+            numbers = sums
+        return numbers[0]
+        
+    '''
+    arcsin and arccos are found to the last decimal place. Near -1 and 1 they
+    use the half-angle identity arccos(x) = 2 arcsin(sqrt((1 - x) / 2)), 
+    since 1 - x is exact there and the sqrt of it is the only rounding, so 
+    values like 1 - 1e-100 don't lose the digits the plain series did. The 
+    half angle is at most pi/4 and is found with arctan2.
+    '''
+    def arccos(self, bpn):
+        bpn = self.checkTrigDomain(bpn)
+        if(bpn > self.half):
+            return self.two * self.getHalfAngle(self.one - bpn)
+        if(bpn < self.negHalf):
+            return self.pi - self.two * self.getHalfAngle(self.one + bpn)
+        return self.piOverTwo - self.getSmallArcsin(bpn)
+    
     def arcsin(self, bpn):
-         if((bpn > (self.one + self.trig_precision)) or (bpn < (self.negOne - self.trig_precision))):
-             exceptionStr = str(bpn.getStr())
-             exceptionStr += "arcsin called out of range"
-             raise Exception(exceptionStr)
-             
-         
-         if(bpn > self.one):
-             return BigPreciseNum.BigPreciseNum(self.piOverTwo)
-         
-         if(bpn < self.negOne):
-             return self.negOne * self.piOverTwo
-         
-             
-         zTerm = BigPreciseNum.BigPreciseNum(bpn)
-         newTerm = BigPreciseNum.BigPreciseNum(bpn)
-         sumBpn = BigPreciseNum.BigPreciseNum(bpn)
-         previousTerm = BigPreciseNum.BigPreciseNum(zTerm)
-
-         iteration = BigPreciseNum.BigPreciseNum(self.one)
-         
-
-         
-         factorialNumeratorIdx = BigPreciseNum.BigPreciseNum(self.one)
-         factorialNumerator = BigPreciseNum.BigPreciseNum(self.one)
-         
-         twoExponentDenominator = BigPreciseNum.BigPreciseNum(self.one)
-         
-         
-         factorialDenominatorIdx = BigPreciseNum.BigPreciseNum(self.one)
-         factorialDenominator = BigPreciseNum.BigPreciseNum(self.one)
-
-
-         oddDenomTerm = BigPreciseNum.BigPreciseNum(self.one)
-         
-         precision = BigPreciseNum.BigPreciseNum(self.precision)
-         
-
-         previousTerm = None
-         
-
-
-         while(newTerm.internalNumber > precision.internalNumber):
-             
-             if(previousTerm is not None):
-                 previousTerm *= BigPreciseNum.BigPreciseNum(self.two)
-                 if(newTerm.internalNumber >= previousTerm.internalNumber):
-
-                     break
-             
-             previousTerm = BigPreciseNum.BigPreciseNum(newTerm)
-             
-             zTerm *= bpn
-             zTerm *= bpn
-             
-             while(factorialNumeratorIdx <= (iteration * self.two)):
-                 factorialNumerator *= factorialNumeratorIdx
-                 factorialNumeratorIdx += self.one
-             
-             numerator = factorialNumerator * zTerm
-             
-             twoExponentDenominator *= self.two
-             
-             while(factorialDenominatorIdx <= iteration):
-                 factorialDenominator *= factorialDenominatorIdx
-                 factorialDenominatorIdx += self.one
+        bpn = self.checkTrigDomain(bpn)
+        if(bpn > self.half):
+            return self.piOverTwo - self.two * self.getHalfAngle(self.one - bpn)
+        if(bpn < self.negHalf):
+            return self.two * self.getHalfAngle(self.one + bpn) - self.piOverTwo
+        return self.getSmallArcsin(bpn)
+    
+    #values can drift slightly outside of [-1, 1] from rounding, so anything
+    #within trig_precision of it is clamped instead of raising
+    def checkTrigDomain(self, bpn):
+        if((bpn > (self.one + self.trig_precision)) or (bpn < (self.negOne - self.trig_precision))):
+            exceptionStr = str(bpn.getStr())
+            exceptionStr += "arcsin called out of range"
+            raise Exception(exceptionStr)
+        if(bpn > self.one):
+            return self.one
+        if(bpn < self.negOne):
+            return self.negOne
+        return bpn
+    
+    #arcsin(x) for |x| <= 1/2, where sqrt(1 - x^2) doesn't lose any digits
+    def getSmallArcsin(self, bpn):
+        return self.arctan2(bpn, self.sqrt((self.one - bpn) * (self.one + bpn)))
+    
+    #arcsin(sqrt(d / 2)) for 0 <= d <= 1/2. sqrt(d) is taken before 
+    #multiplying by sqrt(1/2) since d is exact and d / 2 might not be.
+    def getHalfAngle(self, d):
+        return self.getSmallArcsin(self.sqrt(d) * self.sqrtOfHalf)
+    
+    '''
+    the angle of (x, y) in (-pi, pi], like math.atan2. The float atan2 is right
+    to about 16 digits, so (x, y) is rotated back by it, using sin and cos to
+    the last decimal place, and the angle that is left is below 1e-15. The 
+    arctan series of that angle needs about 10 terms for 160 digits, so 
+    the cost is the same anywhere in the domain, mostly the sin and cos.
+    '''
+    def arctan2(self, y, x):
+        yFloat = y.getFloat()
+        xFloat = x.getFloat()
+        if(yFloat == 0 and xFloat == 0):
+            return self.zero
         
-             denomPiece1 = factorialDenominator * twoExponentDenominator
-             denomPiece1 *= denomPiece1
-             
-             oddDenomTerm += self.two
-             
-             denominator = denomPiece1 * oddDenomTerm
-
-             newTerm = numerator / denominator
-
-             
-             sumBpn += newTerm
-
-             
-             iteration += self.one
-             
-         if(sumBpn > self.piOverTwo):
-             sumBpn = BigPreciseNum.BigPreciseNum(self.piOverTwo)
-         if(sumBpn < self.negOne * self.piOverTwo):
-             sumBpn = BigPreciseNum.BigPreciseNum(self.piOverTwo * self.negOne)
-                   
-            
-         return sumBpn
-             
+        angleFloat = math.atan2(yFloat, xFloat)
+        if(self.trigTable.isLoaded()):
+            angle, sinAngle, cosAngle = self.getTableAngle(angleFloat)
+        else:
+            angle = BigPreciseNum.BigPreciseNum.fromFloat(angleFloat)
+            sinAngle, cosAngle = self.sincos(angle)
+        cosX, sinY, cosY, sinX = BigPreciseNum.BigPreciseNum.multiplyMany([(cosAngle, x), (sinAngle, y), 
+                                                                           (cosAngle, y), (sinAngle, x)])
+        rotatedX = cosX + sinY
+        rotatedY = cosY - sinX
+        return angle + self.getArctanSeries(rotatedY / rotatedX)
+    
+    '''
+    the angle q pi/2 + a closest to a float, where a is a knot of the trig 
+    table, with its sin and cos from the table. The angle that is left for the
+    arctan series is at most half a step instead of 1e-15, so it takes more
+    terms, but those are much cheaper than sin and cos.
+    '''
+    def getTableAngle(self, angleFloat):
+        quadrant = round(angleFloat / (math.pi / 2))
+        knot = self.trigTable.getNearestKnot(angleFloat - quadrant * (math.pi / 2))
+        sinKnot, cosKnot = self.trigTable.getSinCos(knot)
+        angle = self.trigTable.getKnotAngle(knot)
+        if(quadrant != 0):
+            angle += BigPreciseNum.BigPreciseNum.fromRatio(quadrant, 1) * self.piOverTwo
+        
+        quadrant %= 4
+        if(quadrant == 0):
+            return angle, sinKnot, cosKnot
+        elif(quadrant == 1):
+            return angle, cosKnot, -sinKnot
+        elif(quadrant == 2):
+            return angle, -sinKnot, -cosKnot
+        return angle, -cosKnot, sinKnot
+    
+    #arctan(x) = x (1 - x^2/3 + x^4/5 - ...) in Horner form for a small x
+    def getArctanSeries(self, x):
+        xFloat = x.getFloat()
+        if(xFloat == 0):
+            self.numArctanTerms = 0
+            return x
+        
+        lastTerm = self.getLastArctanTerm(xFloat)
+        self.numArctanTerms = lastTerm + 1
+        
+        xSquared = x * x
+        total = self.getArctanCoefficient(lastTerm)
+        for n in range(lastTerm - 1, -1, -1):
+            total = self.getArctanCoefficient(n) + xSquared * total
+        return x * total
+    
+    #the last n the arctan series needs before its terms are smaller than the
+    #last decimal place, worked out with floats like getLastSeriesPower
+    def getLastArctanTerm(self, x):
+        logX = math.log10(abs(x))
+        lastDigit = -(BigPreciseNum.BigPreciseNum.DECIMAL_POINT_LOCATION + 1)
+        lastTerm = 0
+        while(((2 * lastTerm + 3) * logX - math.log10(2 * lastTerm + 3)) > lastDigit):
+            lastTerm += 1
+        return lastTerm
+    
+    #(-1)^n / (2n + 1) for every n the series of arguments up to maxArgument
+    #need, calculated on the host
+    def getArctanCoefficients(self, maxArgument):
+        coefficients = []
+        for n in range(0, self.getLastArctanTerm(maxArgument) + 1):
+            sign = 1 if (n % 2 == 0) else -1
+            coefficients.append(BigPreciseNum.BigPreciseNum.fromRatio(sign, 2 * n + 1))
+        return coefficients
+    
+    def getArctanCoefficient(self, n):
+        if(n >= len(self.arctanCoefficients)):
+            raise Exception("the arctan series only goes up to arguments of " + str(self.ARCTAN_MAX_ARGUMENT))
+        return self.arctanCoefficients[n]
              
          
+    '''
+    returns 1/n! with the sign of the nth term of the sin and cos series, 
+    (-1)^(n/2) / n!, for every n the series of arguments up to maxArgument 
+    need. They are calculated on the host.
+    '''
+    def getSeriesCoefficients(self, maxArgument):
+        lastPower = max(self.getLastSeriesPower(maxArgument, 0), self.getLastSeriesPower(maxArgument, 1))
+        coefficients = []
+        factorial = 1
+        for n in range(0, lastPower + 1):
+            factorial *= max(n, 1)
+            sign = 1 if (n % 4 < 2) else -1
+            coefficients.append(BigPreciseNum.BigPreciseNum.fromRatio(sign, factorial))
+        return coefficients
+    
+    def getSeriesCoefficient(self, n):
+        if(n >= len(self.seriesCoefficients)):
+            raise Exception("the sin and cos series only go up to arguments of " + str(self.SERIES_MAX_ARGUMENT) + 
+                            ", reduce the argument first")
+        return self.seriesCoefficients[n]
+    
+    '''
+    the highest power of x the sin (firstPower 1) or cos (firstPower 0) 
+    series needs before its terms are smaller than the last decimal place.
+    It is worked out with floats since it doesn't need to be exact.
+    '''
+    def getLastSeriesPower(self, x, firstPower):
+        logX = math.log10(abs(x))
+        lastDigit = -(BigPreciseNum.BigPreciseNum.DECIMAL_POINT_LOCATION + 1)
+        n = firstPower
+        while(((n + 2) * logX - math.lgamma(n + 3) / self.LN_OF_TEN) > lastDigit):
+            n += 2
+        return n
+    
+    '''
+    the sin or cos series of a reduced argument in Horner form, 
+    c_1 x + c_3 x^3 + ... = x (c_1 + x^2 (c_3 + x^2 (c_5 + ...))), so every 
+    term is one multiplication and one addition
+    '''
+    def getSeries(self, x, firstPower):
+        xFloat = x.getFloat()
+        if(xFloat == 0):
+            self.numSeriesTerms = 0
+            if(firstPower == 0):
+                return self.one
+            return self.zero
+        
+        lastPower = self.getLastSeriesPower(xFloat, firstPower)
+        self.numSeriesTerms = (lastPower - firstPower) // 2 + 1
+        
+        xSquared = x * x
+        total = self.getSeriesCoefficient(lastPower)
+        for n in range(lastPower - 2, firstPower - 1, -2):
+            total = self.getSeriesCoefficient(n) + xSquared * total
+        
+        if(firstPower == 1):
+            total = x * total
+        return total
+    
+    '''
+    reduces x to r = x - q * pi/2 with |r| <= pi/4, so the series needs few
+    terms, and returns q % 4 and r. q is rounded from the float of x since 
+    it only decides which interval r lands in.
+    '''
+    def reduceArgument(self, bpn):
+        quadrant = round(bpn.getFloat() / (math.pi / 2))
+        if(quadrant == 0):
+            return 0, bpn
+        return quadrant % 4, bpn - BigPreciseNum.BigPreciseNum.fromRatio(quadrant, 1) * self.piOverTwo
+    
+    #sin and cos are found to the last decimal place. The argument is reduced
+    #to [-pi/4, pi/4] and sin(x + q pi/2) is put back together from the sin
+    #or cos of the reduced argument
     def cos(self, bpn):
-        return self.sin((self.pi / self.two) - bpn)
-    
-    #sin is found to an accuracy of 150 decimal places. Typically, most 
-    #computers store the trig function values to an accuracy of 8 decimal 
-    #places via LUT(look up tables) for an execution time of O(1) and then
-    #intelligently approximate the remaining decimal places. However, these
-    #approximations are close to the true value but still technically incorrect.
-    #this project needs this value to be incredibly accurate and precise.
-    #
-    #this function uses the series expansion and keeps calculating terms until
-    #the new term is less than self.precision. If self.precision is 1e-150, 
-    #that means arcsin is accurate to 150 places past the decimal place.
+        quadrant, reduced = self.reduceArgument(bpn)
+        if(quadrant == 0):
+            return self.getReducedCos(reduced)
+        elif(quadrant == 1):
+            return -self.getReducedSin(reduced)
+        elif(quadrant == 2):
+            return -self.getReducedCos(reduced)
+        return self.getReducedSin(reduced)
+    
     def sin(self, bpn):
+        quadrant, reduced = self.reduceArgument(bpn)
+        if(quadrant == 0):
+            return self.getReducedSin(reduced)
+        elif(quadrant == 1):
+            return self.getReducedCos(reduced)
+        elif(quadrant == 2):
+            return -self.getReducedSin(reduced)
+        return -self.getReducedCos(reduced)
+    
+    '''
+    the table needs the sin and cos series of the offset from the knot, plus 
+    about two terms' worth of operations to put them together, so it is only
+    used when that is fewer terms than the series of the argument itself. 
+    Small arguments, like the angles of one time step, have short series 
+    anyway.
+    '''
+    def isTableUsed(self, reduced, firstPower):
+        if(not self.trigTable.isLoaded()):
+            return False
+        reducedFloat = reduced.getFloat()
+        knot = self.trigTable.getNearestKnot(reducedFloat)
+        if(knot == 0):
+            return False
+        offsetFloat = reducedFloat - knot / (1 << self.trigTable.stepBits)
+        if(offsetFloat == 0):
+            return True
         
-         a = BigPreciseNum.BigPreciseNum(bpn)
-         
-         sumBpn = BigPreciseNum.BigPreciseNum(a)
-         newTerm = BigPreciseNum.BigPreciseNum(a)
-         
-         denominator = BigPreciseNum.BigPreciseNum(self.one)
-         oneTerm = BigPreciseNum.BigPreciseNum(self.one)
-         counter = BigPreciseNum.BigPreciseNum(self.one)
-
-         
-         numerator = BigPreciseNum.BigPreciseNum(a)
-         precision = BigPreciseNum.BigPreciseNum(self.precision)
-         
-         previousTerm = None
-
-         while(newTerm.internalNumber > precision.internalNumber):
-             
-             if(previousTerm is not None):
-                 previousTerm *= BigPreciseNum.BigPreciseNum(self.two)
-                 if(newTerm.internalNumber >= previousTerm.internalNumber):
-                     break
-             
-             previousTerm = BigPreciseNum.BigPreciseNum(newTerm)
-             numerator *= a
-             numerator *= a
-             
-
-             counter += self.one
-             denominator *= counter
-             counter += self.one
-             denominator *= counter
-
-
-             oneTerm *= self.negOne
-             newTerm = (oneTerm * numerator) / denominator
-
-             sumBpn += newTerm
-
-             
-             
-         
-         if(sumBpn > self.one):
-             sumBpn = BigPreciseNum.BigPreciseNum(self.one)
-         if(sumBpn < self.negOne):
-             sumBpn = BigPreciseNum.BigPreciseNum(self.negOne)
-              
-         return sumBpn
-     
-    #binary search for sqrt
+        numSeriesTerms = (self.getLastSeriesPower(reducedFloat, firstPower) - firstPower) // 2 + 1
+        numTableTerms = (self.getLastSeriesPower(offsetFloat, 1) + 1) // 2 + self.getLastSeriesPower(offsetFloat, 0) // 2 + 1
+        return numTableTerms + 2 < numSeriesTerms
+    
+    '''
+    sin and cos of the same angle, as (sin, cos), from one reduced argument. 
+    With the table both come from the same knot. Without it cos of the 
+    reduced argument is sqrt(1 - sin^2), which is at least sqrt(1/2) there so
+    it doesn't lose any digits, and one sqrt is cheaper than a second series
+    unless the series is very short.
+    '''
+    def sincos(self, bpn):
+        quadrant, reduced = self.reduceArgument(bpn)
+        sinReduced, cosReduced = self.getReducedSinCos(reduced)
+        if(quadrant == 0):
+            return sinReduced, cosReduced
+        elif(quadrant == 1):
+            return cosReduced, -sinReduced
+        elif(quadrant == 2):
+            return -sinReduced, -cosReduced
+        return -cosReduced, sinReduced
+    
+    def getReducedSinCos(self, reduced):
+        if(self.isTableUsed(reduced, 0)):
+            return self.getTableSinCos(reduced)
+        
+        sinReduced = self.getSeries(reduced, 1)
+        reducedFloat = reduced.getFloat()
+        if(reducedFloat == 0 or 
+           self.getLastSeriesPower(reducedFloat, 0) // 2 + 1 <= self.SINCOS_SERIES_TERMS):
+            numSinTerms = self.numSeriesTerms
+            cosReduced = self.getSeries(reduced, 0)
+            self.numSeriesTerms += numSinTerms
+            return sinReduced, cosReduced
+        
+        return sinReduced, self.sqrt((self.one - sinReduced) * (self.one + sinReduced))
+    
+    def getReducedSin(self, reduced):
+        if(self.isTableUsed(reduced, 1)):
+            return self.getTableSinCos(reduced)[0]
+        return self.getSeries(reduced, 1)
+    
+    def getReducedCos(self, reduced):
+        if(self.isTableUsed(reduced, 0)):
+            return self.getTableSinCos(reduced)[1]
+        return self.getSeries(reduced, 0)
+    
+    '''
+    sin and cos of a reduced argument from the nearest knot a of the trig 
+    table, sin(a + d) = sin(a) cos(d) + cos(a) sin(d) and 
+    cos(a + d) = cos(a) cos(d) - sin(a) sin(d). d is at most half a step, so 
+    both series together are shorter than the series of the argument.
+    '''
+    def getTableSinCos(self, reduced):
+        knot = self.trigTable.getNearestKnot(reduced.getFloat())
+        sinKnot, cosKnot = self.trigTable.getSinCos(knot)
+        offset = reduced - self.trigTable.getKnotAngle(knot)
+        
+        sinOffset = self.getSeries(offset, 1)
+        numSinTerms = self.numSeriesTerms
+        cosOffset = self.getSeries(offset, 0)
+        self.numSeriesTerms += numSinTerms
+        
+        sinCos, cosSin, cosCos, sinSin = BigPreciseNum.BigPreciseNum.multiplyMany([(sinKnot, cosOffset), (cosKnot, sinOffset), 
+                                                                                   (cosKnot, cosOffset), (sinKnot, sinOffset)])
+        return sinCos + cosSin, cosCos - sinSin
+    
+    '''
+    Newton's method for sqrt, x = (x + bpn / x) / 2, starting from the float
+    sqrt. The float is right to about 16 digits and every iteration doubles 
+    the number of right digits, so 160 digits take about 4 iterations. Since
+    the divisions round down, after the first iteration x is never below the
+    root and it keeps getting smaller until it is the root rounded down to 
+    the last place, which is when the next x isn't any smaller.
+    '''
     def sqrt(self, bpn):
 
         if(bpn > self.maxNumForSqrt):
             raise Exception("number too large to take sqrt " + bpn.getStr())
-
-        if(bpn == self.one):
-            return BigPreciseNum.BigPreciseNum(self.one)
-        minimum = BigPreciseNum.BigPreciseNum(self.zero)
-        maximum = BigPreciseNum.BigPreciseNum(bpn)
-        if(maximum < self.one):
-            maximum = BigPreciseNum.BigPreciseNum(self.one)
-        middle = BigPreciseNum.BigPreciseNum(self.precision)
-        prevMiddle = None
-        
-        diff = (middle * middle) - bpn
-        while(diff.internalNumber > self.precision.internalNumber):
-
-            middle = (minimum + maximum) / self.two
-            
-            if prevMiddle is not None and prevMiddle == middle:
-                return middle
-            prevMiddle = middle
-            
-            squareValue = middle * middle
-            
-            if(squareValue == bpn):
-                return middle
-            
-            if(squareValue > bpn):
-                maximum = middle
-            else:
-                minimum = middle
-
-            diff = (middle * middle) - bpn
-            
-        return middle
+        if(bpn < self.zero):
+            raise Exception("can't take the sqrt of a negative number " + bpn.getStr())
+        if(bpn == self.zero):
+            return self.zero
+        
+        root = BigPreciseNum.BigPreciseNum.fromFloat(math.sqrt(bpn.getFloat()))
+        
+        self.numSqrtIterations = 1
+        nextRoot = (root + bpn / root) / self.two
+        while(True):
+            root = nextRoot
+            nextRoot = (root + bpn / root) / self.two
+            self.numSqrtIterations += 1
+            if(not(nextRoot < root)):
+                return root
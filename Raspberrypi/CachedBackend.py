@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+CachedBackend remembers the results of the last operations it forwarded to 
+its backend and answers repeated operations from memory. The simulation asks
+the fpga the same things over and over, e.g. pi / two in every cos and arccos
+or the BpnMath constants multiplied together for every LightCharge, and each
+of those is a full SPI round trip otherwise.
+
+The cache is keyed on the opcode and both operands as ints. It holds at
+most maxSize bytes of keys and results and evicts the least recently used 
+results first. The fpga always returns the same result for the same 
+operation, so a cached result is never stale.
+'''
+
+import collections
+import threading
+import AluBackend
+
+
+class CachedBackend(AluBackend.AluBackend):
+    
+    #about 20000 operations
+    DEFAULT_MAX_SIZE = 8 * 1024 * 1024
+    
+    #the key is the opcode and two operands, the value is the result
+    ENTRY_SIZE = 4 * AluBackend.AluBackend.OPERAND_LENGTH + 1
+    
+    backend = None
+    
+    def __init__(self, backend, maxSize=DEFAULT_MAX_SIZE):
+        self.backend = backend
+        self.maxEntries = max(1, maxSize // self.ENTRY_SIZE)
+        self.results = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.resetCounters()
+        
+    def resetCounters(self):
+        self.numHits = 0
+        self.numMisses = 0
+        self.numEvictions = 0
+        
+    def getSize(self):
+        return len(self.results) * self.ENTRY_SIZE
+    
+    def getHitRate(self):
+        numLookups = self.numHits + self.numMisses
+        if(numLookups == 0):
+            return 0.0
+        return self.numHits / numLookups
+    
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+        
+    def getKey(self, operationType, operand1, operand2):
+        return (operationType, int.from_bytes(bytes(operand1), "big"), int.from_bytes(bytes(operand2), "big"))
+    
+    #returns the cached result or None, and counts the hit or miss
+    def lookup(self, key):
+        with self.lock:
+            result = self.results.get(key)
+            if(result is None):
+                self.numMisses += 1
+                return None
+            self.results.move_to_end(key)
+            self.numHits += 1
+            return result
+        
+    #result is an int
+    def store(self, key, result):
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while(len(self.results) > self.maxEntries):
+                self.results.popitem(last=False)
+                self.numEvictions += 1
+        
+    def calculate(self, operationType, operand1, operand2):
+        key = self.getKey(operationType, operand1, operand2)
+        result = self.lookup(key)
+        if(result is not None):
+            return self.getHexArr(result)
+        
+        result = self.backend.calculate(operationType, operand1, operand2)
+        self.store(key, int.from_bytes(bytes(result), "big"))
+        return result
+    
+    def calculateInt(self, operationType, operand1, operand2):
+        key = (operationType, operand1, operand2)
+        result = self.lookup(key)
+        if(result is not None):
+            return result
+        
+        result = self.backend.calculateInt(operationType, operand1, operand2)
+        self.store(key, result)
+        return result
+    
+    #only the operations that aren't cached are sent to the backend
+    def calculateMany(self, operations):
+        results = []
+        missing = []
+        for operationType, operand1, operand2 in operations:
+            key = self.getKey(operationType, operand1, operand2)
+            result = self.lookup(key)
+            if(result is None):
+                missing.append((len(results), key, (operationType, operand1, operand2)))
+            else:
+                result = self.getHexArr(result)
+            results.append(result)
+            
+        if(len(missing) > 0):
+            missingResults = self.backend.calculateMany([operation for i, key, operation in missing])
+            for j in range(0, len(missing)):
+                i, key, operation = missing[j]
+                self.store(key, int.from_bytes(bytes(missingResults[j]), "big"))
+                results[i] = missingResults[j]
+        return results
+    
+    def pinConstant(self, operand):
+        return self.backend.pinConstant(operand)
+    
+    def getFrameLength(self, operationType):
+        return self.backend.getFrameLength(operationType)
+    
+    def getPool(self):
+        return self.backend.getPool()
+    
+    #returns the backend that was cached
+    def stopCaching(self):
+        self.clear()
+        return self.backend
+    
+    def close(self):
+        self.clear()
+        if(self.backend is not None):
+            self.backend.close()
+            self.backend = None
@@ -24,72 +24,275 @@ THE SOFTWARE.
 '''
 
 
+
 '''
 This class is meant to interface over SPI with the alchitry au+ fpga using the
 spidev library. The fpga emulates an ALU(arithmetic logic unit) which is 
 basically a calculator for ints. This python calculator class, encapsulates 
 that functionality.
+
+The actual work is forwarded to a backend. By default this is the SpiBackend 
+which talks to the fpga, but the SoftwareBackend can be used to run the 
+simulation on a computer without the fpga. The backend can either be passed in
+the first time the calculator is created or selected with the 
+LIGHT_CHARGE_BACKEND environment variable, e.g.
+    $> LIGHT_CHARGE_BACKEND=software python3 LightChargeSimulator.py
+    
+The SPI clock can be set with LIGHT_CHARGE_SPI_SPEED, either to one of
+SpiBackend.SUPPORTED_SPEEDS_HZ or to "auto" to calibrate it at startup, and
+LIGHT_CHARGE_VERIFY_RATE sets the fraction of fpga results that are checked
+against the software backend, see CheckedBackend.
+    $> LIGHT_CHARGE_SPI_SPEED=auto LIGHT_CHARGE_VERIFY_RATE=0.01 python3 LightChargeSimulator.py
+    
+LIGHT_CHARGE_SHORT_FRAMES=1 sends LT, EQ, ADD and SUB in the shorter frames of
+FrameLayout. The fpga has to be built with the current alu.luc for that, so
+the frames are checked at startup and the full frames are kept if the fpga 
+doesn't answer the short ones, see SpiBackend.checkShortFrames.
+    $> LIGHT_CHARGE_SHORT_FRAMES=1 python3 LightChargeSimulator.py
+    
+With more than one fpga, LIGHT_CHARGE_SPI_DEVICES lists the spidev bus and
+device of each one and the operations are spread over them by a 
+CalculatorPool. LIGHT_CHARGE_POOL_SIZE does the same with that many software
+backends.
+    $> LIGHT_CHARGE_SPI_DEVICES=0.0,0.1 python3 LightChargeSimulator.py
+    
+startStats counts the operations per opcode and calling function, see 
+AluStats. LIGHT_CHARGE_STATS starts them and names the json file they are 
+written to when the program exits.
+    $> LIGHT_CHARGE_STATS=aluStats.json python3 LightChargeSimulator.py
+    
+startRecording writes every operation to an alu transcript, see 
+AluTranscript, and the replay backend plays a transcript back without the 
+fpga. LIGHT_CHARGE_RECORD records the whole run to the given file and 
+LIGHT_CHARGE_TRANSCRIPT names the transcript for the replay backend.
+    $> LIGHT_CHARGE_RECORD=run.alut python3 LightChargeSimulator.py
+    $> LIGHT_CHARGE_BACKEND=replay LIGHT_CHARGE_TRANSCRIPT=run.alut python3 LightChargeSimulator.py
+    
+startCache answers repeated operations from memory, see CachedBackend. 
+LIGHT_CHARGE_CACHE_SIZE starts it with that many bytes.
+    $> LIGHT_CHARGE_CACHE_SIZE=8388608 python3 LightChargeSimulator.py
+    
+LIGHT_CHARGE_HYBRID calculates some operation types on the host and sends 
+only the rest to the fpga, see HybridBackend. It is either a comma separated
+list of OperationType names, "default" for LT, EQ, ADD and SUB or "auto" to 
+time the operations at startup and pick the faster side for each.
+    $> LIGHT_CHARGE_HYBRID=LESS_THAN,EQUALS,ADDITION,SUBTRACTION python3 LightChargeSimulator.py
 '''
 
 from Singleton import singleton
-import spidev
 from enum import Enum
+import atexit
+import os
+import time
+import AluBackend
+import CalculatorPool
 
 
 @singleton
 class Calculator:
 
     class OperationType(Enum):
-        LESS_THAN = 0
-        EQUALS = 1
-        ADDITION = 2
-        SUBTRACTION = 3
-        MULTIPLICATION = 4
-        DIVISION = 5
+        LESS_THAN = AluBackend.AluBackend.LESS_THAN
+        EQUALS = AluBackend.AluBackend.EQUALS
+        ADDITION = AluBackend.AluBackend.ADDITION
+        SUBTRACTION = AluBackend.AluBackend.SUBTRACTION
+        MULTIPLICATION = AluBackend.AluBackend.MULTIPLICATION
+        DIVISION = AluBackend.AluBackend.DIVISION
         
     #each operand is 1200 bits which translates to 1200 / 8 = 150 bytes
-    OPERAND_LENGTH = 150 
+    OPERAND_LENGTH = AluBackend.AluBackend.OPERAND_LENGTH
     
+    BACKEND_ENV_STR = "LIGHT_CHARGE_BACKEND"
+    SPI_BACKEND_STR = "spi"
+    SOFTWARE_BACKEND_STR = "software"
+    REPLAY_BACKEND_STR = "replay"
+    SPI_SPEED_ENV_STR = "LIGHT_CHARGE_SPI_SPEED"
+    AUTO_SPEED_STR = "auto"
+    VERIFY_RATE_ENV_STR = "LIGHT_CHARGE_VERIFY_RATE"
+    SHORT_FRAMES_ENV_STR = "LIGHT_CHARGE_SHORT_FRAMES"
+    SHORT_FRAMES_ON_STR = "1"
+    SPI_DEVICES_ENV_STR = "LIGHT_CHARGE_SPI_DEVICES"
+    POOL_SIZE_ENV_STR = "LIGHT_CHARGE_POOL_SIZE"
+    DEVICE_SEPARATOR_STR = ","
+    BUS_SEPARATOR_STR = "."
+    STATS_ENV_STR = "LIGHT_CHARGE_STATS"
+    RECORD_ENV_STR = "LIGHT_CHARGE_RECORD"
+    TRANSCRIPT_ENV_STR = "LIGHT_CHARGE_TRANSCRIPT"
+    CACHE_SIZE_ENV_STR = "LIGHT_CHARGE_CACHE_SIZE"
+    HYBRID_ENV_STR = "LIGHT_CHARGE_HYBRID"
+    DEFAULT_HYBRID_STR = "default"
+    AUTO_HYBRID_STR = "auto"
     
 
-    spi = None
+    backend = None
+    stats = None
     zeroArr = [0x00] * OPERAND_LENGTH
     
     
-    def __init__(self):
+    def __init__(self, backend=None):
+        if(backend is None):
+            backend = self.getBackend(os.environ.get(self.BACKEND_ENV_STR, self.SPI_BACKEND_STR))
+        self.backend = backend
         
-        bus = 0
-
-        device = 1
-
-        self.spi = spidev.SpiDev()
-
-        self.spi.open(bus, device)
-
-        '''
-        acceptable spi speeds for the raspberry pi 2 
-        that are compatible with the code
-        on the alchitry fpga
-        62500000
-        31200000
-        15600000
-        7800000 # selected
-        3900000
-        1953000
-        976000
-        488000
-        244000
-        122000
-        61000
-        30500
-        15200
-        7629
-        '''
-        self.spi.max_speed_hz = 7800000
-        self.spi.mode = 3
+        cacheSize = int(os.environ.get(self.CACHE_SIZE_ENV_STR, "0"))
+        if(cacheSize > 0):
+            self.startCache(cacheSize)
+        
+        statsPath = os.environ.get(self.STATS_ENV_STR)
+        if(statsPath is not None):
+            self.startStats()
+            atexit.register(self.stats.dump, statsPath)
+            
+        recordPath = os.environ.get(self.RECORD_ENV_STR)
+        if(recordPath is not None):
+            self.startRecording(recordPath)
+            atexit.register(self.stopRecording)
         
     def __del__(self):
-        self.spi.close()
+        if(self.backend is not None):
+            self.backend.close()
+            
+    '''
+    backendStr should be "spi", "software" or "replay". The backend modules 
+    are only imported when they are needed so that spidev doesn't have to be
+    installed to use the software backend.
+    '''
+    def getBackend(self, backendStr):
+        if(backendStr == self.SPI_BACKEND_STR):
+            devicesStr = os.environ.get(self.SPI_DEVICES_ENV_STR)
+            if(devicesStr is None):
+                backend = self.getSpiBackend()
+            else:
+                backends = []
+                for deviceStr in devicesStr.split(self.DEVICE_SEPARATOR_STR):
+                    bus, device = deviceStr.split(self.BUS_SEPARATOR_STR)
+                    backends.append(self.getSpiBackend(int(bus), int(device)))
+                backend = self.getPool(backends)
+            
+            hybridStr = os.environ.get(self.HYBRID_ENV_STR)
+            if(hybridStr is not None):
+                backend = self.getHybridBackend(backend, hybridStr)
+            return backend
+        
+        if(backendStr == self.SOFTWARE_BACKEND_STR):
+            import SoftwareBackend
+            poolSize = int(os.environ.get(self.POOL_SIZE_ENV_STR, "1"))
+            if(poolSize == 1):
+                return SoftwareBackend.SoftwareBackend()
+            return self.getPool([SoftwareBackend.SoftwareBackend() for i in range(0, poolSize)])
+        
+        if(backendStr == self.REPLAY_BACKEND_STR):
+            import ReplayBackend
+            return ReplayBackend.ReplayBackend(os.environ[self.TRANSCRIPT_ENV_STR])
+        raise Exception("invalid calculator backend " + backendStr)
+    
+    def getHybridBackend(self, backend, hybridStr):
+        import HybridBackend
+        if(hybridStr == self.DEFAULT_HYBRID_STR):
+            return HybridBackend.HybridBackend(backend)
+        if(hybridStr == self.AUTO_HYBRID_STR):
+            hybridBackend = HybridBackend.HybridBackend(backend)
+            localOperations = hybridBackend.autoTune()
+            print("calculating " + str([self.OperationType(operationType).name for operationType in localOperations]) + " on the host")
+            return hybridBackend
+        
+        localOperations = []
+        for name in hybridStr.split(self.DEVICE_SEPARATOR_STR):
+            localOperations.append(self.OperationType[name].value)
+        return HybridBackend.HybridBackend(backend, localOperations)
+        
+    def getPool(self, backends):
+        return CalculatorPool.CalculatorPool(backends)
+        
+    def getSpiBackend(self, bus=None, device=None):
+        import SpiBackend
+        useShortFrames = (os.environ.get(self.SHORT_FRAMES_ENV_STR) == self.SHORT_FRAMES_ON_STR)
+        if(bus is None):
+            backend = SpiBackend.SpiBackend(useShortFrames=useShortFrames)
+        else:
+            backend = SpiBackend.SpiBackend(bus, device, useShortFrames=useShortFrames)
+            
+        #before the calibration, which would fail at every speed if the fpga
+        #doesn't answer the short frames
+        if(useShortFrames and not backend.checkShortFrames()):
+            print("the fpga doesn't answer short frames, rebuild it with the current alu.luc. using the full frames")
+        
+        speedStr = os.environ.get(self.SPI_SPEED_ENV_STR)
+        if(speedStr == self.AUTO_SPEED_STR):
+            speed = backend.calibrate()
+            print("calibrated spi speed is " + str(speed) + "Hz")
+        elif(speedStr is not None):
+            backend.setSpeed(int(speedStr))
+            
+        verifyRate = float(os.environ.get(self.VERIFY_RATE_ENV_STR, "0"))
+        if(verifyRate > 0):
+            import CheckedBackend
+            backend = CheckedBackend.CheckedBackend(backend, verifyRate)
+        return backend
+        
+    #swaps the backend, e.g. to check the fpga against the software backend
+    def setBackend(self, backend):
+        previousBackend = self.backend
+        self.backend = backend
+        return previousBackend
+        
+    '''
+        returns [function(item) for item in items]. With a CalculatorPool the 
+        items are spread over the devices and run at the same time, e.g. one
+        light charge update per fpga. The pool is found under the backends 
+        that wrap it, like the cache or the recording, and the operations 
+        still go through those.
+    '''
+    def map(self, function, items):
+        pool = self.backend.getPool()
+        if(pool is not None):
+            return pool.map(function, items)
+        return [function(item) for item in items]
+        
+    #starts counting the operations, returns the AluStats
+    def startStats(self):
+        import AluStats
+        if(self.stats is None):
+            self.stats = AluStats.AluStats()
+        return self.stats
+        
+    def stopStats(self):
+        stats = self.stats
+        self.stats = None
+        return stats
+        
+    def recordStats(self, operationType, start):
+        seconds = time.perf_counter() - start
+        self.stats.record(operationType, self.stats.getCaller(), 
+                          self.backend.getFrameLength(operationType), seconds)
+        
+    #writes every operation from now on to the transcript at path
+    def startRecording(self, path):
+        import RecordingBackend
+        self.setBackend(RecordingBackend.RecordingBackend(self.backend, path))
+        
+    def stopRecording(self):
+        import RecordingBackend
+        if(isinstance(self.backend, RecordingBackend.RecordingBackend)):
+            self.setBackend(self.backend.stopRecording())
+        
+    '''
+        from now on results are cached and repeated operations don't go to
+        the backend. returns the CachedBackend for its hit and miss counters
+    '''
+    def startCache(self, maxSize=None):
+        import CachedBackend
+        if(isinstance(self.backend, CachedBackend.CachedBackend)):
+            return self.backend
+        if(maxSize is None):
+            maxSize = CachedBackend.CachedBackend.DEFAULT_MAX_SIZE
+        self.setBackend(CachedBackend.CachedBackend(self.backend, maxSize))
+        return self.backend
+        
+    def stopCache(self):
+        import CachedBackend
+        if(isinstance(self.backend, CachedBackend.CachedBackend)):
+            self.setBackend(self.backend.stopCaching())
         
     '''
         operation type should be
@@ -100,45 +303,101 @@ class Calculator:
         4 -> multiply
         5 -> divide
         
-        operand1 and operand2 should be hex strings
+        operand1 and operand2 should be hex arrays
         
-        returns, 1 or 0 in a hex string for true or false for 'less than' or
-                equal operation types, or a result hex string for the other 
+        returns, 1 or 0 in a hex array for true or false for 'less than' or
+                equal operation types, or a result hex array for the other 
                 operation types
     '''              
     def calculate(self, operationType, operand1, operand2):
+        self.checkOperation(operationType, operand1, operand2)
+        
+        if(self.stats is not None):
+            start = time.perf_counter()
+            result = self.calculateUnrecorded(operationType, operand1, operand2)
+            self.recordStats(operationType, start)
+            return result
+        return self.calculateUnrecorded(operationType, operand1, operand2)
+    
+    def calculateUnrecorded(self, operationType, operand1, operand2):
+        return self.backend.calculate(operationType, operand1, operand2)
+    
+    '''
+        same as calculate, but the operands and the result are ints in the 
+        range [0, 2^1200) instead of hex arrays. This is what BigInt uses, 
+        the operands are only turned into bytes when they are sent to the 
+        fpga.
+    '''
+    def calculateInt(self, operationType, operand1, operand2):
         if( operationType < 0 or operationType > 5):
             raise Exception("invalid operation type")
-        if(len(operand1) != self.OPERAND_LENGTH or len(operand2) != self.OPERAND_LENGTH):
-            raise Exception("invalid hex arr size")
         
-        #sending the operation type
-        to_send = [operationType]
-
-        #sending first operator
-        for i in range(len(operand1)):
-            to_send.append(operand1[i])
-            
-        #sending second operator
-        for i in range(len(operand2)):
-            to_send.append(operand2[i])
-            
-        #calculation operation, effectively allow time to calculate the result
-        #of the calculation
-        for i in range(0, self.OPERAND_LENGTH):
-            to_send.append(0x00)
-
+        if(self.stats is not None):
+            start = time.perf_counter()
+            result = self.calculateIntUnrecorded(operationType, operand1, operand2)
+            self.recordStats(operationType, start)
+            return result
+        return self.calculateIntUnrecorded(operationType, operand1, operand2)
+    
+    def calculateIntUnrecorded(self, operationType, operand1, operand2):
+        return self.backend.calculateInt(operationType, operand1, operand2)
+    
+    '''
+        operations is a list of (operationType, operand1, operand2) tuples
+        where no operation depends on the result of another one. They are
+        sent to the fpga together, which saves the overhead of a separate 
+        transfer per operation.
         
-        #allowing time to write the result back to the device
-        for i in range(0, self.OPERAND_LENGTH):
-            to_send.append(0x00)
+        returns the list of results in the same order as the operations
+    '''
+    def calculateMany(self, operations):
+        for operationType, operand1, operand2 in operations:
+            self.checkOperation(operationType, operand1, operand2)
             
+        start = time.perf_counter()
+        results = self.backend.calculateMany(operations)
+            
+        #the batch's time is split evenly between its operations
+        if(self.stats is not None and len(operations) > 0):
+            seconds = (time.perf_counter() - start) / len(operations)
+            caller = self.stats.getCaller()
+            for operationType, operand1, operand2 in operations:
+                self.stats.record(operationType, caller, self.backend.getFrameLength(operationType), seconds)
+        return results
+    
+    '''
+        same as calculateMany, but the operands and the results are ints
+        like in calculateInt. BigInt.calculateMany uses this for the
+        components of a vector.
+    '''
+    def calculateManyInt(self, operations):
+        for operationType, operand1, operand2 in operations:
+            if( operationType < 0 or operationType > 5):
+                raise Exception("invalid operation type")
 
-        response = self.spi.xfer(to_send)
-        output = response[len(response) - self.OPERAND_LENGTH: len(response)]
-
-
-        return output
-        
+        start = time.perf_counter()
+        results = self.backend.calculateManyInt(operations)
 
+        if(self.stats is not None and len(operations) > 0):
+            seconds = (time.perf_counter() - start) / len(operations)
+            caller = self.stats.getCaller()
+            for operationType, operand1, operand2 in operations:
+                self.stats.record(operationType, caller, self.backend.getFrameLength(operationType), seconds)
+        return results
 
+    '''
+        tells the backend that operand is a constant that is used over and
+        over, so a backend with registers can keep it on the device instead
+        of sending it with every operation. Pinned constants belong to the
+        backend, so they have to be pinned again after setBackend.
+    '''
+    def pinConstant(self, operand):
+        if(len(operand) != self.OPERAND_LENGTH):
+            raise Exception("invalid hex arr size")
+        return self.backend.pinConstant(operand)
+    
+    def checkOperation(self, operationType, operand1, operand2):
+        if( operationType < 0 or operationType > 5):
+            raise Exception("invalid operation type")
+        if(len(operand1) != self.OPERAND_LENGTH or len(operand2) != self.OPERAND_LENGTH):
+            raise Exception("invalid hex arr size")
@@ -0,0 +1,1239 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+CalculatorBenchmark times the different ways of getting operations to the ALU
+on a computer without the fpga. The fpga is replaced by a FakeSpiDevice that
+sleeps for as long as the transfer would take, so the numbers are estimates of
+the time spent on SPI rather than exact measurements.
+
+    $> python3 CalculatorBenchmark.py batching
+    
+Arguments for a benchmark go after a colon, e.g. the pool benchmark with 
+500us per transfer
+    $> python3 CalculatorBenchmark.py pool:0.0005
+'''
+
+import os
+import sys
+import time
+import AluBackend
+import AluCheck
+import BigPreciseNum
+import CachedBackend
+import Calculator
+import CalculatorPool
+import FakeSpiDevice
+import RegisterAlu
+import RegisterFileBackend
+import SoftwareBackend
+import SpiBackend
+
+
+NUM_OPERATIONS = 300
+SEED = 0
+
+'''
+returns the results and the seconds it took to run function
+'''
+def timeFunction(function, *args):
+    start = time.perf_counter()
+    results = function(*args)
+    end = time.perf_counter()
+    return results, end - start
+
+def getRandomOperations(numOperations=NUM_OPERATIONS):
+    return AluCheck.getOperations(numOperations, SEED)[-numOperations:]
+
+def calculateEach(backend, operations):
+    results = []
+    for operationType, operand1, operand2 in operations:
+        results.append(backend.calculate(operationType, operand1, operand2))
+    return results
+
+def checkResults(results, operations):
+    expected = SoftwareBackend.SoftwareBackend().calculateMany(operations)
+    for i in range(0, len(results)):
+        if(list(results[i]) != list(expected[i])):
+            raise Exception("result " + str(i) + " doesn't match the software backend")
+
+'''
+sends the same operations once with a transfer per operation and once with
+calculateMany, for the default spidev bufsiz and for a raised one
+'''
+def benchmarkBatching():
+    operations = getRandomOperations()
+    
+    for maxMessageLength in [FakeSpiDevice.FakeSpiDevice.DEFAULT_MAX_MESSAGE_LENGTH, 65536]:
+        device = FakeSpiDevice.FakeSpiDevice(maxMessageLength=maxMessageLength)
+        backend = SpiBackend.SpiBackend(spi=device)
+        
+        results, singleTime = timeFunction(calculateEach, backend, operations)
+        checkResults(results, operations)
+        singleCalls = device.numCalls
+        
+        device.resetCounters()
+        results, batchTime = timeFunction(backend.calculateMany, operations)
+        checkResults(results, operations)
+        batchCalls = device.numCalls
+        
+        print("spidev bufsiz " + str(maxMessageLength) + ", " + str(len(operations)) + " operations")
+        print("    calculate:     " + str(singleCalls) + " transfers, " + f'{singleTime:.4f}' + "s")
+        print("    calculateMany: " + str(batchCalls) + " transfers, " + f'{batchTime:.4f}' + "s")
+        print("    speedup:       " + f'{singleTime / batchTime:.2f}' + "x")
+
+
+'''
+the calculator is a singleton, so the backend is passed in case this is the
+first time it is created and set otherwise
+'''
+def useBackend(backend):
+    calculator = Calculator.Calculator(backend)
+    calculator.setBackend(backend)
+    return calculator
+
+'''
+counts the bytes BpnMath.sin and BpnMath.sqrt send with the register file 
+protocol against the 601 byte frames of the current protocol
+'''
+def benchmarkRegisters():
+    backend = RegisterFileBackend.RegisterFileBackend()
+    useBackend(backend)
+    
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    
+    calls = [("sin(0.5)", bpnMath.sin, BigPreciseNum.BigPreciseNum("0.5")),
+             ("sin(1.5)", bpnMath.sin, BigPreciseNum.BigPreciseNum("1.5")),
+             ("sqrt(2.0)", bpnMath.sqrt, BigPreciseNum.BigPreciseNum("2.0")),
+             ("sqrt(1e-60)", bpnMath.sqrt, BigPreciseNum.BigPreciseNum("1e-60"))]
+    
+    for name, function, argument in calls:
+        backend.numOperations = 0
+        backend.device.resetCounters()
+        function(argument)
+        
+        legacyBytes = backend.numOperations * RegisterAlu.RegisterAlu.LEGACY_FRAME_LENGTH
+        registerBytes = backend.device.numBytes
+        
+        print(name + ": " + str(backend.numOperations) + " operations")
+        print("    current protocol:  " + str(legacyBytes) + " bytes")
+        print("    register protocol: " + str(registerBytes) + " bytes")
+        print("    saved:             " + f'{100.0 * (legacyBytes - registerBytes) / legacyBytes:.1f}' + "%")
+
+
+'''
+a device that does no work at all, so only the time the host spends building
+transfers and reading results is measured
+'''
+class LoopbackDevice:
+    
+    def setMaxSpeedHz(self, speed):
+        pass
+    
+    def setMode(self, mode):
+        pass
+    
+    def close(self):
+        pass
+    
+    def xfer(self, values):
+        return values
+    
+    def xferInto(self, txBuffer, rxBuffer):
+        return rxBuffer
+
+#the host side of SpiBackend.calculate before the transfer buffers were reused
+def calculateWithLists(spi, operationType, operand1, operand2):
+    to_send = [operationType]
+    for i in range(len(operand1)):
+        to_send.append(operand1[i])
+    for i in range(len(operand2)):
+        to_send.append(operand2[i])
+    for i in range(0, SpiBackend.SpiBackend.OPERAND_LENGTH):
+        to_send.append(0x00)
+    for i in range(0, SpiBackend.SpiBackend.OPERAND_LENGTH):
+        to_send.append(0x00)
+    response = spi.xfer(to_send)
+    return response[len(response) - SpiBackend.SpiBackend.OPERAND_LENGTH: len(response)]
+
+def runRepeatedly(function, numRepeats, *args):
+    for i in range(0, numRepeats):
+        function(*args)
+
+'''
+host side time per operation for building the 601 byte list every time, for
+the reused buffers returning a list, and for the reused buffers returning the
+memoryview
+'''
+def benchmarkBuffers():
+    numRepeats = 20000
+    device = LoopbackDevice()
+    backend = SpiBackend.SpiBackend(spi=device)
+    operationType, operand1, operand2 = getRandomOperations(1)[0]
+    
+    paths = [("lists", calculateWithLists, device),
+             ("buffers, list result", backend.calculate, None),
+             ("buffers, memoryview result", backend.calculateView, None)]
+    
+    listTime = None
+    for name, function, firstArg in paths:
+        if(firstArg is None):
+            args = (operationType, operand1, operand2)
+        else:
+            args = (firstArg, operationType, operand1, operand2)
+        results, seconds = timeFunction(runRepeatedly, function, numRepeats, *args)
+        perOperation = seconds / numRepeats
+        if(listTime is None):
+            listTime = perOperation
+        print("    " + name + ": " + f'{perOperation * 1e6:.2f}' + "us per operation, " + f'{listTime / perOperation:.1f}' + "x")
+
+
+def getLightChargeState(lightCharge):
+    numbers = lightCharge.position + lightCharge.velocity_direction_unit_vector + lightCharge.c_direction_unit_vector
+    return [number.getStr() for number in numbers]
+
+'''
+runs BpnMath.sqrt for POOL_NUM_ITEMS numbers, standing in for the light 
+charges of a time step, on pools of 1, 2 and 4 FakeSpiDevices at 7.8MHz and
+prints how much faster the pools get through them than a single device. 
+Each pool is run on its own and under a CachedBackend and a HybridBackend, 
+like LIGHT_CHARGE_CACHE_SIZE and LIGHT_CHARGE_HYBRID set it up
+'''
+POOL_SIZES = [1, 2, 4]
+POOL_NUM_ITEMS = 4
+
+def benchmarkPool(latency=FakeSpiDevice.FakeSpiDevice.DEFAULT_TRANSFER_OVERHEAD):
+    import HybridBackend
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    items = [BigPreciseNum.BigPreciseNum(str(i + 2)) for i in range(0, POOL_NUM_ITEMS)]
+    expected = [bpnMath.sqrt(item).getStr() for item in items]
+    
+    for isWrapped in [False, True]:
+        print("    wrapped in a cache and a hybrid backend" if isWrapped else "    pool only")
+        singleTime = None
+        for poolSize in POOL_SIZES:
+            devices = [FakeSpiDevice.FakeSpiDevice(latency) for i in range(0, poolSize)]
+            backend = CalculatorPool.CalculatorPool([SpiBackend.SpiBackend(spi=device) for device in devices])
+            if(isWrapped):
+                backend = CachedBackend.CachedBackend(HybridBackend.HybridBackend(backend))
+            calculator.setBackend(backend)
+            
+            results, seconds = timeFunction(calculator.map, bpnMath.sqrt, items)
+            backend.close()
+            if([result.getStr() for result in results] != expected):
+                raise Exception("the pool's results don't match the software backend")
+            
+            if(singleTime is None):
+                singleTime = seconds
+            numOperations = sum([device.numFrames for device in devices])
+            print("        " + str(poolSize) + " devices: " + f'{seconds:.2f}' + "s for " + str(numOperations) + " operations, " + f'{singleTime / seconds:.2f}' + "x")
+    
+'''
+checks that a time step of every light charge run through Calculator.map on
+a CalculatorPool of POOL_CHECK_SIZE software backends, one thread per 
+device, is bit for bit the same as the step run on a single backend. Each is
+a new python process, so the pooled step is the first one BpnMath runs, 
+like at the start of a simulation.
+'''
+POOL_CHECK_SIZE = 2
+POOL_CHECK_SWITCH_INTERVAL = 1e-6
+
+def calculateMappedStep():
+    #switching threads as often as possible makes races between the 
+    #devices' threads much more likely to show up
+    sys.setswitchinterval(POOL_CHECK_SWITCH_INTERVAL)
+    calculator = Calculator.Calculator()
+    
+    import BpnMath
+    import Electron
+    electron = Electron.Electron(BpnMath.BpnMath())
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    updatedLightCharges = calculator.map(lambda lightCharge: lightCharge.getUpdatedLightCharge(lightCharges, dt), lightCharges)
+    for lightCharge in updatedLightCharges:
+        numbers = lightCharge.position + lightCharge.velocity_direction_unit_vector + lightCharge.c_direction_unit_vector
+        print(" ".join([format(number.internalNumber.getValue(), "x") for number in numbers]))
+
+def benchmarkPoolStep():
+    import subprocess
+    
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for poolSize in [1, POOL_CHECK_SIZE]:
+        env = dict(os.environ, LIGHT_CHARGE_BACKEND="software", LIGHT_CHARGE_POOL_SIZE=str(poolSize), 
+                   LIGHT_CHARGE_CONSTANTS="", LIGHT_CHARGE_TRIG_TABLE="")
+        startTime = time.perf_counter()
+        results[poolSize] = subprocess.run([sys.executable, "-c", "import CalculatorBenchmark; CalculatorBenchmark.calculateMappedStep()"],
+                                           cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+        print("    " + str(poolSize) + " devices: " + f'{time.perf_counter() - startTime:.2f}' + "s")
+    
+    if(results[POOL_CHECK_SIZE] != results[1]):
+        raise Exception("the pooled step doesn't match the serial step")
+    print("    the pooled step matches the serial step bit for bit")
+
+'''
+sends every operation of a calculateMany in a transfer of its own, which is
+how the components of a vector were sent before BigPreciseNum.multiplyMany
+and friends
+'''
+class UnbatchedBackend(AluBackend.AluBackend):
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def calculate(self, operationType, operand1, operand2):
+        return self.backend.calculate(operationType, operand1, operand2)
+
+    def calculateInt(self, operationType, operand1, operand2):
+        return self.backend.calculateInt(operationType, operand1, operand2)
+
+'''
+times one LightCharge.getUpdatedLightCharge step on a FakeSpiDevice at
+7.8MHz with latency seconds per transfer, once with the independent
+operations of the vector code sent together and once with a transfer per
+operation, and checks both steps are the same
+'''
+def benchmarkPipeline(latency=FakeSpiDevice.FakeSpiDevice.DEFAULT_TRANSFER_OVERHEAD):
+    useBackend(SoftwareBackend.SoftwareBackend())
+
+    import BpnMath
+    import Electron
+    electron = Electron.Electron(BpnMath.BpnMath())
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+
+    states = []
+    times = []
+    for isBatched in [False, True]:
+        device = FakeSpiDevice.FakeSpiDevice(latency)
+        backend = SpiBackend.SpiBackend(spi=device)
+        if(not isBatched):
+            backend = UnbatchedBackend(backend)
+        useBackend(backend)
+
+        lightCharge, seconds = timeFunction(lightCharges[0].getUpdatedLightCharge, lightCharges, dt)
+        states.append(getLightChargeState(lightCharge))
+        times.append(seconds)
+
+        nameStr = "batched:  " if isBatched else "one each: "
+        print("    " + nameStr + str(device.numFrames) + " operations in " + str(device.numCalls) + " transfers, " + f'{seconds:.2f}' + "s")
+
+    if(states[0] != states[1]):
+        raise Exception("the batched step doesn't match the step with a transfer per operation")
+    print("    speedup: " + f'{times[0] / times[1]:.2f}' + "x")
+
+
+
+'''
+prints the AluStats of one LightCharge.getUpdatedLightCharge step on the 
+software backend, which is where the operations of a time step go
+'''
+def benchmarkStats():
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    stats = calculator.startStats()
+    stats.reset()
+    lightCharges[0].getUpdatedLightCharge(lightCharges, dt)
+    calculator.stopStats()
+    stats.printSummary()
+    
+
+'''
+records one LightCharge.getUpdatedLightCharge step on the software backend, 
+replays it and checks that the replayed step is the same
+'''
+TRANSCRIPT_PATH = "benchmarkStep.alut"
+
+def benchmarkReplay():
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    calculator.startRecording(TRANSCRIPT_PATH)
+    lightCharge, recordTime = timeFunction(lightCharges[0].getUpdatedLightCharge, lightCharges, dt)
+    calculator.stopRecording()
+    recordedState = getLightChargeState(lightCharge)
+    
+    import ReplayBackend
+    replay = ReplayBackend.ReplayBackend(TRANSCRIPT_PATH)
+    previousBackend = calculator.setBackend(replay)
+    lightCharge, replayTime = timeFunction(lightCharges[0].getUpdatedLightCharge, lightCharges, dt)
+    calculator.setBackend(previousBackend)
+    
+    if(getLightChargeState(lightCharge) != recordedState):
+        raise Exception("the replayed step doesn't match the recorded step")
+    
+    print("    " + str(len(replay.records)) + " operations, " + str(os.path.getsize(TRANSCRIPT_PATH)) + " bytes")
+    print("    software backend: " + f'{recordTime:.2f}' + "s")
+    print("    replay backend:   " + f'{replayTime:.2f}' + "s")
+    os.remove(TRANSCRIPT_PATH)
+    
+
+'''
+runs one LightCharge.getUpdatedLightCharge step with result caches of 
+different sizes in front of the software backend and prints how many of the
+operations never had to go to the fpga
+'''
+CACHE_SIZES = [256 * 1024, CachedBackend.CachedBackend.DEFAULT_MAX_SIZE, 64 * 1024 * 1024]
+
+def benchmarkCache():
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    for cacheSize in CACHE_SIZES:
+        cache = calculator.startCache(cacheSize)
+        lightCharges[0].getUpdatedLightCharge(lightCharges, dt)
+        calculator.stopCache()
+        
+        print("    " + str(cacheSize // 1024) + "KB: " + str(cache.numHits) + " hits, " + 
+              str(cache.numMisses) + " misses, " + str(cache.numEvictions) + " evictions, " +
+              f'{100.0 * cache.getHitRate():.1f}' + "% of the operations saved")
+    
+
+'''
+counts what one LightCharge.getUpdatedLightCharge step sends over SPI with 
+and without the HybridBackend and estimates the SPI time at 7.8MHz with the
+FakeSpiDevice's overhead per transfer. The auto tuned split is timed on a 
+FakeSpiDevice that sleeps for the transfers.
+'''
+def benchmarkHybrid():
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    import HybridBackend
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    tuned = HybridBackend.HybridBackend(SpiBackend.SpiBackend(spi=FakeSpiDevice.FakeSpiDevice()))
+    localOperations = tuned.autoTune()
+    print("    auto tuned host operations: " + str([calculator.OperationType(operationType).name for operationType in localOperations]))
+    
+    speed = SpiBackend.SpiBackend.MAX_SPEED_HZ
+    overhead = FakeSpiDevice.FakeSpiDevice.DEFAULT_TRANSFER_OVERHEAD
+    for name, useHybrid in [("fpga only", False), ("hybrid", True)]:
+        device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+        backend = SpiBackend.SpiBackend(spi=device)
+        if(useHybrid):
+            backend = HybridBackend.HybridBackend(backend)
+        calculator.setBackend(backend)
+        
+        lightCharges[0].getUpdatedLightCharge(lightCharges, dt)
+        spiTime = device.numFrames * overhead + device.numBytes * SpiBackend.SpiBackend.NUM_BITS_IN_BYTE / speed
+        print("    " + name + ": " + str(device.numFrames) + " transfers, " + str(device.numBytes) + 
+              " bytes, about " + f'{spiTime:.1f}' + "s on SPI")
+    
+
+'''
+times the decimal string conversions of BigInt and BigPreciseNum, for the 360
+digit numbers of the simulation and for much longer ones to show that the 
+conversion stays subquadratic
+'''
+STRING_NUM_REPEATS = 200
+STRING_LENGTHS = [360, 5000, 20000, 80000]
+
+def benchmarkStrings():
+    useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BigInt
+    decimalStr = "7" * BigPreciseNum.BigPreciseNum.NUM_DIGITS
+    bigInt = BigInt.BigInt(decimalStr)
+    bigPreciseNum = BigPreciseNum.BigPreciseNum("-1.616255e-35")
+    
+    calls = [("BigInt(str)", BigInt.BigInt, decimalStr),
+             ("BigInt.getStr()", bigInt.getStr),
+             ("float(BigPreciseNum.getStr())", lambda: float(bigPreciseNum.getStr()))]
+    for name, function, *args in calls:
+        results, seconds = timeFunction(runRepeatedly, function, STRING_NUM_REPEATS, *args)
+        print("    " + name + ": " + f'{seconds / STRING_NUM_REPEATS * 1e6:.1f}' + "us")
+        
+    for length in STRING_LENGTHS:
+        decimalStr = "7" * length
+        value, parseTime = timeFunction(BigInt.BigInt.fromDecimal, decimalStr)
+        result, printTime = timeFunction(BigInt.BigInt.toDecimal, value)
+        if(result != decimalStr):
+            raise Exception("the decimal conversion of " + str(length) + " digits doesn't round trip")
+        print("    " + str(length) + " digits: fromDecimal " + f'{parseTime * 1e3:.2f}' + "ms, toDecimal " + f'{printTime * 1e3:.2f}' + "ms")
+    
+
+'''
+measures the memory of a BigPreciseNum and of a LightCharge snapshot, which 
+is what the simulation keeps for every light charge and time step, and how 
+many of them fit in what is left of a 1GB raspberry pi 2 for the simulation.
+Every number is made by an addition so that no two numbers share their int.
+'''
+MEMORY_AVAILABLE = 768 * 1024 * 1024
+MEMORY_NUM_COPIES = 200
+
+def getAllocatedBytes(function, numCopies):
+    import tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [function(i) for i in range(0, numCopies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / numCopies
+
+def benchmarkMemory():
+    useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    import LightCharge
+    bpnMath = BpnMath.BpnMath()
+    lightCharge = Electron.Electron(bpnMath).addLightCharges([])[0]
+    offset = BigPreciseNum.BigPreciseNum(bpnMath.precision)
+    
+    def getNumber(i):
+        return lightCharge.velocity + offset
+    
+    def getVector(vector):
+        return [number + offset for number in vector]
+    
+    def getSnapshot(i):
+        return LightCharge.LightCharge(getVector(lightCharge.position), lightCharge.velocity + offset,
+                                       getVector(lightCharge.velocity_direction_unit_vector),
+                                       lightCharge.positive_charge, lightCharge.index, lightCharge.map_color_str,
+                                       getVector(lightCharge.c_direction_unit_vector))
+    
+    numberBytes = getAllocatedBytes(getNumber, MEMORY_NUM_COPIES)
+    snapshotBytes = getAllocatedBytes(getSnapshot, MEMORY_NUM_COPIES)
+    print("    BigPreciseNum: " + f'{numberBytes:.0f}' + " bytes")
+    print("    LightCharge snapshot: " + f'{snapshotBytes:.0f}' + " bytes, " + 
+          str(int(MEMORY_AVAILABLE // snapshotBytes)) + " fit in " + str(MEMORY_AVAILABLE // (1024 * 1024)) + "MB")
+    
+
+'''
+times copying a BigPreciseNum with the constructor and with getCopy, and 
+LightCharge.copyVector on a position, which the simulation does thousands of
+times per step
+'''
+COPY_NUM_REPEATS = 20000
+
+def benchmarkCopy():
+    useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    lightCharge = Electron.Electron(bpnMath).addLightCharges([])[0]
+    number = lightCharge.position[0]
+    
+    calls = [("BigPreciseNum(number)", BigPreciseNum.BigPreciseNum, number),
+             ("number.getCopy()", number.getCopy),
+             ("copyVector(position)", lightCharge.copyVector, lightCharge.position)]
+    for name, function, *args in calls:
+        results, seconds = timeFunction(runRepeatedly, function, COPY_NUM_REPEATS, *args)
+        print("    " + name + ": " + f'{seconds / COPY_NUM_REPEATS * 1e6:.2f}' + "us")
+    
+'''
+counts the BigPreciseNums and BigInts made during one 
+LightCharge.getUpdatedLightCharge step, and the peak memory the step uses.
+Every number is counted as it is made, whether by the constructor or by
+__new__ directly, so copies that are thrown away right after are counted too.
+Counting replaces __new__ for good, so it runs in a new python process.
+'''
+def countAllocations():
+    import tracemalloc
+    useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BigInt
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    counts = {}
+    for cls in [BigPreciseNum.BigPreciseNum, BigInt.BigInt]:
+        counts[cls.__name__] = 0
+        
+        def countingNew(newCls, *newArgs, name=cls.__name__):
+            counts[name] += 1
+            return object.__new__(newCls)
+        cls.__new__ = countingNew
+        
+    tracemalloc.start()
+    lightCharges[0].getUpdatedLightCharge(lightCharges, dt)
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    for name, count in counts.items():
+        print("    " + name + ": " + str(count) + " per step")
+    print("    peak memory: " + f'{peakBytes / 1024:.0f}' + "KB per step")
+
+def benchmarkAllocations():
+    import subprocess
+    directory = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, "-c", "import CalculatorBenchmark; CalculatorBenchmark.countAllocations()"],
+                            cwd=directory, capture_output=True, text=True, check=True).stdout
+    print(output, end="")
+    
+
+'''
+counts the transfers and the time it takes to start the simulation, from 
+importing Electron to having the electron's light charges, with the constant 
+snapshot off, while it is being written and once it has been written. Each
+start is a new python process since the constants are made once per process.
+'''
+def countStartup():
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    useBackend(SpiBackend.SpiBackend(spi=device))
+    
+    start = time.perf_counter()
+    import BpnMath
+    import Electron
+    Electron.Electron(BpnMath.BpnMath()).addLightCharges([])
+    seconds = time.perf_counter() - start
+    print(str(device.numFrames) + " " + str(device.numBytes) + " " + str(seconds))
+
+def benchmarkStartup():
+    import subprocess
+    import tempfile
+    
+    speed = SpiBackend.SpiBackend.MAX_SPEED_HZ
+    overhead = FakeSpiDevice.FakeSpiDevice.DEFAULT_TRANSFER_OVERHEAD
+    directory = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as snapshotDirectory:
+        snapshotPath = os.path.join(snapshotDirectory, "constants.json")
+        for name, path in [("no snapshot", ""), ("writing snapshot", snapshotPath), ("from snapshot", snapshotPath)]:
+            env = dict(os.environ, LIGHT_CHARGE_CONSTANTS=path)
+            output = subprocess.run([sys.executable, "-c", "import CalculatorBenchmark; CalculatorBenchmark.countStartup()"],
+                                    cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+            numFrames, numBytes, seconds = output.split()[-3:]
+            spiTime = int(numFrames) * overhead + int(numBytes) * SpiBackend.SpiBackend.NUM_BITS_IN_BYTE / speed
+            print("    " + name + ": " + numFrames + " transfers, about " + f'{spiTime:.2f}' + "s on SPI, " +
+                  f'{float(seconds) * 1000:.1f}' + "ms on the host")
+    
+
+'''
+checks that the binary scale of BigPreciseNum is as precise as the decimal 
+scale. Some BpnMath functions and the derived constants are calculated with
+each scale and compared to the same values calculated with python's decimal
+module, and the binary scale has to get as many digits right as the decimal 
+scale does, give or take SCALE_DIGIT_TOLERANCE. 
+
+The binary scale can't hold a decimal literal like planck_constant exactly,
+so the references are calculated from the inputs as each scale parsed them 
+and only the arithmetic is compared. test_BigPreciseNumScales runs the same
+comparison with pytest.
+
+One LightCharge.getUpdatedLightCharge step is also run with each scale and 
+the digits the two steps agree on are printed, along with the step's 
+transfers and time on a FakeSpiDevice without delays. Each scale is a new 
+python process since the scale is chosen when the first number is made.
+'''
+SCALE_DIGIT_TOLERANCE = 1
+SCALE_DECIMAL_PRECISION = 400
+SCALE_INPUT_STR = "input:"
+
+def calculateScale():
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    useBackend(SpiBackend.SpiBackend(spi=device))
+    
+    import BpnMath
+    import Electron
+    import LightCharge
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    half = BigPreciseNum.BigPreciseNum("0.5")
+    
+    values = [(SCALE_INPUT_STR + "pi", bpnMath.pi),
+              (SCALE_INPUT_STR + "electric_permittivity", bpnMath.electric_permittivity),
+              (SCALE_INPUT_STR + "planck_constant", bpnMath.planck_constant),
+              (SCALE_INPUT_STR + "speed_of_light", bpnMath.speed_of_light),
+              (SCALE_INPUT_STR + "electron_mass", LightCharge.electron_mass),
+              ("sqrt(2)", bpnMath.sqrt(bpnMath.two)),
+              ("sin(1)", bpnMath.sin(bpnMath.one)),
+              ("cos(1)", bpnMath.cos(bpnMath.one)),
+              ("arcsin(0.5)", bpnMath.arcsin(half)),
+              ("coulumb_constant", bpnMath.coulumb_constant),
+              ("electron_period", electron.electron_period),
+              ("charge", LightCharge.LightCharge.charge)]
+    
+    device.resetCounters()
+    lightCharge, seconds = timeFunction(lightCharges[0].getUpdatedLightCharge, lightCharges, dt)
+    for i, valueStr in enumerate(getLightChargeState(lightCharge)):
+        values.append(("step[" + str(i) + "]", BigPreciseNum.BigPreciseNum(valueStr)))
+        
+    #getStr rounds to the decimal scale, so the inputs are printed exactly 
+    #as their magnitude and the one's place
+    for name, value in values:
+        if(name.startswith(SCALE_INPUT_STR)):
+            sign = "" if value.isPositive else "-"
+            print(name + " " + sign + str(value.getMagnitude().getValue()) + "/" + str(BigPreciseNum.BigPreciseNum.SCALE))
+        else:
+            print(name + " " + value.getStr())
+    print("step " + str(device.numFrames) + " " + str(seconds))
+    
+def getReferenceValues(results):
+    import decimal
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    Decimal = decimal.Decimal
+    
+    def getSeries(x, firstPower):
+        total = Decimal(0)
+        term = x ** firstPower
+        n = firstPower
+        while(term != 0):
+            total += term
+            term = -term * x * x / ((n + 1) * (n + 2))
+            n += 2
+        return total
+    
+    #machin's formula, pi = 16 arctan(1/5) - 4 arctan(1/239)
+    def getInput(name):
+        magnitude, scale = results[SCALE_INPUT_STR + name].split("/")
+        return Decimal(magnitude) / Decimal(scale)
+    
+    def getArctanOfReciprocal(n):
+        total = Decimal(0)
+        term = Decimal(1) / n
+        k = 1
+        while(term != 0):
+            total += term / k
+            term = -term / (n * n)
+            k += 2
+        return total
+    
+    pi = getInput("pi")
+    permittivity = getInput("electric_permittivity")
+    planckConstant = getInput("planck_constant")
+    speedOfLight = getInput("speed_of_light")
+    electronMass = getInput("electron_mass")
+    
+    return {"sqrt(2)": Decimal(2).sqrt(),
+            "sin(1)": getSeries(Decimal(1), 1),
+            "cos(1)": getSeries(Decimal(1), 0),
+            "arcsin(0.5)": (16 * getArctanOfReciprocal(5) - 4 * getArctanOfReciprocal(239)) / 6,
+            "coulumb_constant": 1 / (4 * pi * permittivity),
+            "electron_period": planckConstant / (electronMass * speedOfLight * speedOfLight),
+            "charge": (permittivity * planckConstant * speedOfLight).sqrt()}
+
+def getMatchingDigits(expected, actualStr):
+    import decimal
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    expected = decimal.Decimal(expected)
+    difference = abs(expected - decimal.Decimal(actualStr))
+    if(difference == 0):
+        return SCALE_DECIMAL_PRECISION
+    if(expected == 0):
+        return -int(difference.log10())
+    return int((abs(expected) / difference).log10())
+
+'''
+runs calculateScale in a new process for each scale and returns the parsed
+lines for each scale string, the step's transfers and seconds included
+'''
+def getScaleResults():
+    import subprocess
+    
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for scaleStr in [BigPreciseNum.BigPreciseNum.DECIMAL_SCALE_STR, BigPreciseNum.BigPreciseNum.BINARY_SCALE_STR]:
+        env = dict(os.environ, LIGHT_CHARGE_SCALE=scaleStr, LIGHT_CHARGE_CONSTANTS="")
+        output = subprocess.run([sys.executable, "-c", "import CalculatorBenchmark; CalculatorBenchmark.calculateScale()"],
+                                cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+        results[scaleStr] = dict(line.split(" ", 1) for line in output.splitlines())
+    return results
+
+'''
+returns the correct digits of each value with a reference as a dictionary
+of (decimal digits, binary digits)
+'''
+def getScaleDigits(results):
+    decimalResults = results[BigPreciseNum.BigPreciseNum.DECIMAL_SCALE_STR]
+    binaryResults = results[BigPreciseNum.BigPreciseNum.BINARY_SCALE_STR]
+    decimalReferences = getReferenceValues(decimalResults)
+    binaryReferences = getReferenceValues(binaryResults)
+    return {name: (getMatchingDigits(decimalReferences[name], decimalResults[name]),
+                   getMatchingDigits(binaryReferences[name], binaryResults[name]))
+            for name in decimalReferences}
+
+#the digits each component of the step agrees on between the two scales
+def getStepDigits(results):
+    decimalResults = results[BigPreciseNum.BigPreciseNum.DECIMAL_SCALE_STR]
+    binaryResults = results[BigPreciseNum.BigPreciseNum.BINARY_SCALE_STR]
+    return {name: getMatchingDigits(decimalResults[name], binaryResults[name])
+            for name in decimalResults if name.startswith("step[")}
+
+def benchmarkScales():
+    results = getScaleResults()
+    for scaleStr in results:
+        numFrames, seconds = results[scaleStr]["step"].split()
+        print("    " + scaleStr + ": " + numFrames + " transfers, " + f'{float(seconds):.2f}' + "s per step")
+    
+    print("    correct digits, decimal and binary scale")
+    lessPrecise = []
+    for name, (decimalDigits, binaryDigits) in getScaleDigits(results).items():
+        if(binaryDigits + SCALE_DIGIT_TOLERANCE < decimalDigits):
+            lessPrecise.append(name)
+        print("        " + name + ": " + str(decimalDigits) + ", " + str(binaryDigits))
+            
+    #the step has no reference, so only how far the scales drift apart over 
+    #one step is shown
+    print("    digits the steps agree on")
+    for name, digits in getStepDigits(results).items():
+        print("        " + name + ": " + str(digits))
+    
+    if(len(lessPrecise) > 0):
+        raise Exception("the binary scale is less precise than the decimal scale for " + str(lessPrecise))
+
+'''
+counts the transfers of LightCharge.getDistanceBtwnPoints between the two 
+light charges of an electron, whose positions have components of opposite 
+signs, and of just the differences of the positions it starts with
+'''
+def benchmarkDistance():
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    lightCharges = Electron.Electron(bpnMath).addLightCharges([])
+    p = lightCharges[0].position
+    q = lightCharges[1].position
+    
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    calculator.setBackend(SpiBackend.SpiBackend(spi=device))
+    
+    def getDifferences():
+        return [p[i] - q[i] for i in range(0, len(p))]
+    
+    for name, function, *args in [("position differences", getDifferences),
+                                  ("getDistanceBtwnPoints", lightCharges[0].getDistanceBtwnPoints, p, q)]:
+        device.resetCounters()
+        result, seconds = timeFunction(function, *args)
+        print("    " + name + ": " + str(device.numFrames) + " transfers")
+    
+
+'''
+compares BpnMath.sqrt, which uses Newton's method, with the bisection it 
+replaced for some of the numbers the simulation takes the sqrt of: the 
+iterations, the transfers on a FakeSpiDevice without delays and the digits 
+that are right, found with python's decimal module
+'''
+def sqrtByBisection(bpnMath, bpn):
+    minimum = bpnMath.zero
+    maximum = bpn
+    if(maximum < bpnMath.one):
+        maximum = bpnMath.one
+    middle = bpnMath.precision
+    prevMiddle = None
+    numIterations = 0
+    
+    diff = (middle * middle) - bpn
+    while(diff.getMagnitude() > bpnMath.precision.internalNumber):
+        numIterations += 1
+        middle = (minimum + maximum) / bpnMath.two
+        
+        if prevMiddle is not None and prevMiddle == middle:
+            break
+        prevMiddle = middle
+        
+        squareValue = middle * middle
+        if(squareValue == bpn):
+            break
+        if(squareValue > bpn):
+            maximum = middle
+        else:
+            minimum = middle
+
+        diff = (middle * middle) - bpn
+    return middle, numIterations
+
+def benchmarkSqrt():
+    import decimal
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    numbers = [("2", bpnMath.two),
+               ("0.5", BigPreciseNum.BigPreciseNum("0.5")),
+               ("1e30", BigPreciseNum.BigPreciseNum("1e30")),
+               ("charge^2", bpnMath.electric_permittivity * bpnMath.planck_constant * bpnMath.speed_of_light),
+               ("planck_length^2", bpnMath.planck_length * bpnMath.planck_length),
+               ("1e-150", BigPreciseNum.BigPreciseNum("1e-150"))]
+    
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    calculator.setBackend(SpiBackend.SpiBackend(spi=device))
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    
+    for name, bpn in numbers:
+        reference = (decimal.Decimal(bpn.getMagnitude().getValue()) / decimal.Decimal(BigPreciseNum.BigPreciseNum.SCALE)).sqrt()
+        
+        device.resetCounters()
+        root, numIterations = sqrtByBisection(bpnMath, bpn)
+        bisectionStr = (str(numIterations) + " iterations, " + str(device.numFrames) + " transfers, " + 
+                        str(getMatchingDigits(reference, root.getStr())) + " digits")
+        
+        device.resetCounters()
+        root = bpnMath.sqrt(bpn)
+        newtonStr = (str(bpnMath.numSqrtIterations) + " iterations, " + str(device.numFrames) + " transfers, " + 
+                     str(getMatchingDigits(reference, root.getStr())) + " digits")
+        print("    sqrt(" + name + ")")
+        print("        bisection: " + bisectionStr)
+        print("        newton:    " + newtonStr)
+    
+
+'''
+compares BpnMath.sin and cos, which reduce the argument and use Horner's 
+method, with the raw series they replaced: the terms, the transfers on a 
+FakeSpiDevice without delays and the digits that are right, found with 
+python's decimal module. BpnMath.sincos, which finds both at once, is shown
+after them.
+'''
+TRIG_ARGUMENTS = ["1e-20", "0.1", "1", "1.5607963", "3", "-2", "10"]
+
+def sinBySeries(bpnMath, bpn):
+    a = bpn
+    sumBpn = a
+    newTerm = a
+    denominator = bpnMath.one
+    oneTerm = bpnMath.one
+    counter = bpnMath.one
+    numerator = a
+    previousTerm = None
+    numTerms = 1
+    
+    while(newTerm.getMagnitude() > bpnMath.precision.getMagnitude()):
+        if(previousTerm is not None):
+            previousTerm *= bpnMath.two
+            if(newTerm.getMagnitude() >= previousTerm.getMagnitude()):
+                break
+        previousTerm = newTerm
+        numerator *= a
+        numerator *= a
+        counter += bpnMath.one
+        denominator *= counter
+        counter += bpnMath.one
+        denominator *= counter
+        oneTerm *= bpnMath.negOne
+        newTerm = (oneTerm * numerator) / denominator
+        sumBpn += newTerm
+        numTerms += 1
+    
+    if(sumBpn > bpnMath.one):
+        sumBpn = bpnMath.one
+    if(sumBpn < bpnMath.negOne):
+        sumBpn = bpnMath.negOne
+    return sumBpn, numTerms
+
+def getReferenceTrig(x):
+    import decimal
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    sinTotal = decimal.Decimal(0)
+    cosTotal = decimal.Decimal(0)
+    term = decimal.Decimal(1)
+    n = 0
+    # x^n/n! with the sign of the series, which is negative when n % 4 is 2 or 3
+    while(term != 0):
+        if(n % 4 >= 2):
+            signedTerm = -term
+        else:
+            signedTerm = term
+        if(n % 2 == 0):
+            cosTotal += signedTerm
+        else:
+            sinTotal += signedTerm
+        n += 1
+        term = term * x / n
+    return sinTotal, cosTotal
+
+def benchmarkTrig():
+    import decimal
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    calculator.setBackend(SpiBackend.SpiBackend(spi=device))
+    
+    for xStr in TRIG_ARGUMENTS:
+        bpn = BigPreciseNum.BigPreciseNum(xStr)
+        sinReference, cosReference = getReferenceTrig(decimal.Decimal(xStr))
+        print("    x = " + xStr)
+        
+        for name, reference, oldFunction, newFunction in [
+                ("sin", sinReference, lambda: sinBySeries(bpnMath, bpn), lambda: bpnMath.sin(bpn)),
+                ("cos", cosReference, lambda: sinBySeries(bpnMath, bpnMath.piOverTwo - bpn), lambda: bpnMath.cos(bpn))]:
+            device.resetCounters()
+            result, numTerms = oldFunction()
+            oldStr = (str(numTerms) + " terms, " + str(device.numFrames) + " transfers, " + 
+                      str(getMatchingDigits(reference, result.getStr())) + " digits")
+            
+            device.resetCounters()
+            result = newFunction()
+            newStr = (str(bpnMath.numSeriesTerms) + " terms, " + str(device.numFrames) + " transfers, " + 
+                      str(getMatchingDigits(reference, result.getStr())) + " digits")
+            print("        " + name + " series: " + oldStr)
+            print("        " + name + " reduced: " + newStr)
+        
+        device.resetCounters()
+        sinResult, cosResult = bpnMath.sincos(bpn)
+        print("        sincos: " + str(device.numFrames) + " transfers, " + 
+              str(getMatchingDigits(sinReference, sinResult.getStr())) + " and " + 
+              str(getMatchingDigits(cosReference, cosResult.getStr())) + " digits")
+    
+
+'''
+sweeps x from 0 to 1 - 1e-100 and compares BpnMath.arcsin and arccos, which
+rotate by the float angle and use the half-angle identity near 1, with the 
+maclaurin series arcsin used before: the transfers on a FakeSpiDevice 
+without delays and the decimal places that are right, found with python's 
+decimal module. The old series is stopped after ARCSIN_SERIES_MAX_TERMS 
+terms, since near 1 it needs more terms than its factorials fit in.
+'''
+ARCSIN_ARGUMENTS = ["0", "0.1", "0.5", "0.7", "0.9", "0.99", "-0.999", 
+                    "0.9999999999", "0." + "9" * 50, "0." + "9" * 100]
+ARCSIN_SERIES_MAX_TERMS = 100
+
+def arcsinBySeries(bpnMath, bpn):
+    zTerm = bpn
+    newTerm = bpn
+    sumBpn = bpn
+    iteration = bpnMath.one
+    factorialNumeratorIdx = bpnMath.one
+    factorialNumerator = bpnMath.one
+    twoExponentDenominator = bpnMath.one
+    factorialDenominatorIdx = bpnMath.one
+    factorialDenominator = bpnMath.one
+    oddDenomTerm = bpnMath.one
+    previousTerm = None
+    numTerms = 1
+    
+    while(newTerm.getMagnitude() > bpnMath.precision.getMagnitude() and numTerms < ARCSIN_SERIES_MAX_TERMS):
+        if(previousTerm is not None):
+            previousTerm *= bpnMath.two
+            if(newTerm.getMagnitude() >= previousTerm.getMagnitude()):
+                break
+        previousTerm = newTerm
+        zTerm *= bpn
+        zTerm *= bpn
+        while(factorialNumeratorIdx <= (iteration * bpnMath.two)):
+            factorialNumerator *= factorialNumeratorIdx
+            factorialNumeratorIdx += bpnMath.one
+        numerator = factorialNumerator * zTerm
+        twoExponentDenominator *= bpnMath.two
+        while(factorialDenominatorIdx <= iteration):
+            factorialDenominator *= factorialDenominatorIdx
+            factorialDenominatorIdx += bpnMath.one
+        denomPiece1 = factorialDenominator * twoExponentDenominator
+        denomPiece1 *= denomPiece1
+        oddDenomTerm += bpnMath.two
+        newTerm = numerator / (denomPiece1 * oddDenomTerm)
+        sumBpn += newTerm
+        iteration += bpnMath.one
+        numTerms += 1
+    
+    if(sumBpn > bpnMath.piOverTwo):
+        sumBpn = bpnMath.piOverTwo
+    if(sumBpn < -bpnMath.piOverTwo):
+        sumBpn = -bpnMath.piOverTwo
+    return sumBpn, numTerms
+
+#arcsin(x) = 2 arctan(x / (1 + sqrt(1 - x^2))), and arctan is halved the same 
+#way until its series is short
+def getReferenceArcsin(x):
+    import decimal
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    one = decimal.Decimal(1)
+    z = x / (one + (one - x * x).sqrt())
+    multiplier = 2
+    while(abs(z) > decimal.Decimal("0.001")):
+        z = z / (one + (one + z * z).sqrt())
+        multiplier *= 2
+    total = decimal.Decimal(0)
+    term = z
+    k = 1
+    while(term != 0):
+        total += term / k
+        term = -term * z * z
+        k += 2
+    return multiplier * total
+
+def getMatchingPlaces(expected, actualStr):
+    import decimal
+    decimal.getcontext().prec = SCALE_DECIMAL_PRECISION
+    difference = abs(decimal.Decimal(expected) - decimal.Decimal(actualStr))
+    if(difference == 0):
+        return SCALE_DECIMAL_PRECISION
+    return -int(difference.log10())
+
+def benchmarkArcsin():
+    import decimal
+    calculator = useBackend(SoftwareBackend.SoftwareBackend())
+    
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    calculator.setBackend(SpiBackend.SpiBackend(spi=device))
+    piOverTwo = getReferenceArcsin(decimal.Decimal(1))
+    
+    for xStr in ARCSIN_ARGUMENTS:
+        bpn = BigPreciseNum.BigPreciseNum(xStr)
+        arcsinReference = getReferenceArcsin(decimal.Decimal(xStr))
+        print("    x = " + (xStr if len(xStr) < 20 else "1 - 1e-" + str(len(xStr) - 2)))
+        
+        device.resetCounters()
+        result, numTerms = arcsinBySeries(bpnMath, bpn)
+        print("        arcsin series: " + str(numTerms) + " terms, " + str(device.numFrames) + " transfers, " + 
+              str(getMatchingPlaces(arcsinReference, result.getStr())) + " places")
+        
+        for name, reference, function in [("arcsin", arcsinReference, bpnMath.arcsin),
+                                           ("arccos", piOverTwo - arcsinReference, bpnMath.arccos)]:
+            device.resetCounters()
+            result = function(bpn)
+            print("        " + name + ": " + str(device.numFrames) + " transfers, " + 
+                  str(getMatchingPlaces(reference, result.getStr())) + " places")
+    
+
+'''
+generates a TrigTable in a temporary directory with a process per core and
+compares sin, cos, arcsin, arccos and one LightCharge step with and without
+it: the transfers on a FakeSpiDevice without delays and the decimal places 
+the two agree on. Each is a new python process since BpnMath loads the table
+when it is made.
+'''
+TABLE_VALUES = [("sin(1)", "sin", "1"), ("cos(-2)", "cos", "-2"), ("sin(10)", "sin", "10"),
+                ("arcsin(0.5)", "arcsin", "0.5"), ("arccos(0.9)", "arccos", "0.9"),
+                ("arcsin(-0.999)", "arcsin", "-0.999"), ("arccos(1-1e-50)", "arccos", "0." + "9" * 50)]
+
+def calculateTable():
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False)
+    useBackend(SpiBackend.SpiBackend(spi=device))
+    
+    import BpnMath
+    import Electron
+    bpnMath = BpnMath.BpnMath()
+    electron = Electron.Electron(bpnMath)
+    lightCharges = electron.addLightCharges([])
+    dt = electron.electron_period / BigPreciseNum.BigPreciseNum("1000")
+    
+    for name, functionName, xStr in TABLE_VALUES:
+        x = BigPreciseNum.BigPreciseNum(xStr)
+        device.resetCounters()
+        value = getattr(bpnMath, functionName)(x)
+        print(name + " " + str(device.numFrames) + " " + value.getStr())
+    
+    device.resetCounters()
+    lightCharges[0].getUpdatedLightCharge(lightCharges, dt)
+    print("step " + str(device.numFrames))
+
+def benchmarkTable():
+    import subprocess
+    import tempfile
+    import TrigTable
+    useBackend(SoftwareBackend.SoftwareBackend())
+    
+    directory = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tableDirectory:
+        path = os.path.join(tableDirectory, TrigTable.TrigTable.DEFAULT_FILE_NAME)
+        numKnots, seconds = timeFunction(TrigTable.generate, path)
+        print("    " + str(numKnots) + " knots, " + str(os.path.getsize(path) // 1024) + "KB, generated in " + 
+              f'{seconds:.1f}' + "s with " + str(os.cpu_count()) + " processes")
+        
+        results = {}
+        for mode, tablePath in [("series", ""), ("table", path)]:
+            env = dict(os.environ, LIGHT_CHARGE_TRIG_TABLE=tablePath, LIGHT_CHARGE_CONSTANTS="")
+            output = subprocess.run([sys.executable, "-c", "import CalculatorBenchmark; CalculatorBenchmark.calculateTable()"],
+                                    cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+            results[mode] = dict(line.split(" ", 1) for line in output.splitlines())
+    
+    print("    transfers without and with the table, places they agree on")
+    for name, functionName, xStr in TABLE_VALUES:
+        seriesFrames, seriesStr = results["series"][name].split()
+        tableFrames, tableStr = results["table"][name].split()
+        print("        " + name + ": " + seriesFrames + ", " + tableFrames + ", " + str(getMatchingPlaces(seriesStr, tableStr)))
+    print("        step: " + results["series"]["step"] + ", " + results["table"]["step"])
+    
+
+
+BENCHMARKS = {
+    "batching": benchmarkBatching,
+    "registers": benchmarkRegisters,
+    "buffers": benchmarkBuffers,
+    "pool": benchmarkPool,
+    "poolstep": benchmarkPoolStep,
+    "pipeline": benchmarkPipeline,
+    "stats": benchmarkStats,
+    "replay": benchmarkReplay,
+    "cache": benchmarkCache,
+    "hybrid": benchmarkHybrid,
+    "strings": benchmarkStrings,
+    "memory": benchmarkMemory,
+    "copy": benchmarkCopy,
+    "allocations": benchmarkAllocations,
+    "startup": benchmarkStartup,
+    "scales": benchmarkScales,
+    "distance": benchmarkDistance,
+    "sqrt": benchmarkSqrt,
+    "trig": benchmarkTrig,
+    "arcsin": benchmarkArcsin,
+    "table": benchmarkTable,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    if(len(names) == 0):
+        names = list(BENCHMARKS.keys())
+        
+    for nameStr in names:
+        name, *args = nameStr.split(":")
+        if(name not in BENCHMARKS):
+            raise Exception("unknown benchmark " + name + ", choose from " + str(list(BENCHMARKS.keys())))
+        print(name)
+        BENCHMARKS[name](*[float(arg) for arg in args])
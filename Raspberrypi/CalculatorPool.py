@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+CalculatorPool spreads the operations over several ALUs, e.g. one alchitry 
+au+ per SPI chip select, so that more than one light charge can be updated at
+a time. Every device is a backend of its own, so fpgas and SoftwareBackends 
+or FakeSpiDevices standing in for them can be mixed.
+
+Operations go to the device the current thread is pinned to. Threads that 
+aren't pinned get the devices in round robin order, one operation at a time. 
+map runs a function over a list of items, like the light charges of a time
+step, in a thread per device with item i pinned to device i % numDevices, so
+each light charge's update stays on one fpga and the transfers to the
+different fpgas happen at the same time.
+'''
+
+import concurrent.futures
+import itertools
+import threading
+import AluBackend
+
+
+class CalculatorPool(AluBackend.AluBackend):
+    
+    backends = []
+    
+    def __init__(self, backends):
+        if(len(backends) == 0):
+            raise Exception("calculator pool needs at least one backend")
+        self.backends = backends
+        
+        #a device can only do one transfer at a time
+        self.locks = [threading.Lock() for backend in backends]
+        
+        self.affinity = threading.local()
+        self.nextDevice = itertools.count()
+        
+        self.executor = None
+        
+    def getNumDevices(self):
+        return len(self.backends)
+        
+    #pins the operations of the current thread to one device
+    def pin(self, deviceIndex):
+        if(deviceIndex < 0 or deviceIndex >= len(self.backends)):
+            raise Exception("invalid device index " + str(deviceIndex))
+        self.affinity.deviceIndex = deviceIndex
+        
+    def unpin(self):
+        self.affinity.deviceIndex = None
+        
+    def getDeviceIndex(self):
+        deviceIndex = getattr(self.affinity, "deviceIndex", None)
+        if(deviceIndex is None):
+            deviceIndex = next(self.nextDevice) % len(self.backends)
+        return deviceIndex
+        
+    def calculate(self, operationType, operand1, operand2):
+        deviceIndex = self.getDeviceIndex()
+        with self.locks[deviceIndex]:
+            return self.backends[deviceIndex].calculate(operationType, operand1, operand2)
+        
+    def calculateInt(self, operationType, operand1, operand2):
+        deviceIndex = self.getDeviceIndex()
+        with self.locks[deviceIndex]:
+            return self.backends[deviceIndex].calculateInt(operationType, operand1, operand2)
+        
+    def calculateMany(self, operations):
+        deviceIndex = self.getDeviceIndex()
+        with self.locks[deviceIndex]:
+            return self.backends[deviceIndex].calculateMany(operations)
+        
+    #every device gets the constant since any of them can be asked to use it
+    def pinConstant(self, operand):
+        registers = []
+        for i in range(0, len(self.backends)):
+            with self.locks[i]:
+                registers.append(self.backends[i].pinConstant(operand))
+        return registers[0]
+    
+    def getFrameLength(self, operationType):
+        return self.backends[0].getFrameLength(operationType)
+    
+    def getPool(self):
+        return self
+    
+    def close(self):
+        if(self.executor is not None):
+            self.executor.shutdown()
+            self.executor = None
+        for backend in self.backends:
+            backend.close()
+        self.backends = []
+        
+    def runPinned(self, deviceIndex, function, items):
+        self.pin(deviceIndex)
+        try:
+            return [function(item) for item in items]
+        finally:
+            self.unpin()
+        
+    '''
+    returns [function(item) for item in items]. Item i is run on device 
+    i % numDevices and each device works through its items in its own thread
+    '''
+    def map(self, function, items):
+        numDevices = len(self.backends)
+        if(numDevices == 1):
+            return [function(item) for item in items]
+        
+        if(self.executor is None):
+            self.executor = concurrent.futures.ThreadPoolExecutor(numDevices)
+            
+        futures = []
+        for deviceIndex in range(0, numDevices):
+            futures.append(self.executor.submit(self.runPinned, deviceIndex, function, items[deviceIndex::numDevices]))
+            
+        results = [None] * len(items)
+        for deviceIndex in range(0, numDevices):
+            results[deviceIndex::numDevices] = futures[deviceIndex].result()
+        return results
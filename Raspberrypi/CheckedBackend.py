@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+CheckedBackend wraps a SpiBackend and checks a random sample of its results 
+against the SoftwareBackend while the simulation runs. When a result doesn't
+match, the correct result from the SoftwareBackend is returned and the SPI 
+clock is slowed down to the next supported speed, so a clock that was 
+calibrated too optimistically, or wiring that gets worse over a multi day 
+run, costs speed instead of wrong results.
+'''
+
+import random
+import AluBackend
+import SoftwareBackend
+
+
+class CheckedBackend(AluBackend.AluBackend):
+    
+    DEFAULT_SAMPLE_RATE = 0.01
+    
+    backend = None
+    
+    def __init__(self, backend, sampleRate=DEFAULT_SAMPLE_RATE, seed=None):
+        self.backend = backend
+        self.sampleRate = sampleRate
+        self.reference = SoftwareBackend.SoftwareBackend()
+        self.random = random.Random(seed)
+        
+        self.numChecked = 0
+        self.numMismatches = 0
+        
+    def close(self):
+        if(self.backend is not None):
+            self.backend.close()
+            self.backend = None
+            
+    def pinConstant(self, operand):
+        return self.backend.pinConstant(operand)
+    
+    def getFrameLength(self, operationType):
+        return self.backend.getFrameLength(operationType)
+    
+    def getPool(self):
+        return self.backend.getPool()
+    
+    def check(self, operationType, operand1, operand2, result):
+        if(self.random.random() >= self.sampleRate):
+            return result
+        
+        self.numChecked += 1
+        expected = self.reference.calculate(operationType, operand1, operand2)
+        if(list(result) == expected):
+            return result
+        
+        self.numMismatches += 1
+        previousSpeed = self.backend.getSpeed()
+        if(self.backend.slowDown()):
+            print("spi result mismatch, slowing down from " + str(previousSpeed) + 
+                  "Hz to " + str(self.backend.getSpeed()) + "Hz")
+        else:
+            print("spi result mismatch at the slowest speed " + str(previousSpeed) + "Hz")
+        return expected
+        
+    def calculate(self, operationType, operand1, operand2):
+        result = self.backend.calculate(operationType, operand1, operand2)
+        return self.check(operationType, operand1, operand2, result)
+    
+    def calculateMany(self, operations):
+        results = self.backend.calculateMany(operations)
+        for i in range(0, len(operations)):
+            operationType, operand1, operand2 = operations[i]
+            results[i] = self.check(operationType, operand1, operand2, results[i])
+        return results
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+
+
+'''
+ConstantSnapshot keeps the derived constants of the simulation, like 
+BpnMath.coulumb_constant and LightCharge.charge, in a json file so that they
+are only calculated on the ALU the first time the simulation starts. After 
+that they are read from the file in a few milliseconds.
+
+    charge = snapshot.getConstant("charge", calculateCharge, [permittivity, planckConstant])
+
+Each constant is stored with a hash of the numbers it was calculated from, 
+and the file is keyed on BigPreciseNum's precision settings and scale, so 
+changing an input or the precision calculates the constant again instead of
+loading a stale value. The file defaults to LightChargeConstants.json next 
+to this file and can be moved with LIGHT_CHARGE_CONSTANTS, setting it to an 
+empty string turns the snapshot off.
+    $> LIGHT_CHARGE_CONSTANTS=/home/silvermagnet2/light/constants.json python3 LightChargeSimulator.py
+'''
+
+import hashlib
+import json
+import os
+import BigInt
+import BigPreciseNum
+from Singleton import singleton
+
+
+@singleton
+class ConstantSnapshot:
+    
+    SNAPSHOT_ENV_STR = "LIGHT_CHARGE_CONSTANTS"
+    DEFAULT_FILE_NAME = "LightChargeConstants.json"
+    
+    #bump when the way a constant is calculated changes without its inputs
+    #changing, so old snapshots aren't used
+    VERSION = 3
+    
+    
+    def __init__(self, path=None):
+        if(path is None):
+            defaultPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.DEFAULT_FILE_NAME)
+            path = os.environ.get(self.SNAPSHOT_ENV_STR, defaultPath)
+        self.path = path
+        self.key = self.getKey()
+        self.constants = self.load()
+        self.numLoaded = 0
+        self.numCalculated = 0
+        
+    def isEnabled(self):
+        return len(self.path) > 0
+    
+    #the settings a snapshot is only valid for
+    def getKey(self):
+        if(BigPreciseNum.BigPreciseNum.decimalNum is None):
+            BigPreciseNum.BigPreciseNum.initConstants()
+        return {"version": self.VERSION,
+                "scale": BigPreciseNum.BigPreciseNum.scaleStr,
+                "numBits": BigInt.BigInt.NUM_BITS,
+                "numDigits": BigPreciseNum.BigPreciseNum.NUM_DIGITS,
+                "decimalPtLocation": BigPreciseNum.BigPreciseNum.DECIMAL_POINT_LOCATION}
+    
+    #returns the constants in the file, or nothing if there is no file or 
+    #it was made with different settings
+    def load(self):
+        if(not self.isEnabled() or not os.path.exists(self.path)):
+            return {}
+        try:
+            with open(self.path) as snapshotFile:
+                snapshot = json.load(snapshotFile)
+        except (OSError, ValueError):
+            return {}
+        
+        if(snapshot.get("key") != self.key):
+            return {}
+        return snapshot.get("constants", {})
+    
+    #writes to a temporary file first so a simulation that is stopped while
+    #saving doesn't leave half a snapshot behind
+    def save(self):
+        if(not self.isEnabled()):
+            return
+        temporaryPath = self.path + ".tmp"
+        try:
+            with open(temporaryPath, "w") as snapshotFile:
+                json.dump({"key": self.key, "constants": self.constants}, snapshotFile, indent=1)
+            os.replace(temporaryPath, self.path)
+        except OSError:
+            #a read only directory just means the constants are calculated
+            #every time
+            pass
+    
+    def getInputHash(self, inputs):
+        inputHash = hashlib.sha256()
+        for number in inputs:
+            inputHash.update((str(number.isPositive) + ":" + format(number.getMagnitude().getValue(), "x") + ";").encode())
+        return inputHash.hexdigest()
+    
+    '''
+    returns the constant called name from the snapshot if it was calculated 
+    from the same inputs, otherwise calls calculate, which must only depend 
+    on the numbers in inputs, and saves what it returns
+    '''
+    def getConstant(self, name, calculate, inputs):
+        inputHash = self.getInputHash(inputs)
+        entry = self.constants.get(name)
+        if(entry is not None and entry["inputs"] == inputHash):
+            self.numLoaded += 1
+            return BigPreciseNum.BigPreciseNum.fromParts(entry["isPositive"], 
+                                                         BigInt.BigInt.fromValue(int(entry["value"], 16)))
+        
+        constant = calculate()
+        self.numCalculated += 1
+        self.constants[name] = {"inputs": inputHash, 
+                                "isPositive": constant.isPositive,
+                                "value": format(constant.getMagnitude().getValue(), "x")}
+        self.save()
+        return constant
@@ -35,6 +35,7 @@ import LightChargeIdxSingleton
 import LightCharge
 import BpnMath 
 import BigPreciseNum
+import ConstantSnapshot
 
 
 #TODO, this constructor is only valid for an electron at rest
@@ -56,10 +57,16 @@ class Electron(Particle.Particle):
         
         electron_mass = BigPreciseNum.BigPreciseNum(ELECTRON_MASS_STR)
 
+        snapshot = ConstantSnapshot.ConstantSnapshot()
+
         #r_o = h/(2 * pi * m * c)
-        rest_electron_radius = bpnMath.planck_constant / (electron_mass * bpnMath.speed_of_light * bpnMath.two * bpnMath.pi)
+        rest_electron_radius = snapshot.getConstant("electron_radius",
+                                                    lambda: bpnMath.planck_constant / (electron_mass * bpnMath.speed_of_light * bpnMath.two * bpnMath.pi),
+                                                    [bpnMath.planck_constant, electron_mass, bpnMath.speed_of_light, bpnMath.two, bpnMath.pi])
         electron_circumference = rest_electron_radius * bpnMath.two * bpnMath.pi 
-        self.electron_period = electron_circumference / bpnMath.speed_of_light
+        self.electron_period = snapshot.getConstant("electron_period",
+                                                    lambda: electron_circumference / bpnMath.speed_of_light,
+                                                    [electron_circumference, bpnMath.speed_of_light])
         
         net_velocity = BigPreciseNum.BigPreciseNum(REST_VELOCITY_ZERO_STR)
         net_velocity *= net_velocity
@@ -72,7 +79,9 @@ class Electron(Particle.Particle):
         net_velocity = BigPreciseNum.BigPreciseNum(REST_VELOCITY_ZERO_STR)
         
         #v_c = (1/h) * 2 * pi * planck_length * m * c^3 * sqrt(1/(c^2 - v_net^2))
-        velocity = bpnMath.sqrt(bpnMath.one / (bpnMath.speed_of_light * bpnMath.speed_of_light - net_velocity * net_velocity))
+        velocity = snapshot.getConstant("light_charge_velocity",
+                                        lambda: bpnMath.sqrt(bpnMath.one / (bpnMath.speed_of_light * bpnMath.speed_of_light - net_velocity * net_velocity)),
+                                        [bpnMath.one, bpnMath.speed_of_light, net_velocity])
         velocity *= (bpnMath.one / bpnMath.planck_constant) * bpnMath.two * bpnMath.pi * bpnMath.planck_length * electron_mass * bpnMath.speed_of_light * bpnMath.speed_of_light * bpnMath.speed_of_light
         
 
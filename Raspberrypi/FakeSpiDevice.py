@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+FakeSpiDevice stands in for the alchitry au+ fpga behind a SpiBackend so the
+SPI code path can be run and timed on a computer without the fpga. It reads
+frames the same way alu.luc does, calculates the result with the 
+SoftwareBackend and writes the result into the end of the response.
+
+The time a real transfer takes is modelled by sleeping for a fixed overhead
+per xfer or ioctl call plus the time it takes to clock the bytes out at the 
+current speed. The counters can be used to check how many calls and bytes an
+operation needed.
+'''
+
+import time
+import AluBackend
+import SoftwareBackend
+
+
+class FakeSpiDevice:
+    
+    #roughly the cost of an ioctl and toggling the chip select on a 
+    #raspberry pi 2
+    DEFAULT_TRANSFER_OVERHEAD = 0.0001
+    
+    DEFAULT_MAX_MESSAGE_LENGTH = 4096
+    
+    OPCODE_MASK = 0x07
+    
+    maxSpeedHz = None
+    mode = None
+    
+    def __init__(self, transferOverhead=DEFAULT_TRANSFER_OVERHEAD,
+                 simulateClock=True, maxMessageLength=DEFAULT_MAX_MESSAGE_LENGTH):
+        self.transferOverhead = transferOverhead
+        self.simulateClock = simulateClock
+        self.maxMessageLength = maxMessageLength
+        self.alu = SoftwareBackend.SoftwareBackend()
+        self.maxSpeedHz = 7800000
+        self.resetCounters()
+        
+    def resetCounters(self):
+        self.numCalls = 0
+        self.numFrames = 0
+        self.numBytes = 0
+        
+    def getMaxSpeedHz(self):
+        return self.maxSpeedHz
+    
+    def setMaxSpeedHz(self, speed):
+        self.maxSpeedHz = speed
+        
+    def setMode(self, mode):
+        self.mode = mode
+        
+    def getMaxMessageLength(self):
+        return self.maxMessageLength
+        
+    def close(self):
+        pass
+    
+    def wait(self, numBytes):
+        duration = self.transferOverhead
+        if(self.simulateClock):
+            duration += (numBytes * AluBackend.AluBackend.NUM_BITS_IN_BYTE) / self.maxSpeedHz
+        if(duration > 0):
+            time.sleep(duration)
+    
+    '''
+    byte 0 is the opcode, followed by the two operands. The result is in the
+    last OPERAND_LENGTH bytes of the response, everything else reads as zero.
+    '''
+    def getResponse(self, frame):
+        length = AluBackend.AluBackend.OPERAND_LENGTH
+        operationType = frame[0] & self.OPCODE_MASK
+        operand1 = frame[1: 1 + length]
+        operand2 = frame[1 + length: 1 + (2 * length)]
+        
+        result = self.alu.calculate(operationType, operand1, operand2)
+        
+        response = [0x00] * (len(frame) - length)
+        response.extend(result)
+        return response
+        
+    def xfer(self, values):
+        self.numCalls += 1
+        self.numFrames += 1
+        self.numBytes += len(values)
+        self.wait(len(values))
+        return self.getResponse(values)
+    
+    def xferFrames(self, frames):
+        numBytes = 0
+        for frame in frames:
+            numBytes += len(frame)
+        if(numBytes > self.maxMessageLength):
+            raise Exception("message is larger than the spidev buffer")
+            
+        self.numCalls += 1
+        self.numFrames += len(frames)
+        self.numBytes += numBytes
+        self.wait(numBytes)
+        
+        responses = []
+        for frame in frames:
+            responses.append(self.getResponse(frame))
+        return responses
+    
+    def xferInto(self, txBuffer, rxBuffer):
+        self.numCalls += 1
+        self.numFrames += 1
+        self.numBytes += len(txBuffer)
+        self.wait(len(txBuffer))
+        rxBuffer[0: len(rxBuffer)] = bytes(self.getResponse(txBuffer))
+        return rxBuffer
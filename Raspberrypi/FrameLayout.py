@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+FrameLayout describes how long the SPI frame for an operation is and where the
+result is in the response. The counter values are copied from the State 
+constants in alu.luc, and the frame is worked out from them the same way the
+fpga steps through them, one counter step per bit:
+
+    - the first 2 bits of a frame clear the ALU and the third is INIT, so 
+      counter value c is reached on bit c + 3 of the frame
+    - the spi peripheral hands the ALU's output byte to its shift register 
+      on the last bit of every byte, so the first result byte is received in
+      the byte after the first load that happens in the response state
+      
+Short frames are selected with SHORT_FRAME_FLAG in the opcode byte. LT, EQ, 
+ADD and SUB then only wait a byte for the result instead of the time the 
+divider needs, and LT and EQ only read out the lowest result byte.
+
+    operation      current frame   short frame
+    LT, EQ         601 bytes       304 bytes
+    ADD, SUB       601 bytes       453 bytes
+    MUL, DIV       601 bytes       601 bytes
+'''
+
+import AluBackend
+
+
+class FrameLayout:
+    
+    #State in alu.luc
+    CALC = 2407
+    RESP = 3599
+    BUFFER = 4807
+    RESP_SHORT = 2415
+    BUFFER_SHORT_COMPARE = 2431
+    BUFFER_SHORT = 3623
+    
+    SHORT_FRAME_FLAG = 0x08
+    
+    NUM_CLEAR_BITS = 3
+    NUM_BITS_IN_BYTE = AluBackend.AluBackend.NUM_BITS_IN_BYTE
+    OPERAND_LENGTH = AluBackend.AluBackend.OPERAND_LENGTH
+    
+    COMPARISON_LENGTH = 1
+    
+    
+    def __init__(self, operationType, isShort):
+        self.operationType = operationType
+        self.isShort = isShort
+        self.opcode = operationType
+        
+        self.calcEnd = self.RESP
+        self.respEnd = self.BUFFER
+        self.resultLength = self.OPERAND_LENGTH
+        
+        isMultiplyOrDivide = (operationType == AluBackend.AluBackend.MULTIPLICATION or 
+                              operationType == AluBackend.AluBackend.DIVISION)
+        isComparison = (operationType == AluBackend.AluBackend.LESS_THAN or 
+                        operationType == AluBackend.AluBackend.EQUALS)
+        
+        if(isShort):
+            self.opcode |= self.SHORT_FRAME_FLAG
+            if(not isMultiplyOrDivide):
+                self.calcEnd = self.RESP_SHORT
+                self.respEnd = self.BUFFER_SHORT
+                if(isComparison):
+                    self.respEnd = self.BUFFER_SHORT_COMPARE
+                    self.resultLength = self.COMPARISON_LENGTH
+                    
+        #the response state starts on the bit after the one where the counter
+        #reaches calcEnd. The peripheral loads the byte to send on bit 8n as 
+        #the ALU left it after bit 8n - 1, and sends it in byte n
+        respStartBit = self.calcEnd + self.NUM_CLEAR_BITS + 1
+        self.resultStart = (respStartBit + self.NUM_BITS_IN_BYTE) // self.NUM_BITS_IN_BYTE
+        self.frameLength = self.resultStart + self.resultLength
+        
+        self.calcLength = self.resultStart - 1 - (2 * self.OPERAND_LENGTH)
+        
+        
+    #one layout per operation type, for the current or the short frames
+    @classmethod
+    def getLayouts(cls, isShort):
+        layouts = []
+        for operationType in range(AluBackend.AluBackend.LESS_THAN, AluBackend.AluBackend.DIVISION + 1):
+            layouts.append(FrameLayout(operationType, isShort))
+        return layouts
+    
+    def getFrame(self, operand1, operand2):
+        frame = [self.opcode]
+        frame.extend(operand1)
+        frame.extend(operand2)
+        frame.extend([0x00] * (self.frameLength - len(frame)))
+        return frame
+    
+    '''
+    returns the result as a full length hex array, comparisons only send the
+    lowest byte
+    '''
+    def getResult(self, response):
+        result = response[self.resultStart: self.resultStart + self.resultLength]
+        if(self.resultLength < self.OPERAND_LENGTH):
+            result = ([0x00] * (self.OPERAND_LENGTH - self.resultLength)) + list(result)
+        return result
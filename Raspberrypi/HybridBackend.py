@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+HybridBackend runs the cheap operations on the host and only sends the 
+expensive ones to the fpga. A comparison, addition or subtraction of two 1200
+bit numbers takes a python int a microsecond or two, while the SPI round trip
+for it takes hundreds of microseconds, so by default LT, EQ, ADD and SUB are
+calculated by the SoftwareBackend and MUL and DIV by the device. The 
+SoftwareBackend is bit exact with the fpga, so the results don't change.
+
+autoTune times every operation type on both backends and keeps each one
+wherever it was faster.
+
+Under Calculator.map the devices' threads share the backend, so the counters
+are only changed with the lock held.
+'''
+
+import random
+import threading
+import time
+import AluBackend
+import AluCheck
+import SoftwareBackend
+
+
+class HybridBackend(AluBackend.AluBackend):
+    
+    DEFAULT_LOCAL_OPERATIONS = [AluBackend.AluBackend.LESS_THAN,
+                                AluBackend.AluBackend.EQUALS,
+                                AluBackend.AluBackend.ADDITION,
+                                AluBackend.AluBackend.SUBTRACTION]
+    
+    NUM_TUNING_TRIALS = 20
+    TUNING_SEED = 0
+    
+    backend = None
+    
+    def __init__(self, backend, localOperations=DEFAULT_LOCAL_OPERATIONS):
+        self.backend = backend
+        self.local = SoftwareBackend.SoftwareBackend()
+        self.lock = threading.Lock()
+        self.setLocalOperations(localOperations)
+        self.resetCounters()
+        
+    def resetCounters(self):
+        self.numLocal = 0
+        self.numDevice = 0
+        
+    def setLocalOperations(self, localOperations):
+        self.isLocal = [False] * len(AluCheck.OPERATION_TYPES)
+        for operationType in localOperations:
+            self.isLocal[operationType] = True
+            
+    def count(self, numLocal, numDevice):
+        with self.lock:
+            self.numLocal += numLocal
+            self.numDevice += numDevice
+            
+    def getLocalOperations(self):
+        return [operationType for operationType in AluCheck.OPERATION_TYPES if self.isLocal[operationType]]
+    
+    '''
+    times numTrials random operations of every type on the device and on the
+    host and calculates each type wherever it was faster. returns the 
+    operation types that are calculated on the host
+    '''
+    def autoTune(self, numTrials=NUM_TUNING_TRIALS):
+        rng = random.Random(self.TUNING_SEED)
+        operands = []
+        for i in range(0, numTrials):
+            operands.append((AluCheck.getRandomOperand(rng), AluCheck.getRandomOperand(rng)))
+        
+        localOperations = []
+        for operationType in AluCheck.OPERATION_TYPES:
+            deviceTime = self.timeOperations(self.backend, operationType, operands)
+            localTime = self.timeOperations(self.local, operationType, operands)
+            if(localTime < deviceTime):
+                localOperations.append(operationType)
+                
+        self.setLocalOperations(localOperations)
+        return localOperations
+    
+    def timeOperations(self, backend, operationType, operands):
+        start = time.perf_counter()
+        for operand1, operand2 in operands:
+            backend.calculate(operationType, operand1, operand2)
+        return time.perf_counter() - start
+        
+    def calculate(self, operationType, operand1, operand2):
+        if(self.isLocal[operationType]):
+            self.count(1, 0)
+            return self.local.calculate(operationType, operand1, operand2)
+        self.count(0, 1)
+        return self.backend.calculate(operationType, operand1, operand2)
+    
+    def calculateInt(self, operationType, operand1, operand2):
+        if(self.isLocal[operationType]):
+            self.count(1, 0)
+            return self.local.calculateInt(operationType, operand1, operand2)
+        self.count(0, 1)
+        return self.backend.calculateInt(operationType, operand1, operand2)
+    
+    def calculateMany(self, operations):
+        results = [None] * len(operations)
+        deviceIndices = []
+        for i in range(0, len(operations)):
+            operationType, operand1, operand2 = operations[i]
+            if(self.isLocal[operationType]):
+                results[i] = self.local.calculate(operationType, operand1, operand2)
+            else:
+                deviceIndices.append(i)
+        self.count(len(operations) - len(deviceIndices), len(deviceIndices))
+                
+        if(len(deviceIndices) > 0):
+            deviceResults = self.backend.calculateMany([operations[i] for i in deviceIndices])
+            for j in range(0, len(deviceIndices)):
+                results[deviceIndices[j]] = deviceResults[j]
+        return results
+    
+    def pinConstant(self, operand):
+        return self.backend.pinConstant(operand)
+    
+    #operations calculated on the host don't send anything
+    def getFrameLength(self, operationType):
+        if(self.isLocal[operationType]):
+            return 0
+        return self.backend.getFrameLength(operationType)
+    
+    def getPool(self):
+        return self.backend.getPool()
+    
+    def close(self):
+        if(self.backend is not None):
+            self.backend.close()
+            self.backend = None
@@ -36,6 +36,7 @@ is explicitely non-local.
 '''
 import BigPreciseNum
 import BpnMath
+import ConstantSnapshot
 import Log
 
 
@@ -48,11 +49,17 @@ bpnMath = BpnMath.BpnMath()
 #light_charge_value = (bpnMath.electric_permittivity * bpnMath.planck_constant * bpnMath.speed_of_light)
 #light_charge_value = bpnMath.sqrt(light_charge_value)
         
+snapshot = ConstantSnapshot.ConstantSnapshot()
+
 electron_mass = BigPreciseNum.BigPreciseNum("9.1093837015e-31")
-electron_radius = bpnMath.planck_constant / (electron_mass * bpnMath.speed_of_light * bpnMath.two * bpnMath.pi)
+electron_radius = snapshot.getConstant("electron_radius",
+                                       lambda: bpnMath.planck_constant / (electron_mass * bpnMath.speed_of_light * bpnMath.two * bpnMath.pi),
+                                       [bpnMath.planck_constant, electron_mass, bpnMath.speed_of_light, bpnMath.two, bpnMath.pi])
 
 electron_circumference = electron_radius * bpnMath.two * bpnMath.pi 
-electron_period = electron_circumference / bpnMath.speed_of_light
+electron_period = snapshot.getConstant("electron_period", 
+                                       lambda: electron_circumference / bpnMath.speed_of_light,
+                                       [electron_circumference, bpnMath.speed_of_light])
 
 
         
@@ -61,15 +68,13 @@ electron_period = electron_circumference / bpnMath.speed_of_light
 
 class LightCharge:
    
-    log = None
+    #every light charge has the same charge and log, so they are shared by 
+    #the class and only the state that changes is kept per light charge
+    __slots__ = ("position", "velocity", "velocity_direction_unit_vector",
+                 "positive_charge", "index", "map_color_str", 
+                 "c_direction_unit_vector")
     
-    position = None
-    velocity = None
-    velocity_direction_unit_vector = None
-    positive_charge = None
-    index = None
-    map_color_str = None
-    c_direction_unit_vector = None 
+    log = None
     charge = None
     
     
@@ -79,11 +84,22 @@ class LightCharge:
                  positive_charge, index, map_color_str,
                  c_direction_unit_vector):
        
-        self.log = Log.Log()
+        if(LightCharge.charge is None):
+            LightCharge.log = Log.Log()
+            
+            #the charge is sqrt(permittivity * planck_constant * speed_of_light).
+            #permittivity * planck_constant is about 6e-45, which only has 
+            #about 116 significant digits with 160 decimal places unless it 
+            #happens to be exact like in the decimal scale. Taking the roots 
+            #of permittivity * speed_of_light and planck_constant keeps about
+            #142 digits in both scales
+            LightCharge.charge = snapshot.getConstant("charge", 
+                                                      lambda: bpnMath.sqrt(bpnMath.electric_permittivity * bpnMath.speed_of_light) * bpnMath.sqrt(bpnMath.planck_constant),
+                                                      [bpnMath.electric_permittivity, bpnMath.planck_constant, bpnMath.speed_of_light])
         
         self.position = self.copyVector(position)
         
-        self.velocity = BigPreciseNum.BigPreciseNum(velocity)
+        self.velocity = velocity
         
         self.velocity_direction_unit_vector = self.copyVector(velocity_direction_unit_vector)
         
@@ -95,15 +111,12 @@ class LightCharge:
        
         self.c_direction_unit_vector = self.copyVector(c_direction_unit_vector) 
         
-        self.charge = (bpnMath.electric_permittivity * bpnMath.planck_constant * bpnMath.speed_of_light)
-        self.charge = bpnMath.sqrt(self.charge)
-        
 
+    #numbers never change once they are made, so a copy of a vector only 
+    #needs a new list and the numbers are shared. Anything that wants to 
+    #change a vector copies it first and changes the copy
     def copyVector(self, vector):
-        copiedVector = []
-        for i in range(0, len(vector)):
-            copiedVector.append(BigPreciseNum.BigPreciseNum(vector[i]))
-        return copiedVector
+        return list(vector)
             
     def printVector(self, vector):
         output = "["
@@ -117,39 +130,29 @@ class LightCharge:
         print(output)
         
     def getDistanceBtwnPoints(self, P1, P2):
-        p = self.copyVector(P1)
-        q = self.copyVector(P2)
+        p = P1
+        q = P2
         
         if(len(p) != len(q)):
             raise Exception("invalid position vectors")
             exit()
             
             
-        sumElements = BigPreciseNum.BigPreciseNum(bpnMath.zero)
-        for i in range(0, len(p)):
-            sumElements += ((p[i] - q[i]) * (p[i] - q[i]))
-
-        val = bpnMath.sqrt(sumElements)
-        return val
+        differences = BigPreciseNum.BigPreciseNum.subtractMany(list(zip(p, q)))
+        return bpnMath.getMagnitude(differences)
         
+    #the constructor copies the vectors, so they are passed straight through
     def getCopy(self, lightCharge):
-        
-        newPosition = self.copyVector(lightCharge.position)
-        newVelVector = self.copyVector(lightCharge.velocity_direction_unit_vector)
-        newCVector = self.copyVector(lightCharge.c_direction_unit_vector)
-            
-        return LightCharge(newPosition, BigPreciseNum.BigPreciseNum(lightCharge.velocity), newVelVector,
+        return LightCharge(lightCharge.position, lightCharge.velocity, 
+                      lightCharge.velocity_direction_unit_vector,
                       lightCharge.positive_charge, lightCharge.index, lightCharge.map_color_str,
-                      newCVector)
+                      lightCharge.c_direction_unit_vector)
      
     
 
     
     def getDistanceBtwnLightCharges(self, lightCharge):
-        p = self.copyVector(self.position)
-        q = self.copyVector(lightCharge.position)
-        
-        return self.getDistanceBtwnPoints(p, q)
+        return self.getDistanceBtwnPoints(self.position, lightCharge.position)
         
 
        
@@ -198,12 +201,10 @@ class LightCharge:
        
 
 
-        v1 = []
-        for i in range(len(P0)):
-            v1.append(P0[i] - P2[i])
-        v2 = []
-        for i in range(len(P1)):
-            v2.append(P1[i] - P2[i])
+        #both differences go to the alu together
+        differences = BigPreciseNum.BigPreciseNum.subtractMany(list(zip(P0, P2)) + list(zip(P1, P2)))
+        v1 = differences[:len(P0)]
+        v2 = differences[len(P0):]
         try:
             angleBtwnV0andV1 = bpnMath.getAngleBetweenVectors(v1, v2)
         except:
@@ -218,21 +219,12 @@ class LightCharge:
         then we use the magnitudes of the vectors between P0, P1, and P2  and
         geometry to determine how to map the other points
         '''
-        if(angleBtwnV0andV1 <= (bpnMath.pi / bpnMath.two)):
-            x_P1 = b*bpnMath.cos(angleBtwnV0andV1)
-            y_P1 = b*bpnMath.sin(angleBtwnV0andV1)
-           
-        elif(angleBtwnV0andV1 <= bpnMath.pi):
-            x_P1 = bpnMath.negOne * b*bpnMath.cos(bpnMath.pi - angleBtwnV0andV1)
-            y_P1 = b*bpnMath.sin(bpnMath.pi - angleBtwnV0andV1)
-
-        elif(angleBtwnV0andV1 <= (bpnMath.three * (bpnMath.pi / bpnMath.two))):
-            x_P1 = bpnMath.negOne * b*bpnMath.sin((bpnMath.three * (bpnMath.pi /bpnMath.two)) - angleBtwnV0andV1)
-            y_P1 = bpnMath.negOne * b*bpnMath.cos((bpnMath.three * (bpnMath.pi /bpnMath.two)) - angleBtwnV0andV1)
-        else:
-            x_P1 = b*bpnMath.cos((bpnMath.two * bpnMath.pi) - angleBtwnV0andV1)
-            y_P1 = bpnMath.negOne * b*bpnMath.sin((bpnMath.two * bpnMath.pi) - angleBtwnV0andV1)
-            
+        #P1 is (b cos(angle), b sin(angle)) in every quadrant, and sincos 
+        #reduces the angle itself, so the pi - angle and 3pi/2 - angle forms 
+        #of the other quadrants aren't needed
+        sinAngle, cosAngle = bpnMath.sincos(angleBtwnV0andV1)
+        x_P1 = b*cosAngle
+        y_P1 = b*sinAngle
 
                   
         '''
@@ -245,10 +237,11 @@ class LightCharge:
         rotation matrix to rotate the vector
         '''
 
-        V3 = [bpnMath.cos(phi), bpnMath.negOne * bpnMath.sin(phi)]
+        sinPhi, cosPhi = bpnMath.sincos(phi)
+        V3 = [cosPhi, bpnMath.negOne * sinPhi]
 
-        x_P0 = BigPreciseNum.BigPreciseNum(bpnMath.planck_length)
-        y_P0 = BigPreciseNum.BigPreciseNum(bpnMath.zero)
+        x_P0 = bpnMath.planck_length
+        y_P0 = bpnMath.zero
         m1 = ((y_P0 - y_P1) / (x_P0 - x_P1))
         b1 = y_P0 - (m1 * x_P0)
         m2 = (V3[1])/(V3[0])
@@ -265,7 +258,7 @@ class LightCharge:
         try:
             d = self.getDistanceBtwnPoints(P0_2d, P4)
         except:
-            d = BigPreciseNum.BigPreciseNum(bpnMath.zero)
+            d = bpnMath.zero
 
 
         '''
@@ -273,52 +266,38 @@ class LightCharge:
         from P0 to P1, normalize it, and scale/multiply by d to get P4
         '''
 
-        direction_vector_btwn_P0_and_P1 = []
-        for i in range(len(P0)):
-            direction_vector_btwn_P0_and_P1.append(P1[i] - P0[i])
+        direction_vector_btwn_P0_and_P1 = BigPreciseNum.BigPreciseNum.subtractMany(list(zip(P1, P0)))
             
         dVec = bpnMath.normalizeAndScale(direction_vector_btwn_P0_and_P1, d)
         
 
         #getting P4 in 4d
-        P4 = []  
-        for i in range(0, len(dVec)):
-            P4.append(dVec[i] + P0[i])
+        P4 = BigPreciseNum.BigPreciseNum.addMany(list(zip(dVec, P0)))
             
-        V4 = []
-        for i in range(0, len(P4)):
-            V4.append(P4[i] - P2[i])
+        V4 = BigPreciseNum.BigPreciseNum.subtractMany(list(zip(P4, P2)))
         
     
 
-        return bpnMath.normalizeAndScale(V4, BigPreciseNum.BigPreciseNum(bpnMath.planck_length))
+        return bpnMath.normalizeAndScale(V4, bpnMath.planck_length)
 
     
         
     def getVelocityVectorDisplacement(self, lightCharge, dt):
         phi = self.getDeltaPhi1(dt, lightCharge)
 
-        vectorToRotate = self.copyVector(self.velocity_direction_unit_vector)
+        vectorToRotate = self.velocity_direction_unit_vector
 
-        P0 = []
-        for i in range(0, len(self.position)):
-            P0.append(BigPreciseNum.BigPreciseNum(self.position[i]) + vectorToRotate[i])
+        P0 = BigPreciseNum.BigPreciseNum.addMany(list(zip(self.position, vectorToRotate)))
         
-        P1 = []
-        for i in range(0, len(lightCharge.position)):
-            P1.append(BigPreciseNum.BigPreciseNum(lightCharge.position[i]))
-        P2 = []
-        for i in range(0, len(self.position)):
-            P2.append(BigPreciseNum.BigPreciseNum(self.position[i]))
+        #getRotatedVector only reads the points, so the positions are shared
+        P1 = lightCharge.position
+        P2 = self.position
             
         new_vector = self.getRotatedVector(P0, P1, P2, phi)
 
 
         if(bpnMath.getMagnitude(new_vector) == bpnMath.zero):
-            old_vector = []
-            for i in range(0, len(self.velocity_direction_unit_vector)):
-                old_vector.append(BigPreciseNum.BigPreciseNum(self.velocity_direction_unit_vector[i]))
-            return old_vector
+            return self.copyVector(self.velocity_direction_unit_vector)
 
 
         return new_vector
@@ -326,33 +305,22 @@ class LightCharge:
     def getCVectorDisplacement(self, lightCharge, dt):
         phi = self.getDeltaPhi2(dt, lightCharge)
 
-        vectorToRotate = []
-        for i in range(0, len(self.c_direction_unit_vector)):
-            vectorToRotate.append(BigPreciseNum.BigPreciseNum(self.c_direction_unit_vector[i]))
+        vectorToRotate = self.c_direction_unit_vector
             
         if(phi == bpnMath.zero):
-            return vectorToRotate
+            return self.copyVector(vectorToRotate)
         
-        P0 = []
-        for i in range(0, len(self.position)):
-            P0.append(BigPreciseNum.BigPreciseNum( self.position[i]) + vectorToRotate[i])
+        P0 = BigPreciseNum.BigPreciseNum.addMany(list(zip(self.position, vectorToRotate)))
             
-        P1 = []
-        for i in range(0, len(lightCharge.position)):
-            P1.append(BigPreciseNum.BigPreciseNum(lightCharge.position[i]))
-        P2 = []
-        for i in range(0, len(self.position)):
-            P2.append(BigPreciseNum.BigPreciseNum(self.position[i]))
+        P1 = lightCharge.position
+        P2 = self.position
             
         new_vector = self.getRotatedVector(P0, P1, P2, phi)
         
 
             
         if(bpnMath.getMagnitude(new_vector) == bpnMath.zero):
-            old_vector = []
-            for i in range(0, len(self.c_direction_unit_vector)):
-                old_vector.append(BigPreciseNum.BigPreciseNum(self.c_direction_unit_vector[i]))
-            return old_vector
+            return self.copyVector(self.c_direction_unit_vector)
 
 
         return new_vector
@@ -372,32 +340,23 @@ class LightCharge:
         velocity_displacement = bpnMath.normalizeAndScale(self.velocity_direction_unit_vector, (self.velocity * dt))
         mag_force_displacement = bpnMath.normalizeAndScale(self.c_direction_unit_vector, (bpnMath.speed_of_light * dt))
         
-        new_position = []
-        for i in range(0, len(self.position)):
-            new_position.append(self.position[i] + velocity_displacement[i] + mag_force_displacement[i])
+        new_position = BigPreciseNum.BigPreciseNum.addMany(list(zip(self.position, velocity_displacement)))
+        new_position = BigPreciseNum.BigPreciseNum.addMany(list(zip(new_position, mag_force_displacement)))
        
-        net_electric_displacement = []
-        for i in range(0, len(self.position)):
-            net_electric_displacement.append(BigPreciseNum.BigPreciseNum(bpnMath.zero))
+        net_electric_displacement = [bpnMath.zero] * len(self.position)
             
-        net_mag_displacement = []
-        for i in range(0, len(self.position)):
-            net_mag_displacement.append(BigPreciseNum.BigPreciseNum(bpnMath.zero))
+        net_mag_displacement = [bpnMath.zero] * len(self.position)
 
        
         for lightCharge in lightCharges:
-            lightChargeCpy = lightCharge.getCopy(lightCharge)
-
-            if(lightChargeCpy.index != self.index):
+            if(lightCharge.index != self.index):
                 electricDisplacement = self.getVelocityVectorDisplacement(lightCharge, dt)
                     
-                for i in range(0, len(net_electric_displacement)):
-                    net_electric_displacement[i] += electricDisplacement[i]
+                net_electric_displacement = BigPreciseNum.BigPreciseNum.addMany(list(zip(net_electric_displacement, electricDisplacement)))
                 
                 magDisplacement = self.getCVectorDisplacement(lightCharge, dt)
                     
-                for i in range(0, len(net_mag_displacement)):
-                    net_mag_displacement[i] += magDisplacement[i]
+                net_mag_displacement = BigPreciseNum.BigPreciseNum.addMany(list(zip(net_mag_displacement, magDisplacement)))
                     
                 
                 
@@ -405,12 +364,12 @@ class LightCharge:
         #TODO, update velocity_magnitude
         
         
-        new_velocity_direction_unit_vector = bpnMath.normalizeAndScale(net_electric_displacement, BigPreciseNum.BigPreciseNum(bpnMath.planck_length))
+        new_velocity_direction_unit_vector = bpnMath.normalizeAndScale(net_electric_displacement, bpnMath.planck_length)
 
-        new_c_direction_vector = bpnMath.normalizeAndScale(net_mag_displacement, BigPreciseNum.BigPreciseNum(bpnMath.planck_length))
+        new_c_direction_vector = bpnMath.normalizeAndScale(net_mag_displacement, bpnMath.planck_length)
 
 
-        return LightCharge(new_position, BigPreciseNum.BigPreciseNum(self.velocity),
+        return LightCharge(new_position, self.velocity,
                       new_velocity_direction_unit_vector, self.positive_charge,
                       self.index, self.map_color_str,
                       new_c_direction_vector)
@@ -47,7 +47,7 @@ EXCEPTION_LOCATION_STR variables to match your username and location setup.
 
     1. send files to raspberry pi with git bash. make sure the username, 
         device name, and final location are corrected for your setup.
-        $>  scp BigInt.py BigPreciseNum.py BpnMath.py Calculator.py Electron.py Log.py LightChargeIdxSingleton.py LightCharge.py LightChargeSimulator.py Particle.py Photon.py PlotLightCharges.py Singleton.py silvermagnet2@raspberrypi:/home/silvermagnet2/light
+        $>  scp *.py silvermagnet2@raspberrypi:/home/silvermagnet2/light
 
     2. run the program on the raspberry pi through putty or your ssh client
         $> nohup python3 LightChargeSimulator.py &
@@ -64,6 +64,14 @@ EXCEPTION_LOCATION_STR variables to match your username and location setup.
         as PlotLightCharges.
         $> python3 PlotLightCharges.py
 
+The simulation can also be run on a computer without the fpga by using the
+software backend, which emulates the fpga's ALU bit for bit.
+        $> LIGHT_CHARGE_BACKEND=software python3 LightChargeSimulator.py
+        
+With one fpga per light charge, the light charges of a time step are updated
+at the same time, see Calculator for setting the devices.
+        $> LIGHT_CHARGE_SPI_DEVICES=0.0,0.1 python3 LightChargeSimulator.py
+
 '''
 
 import json
@@ -75,6 +83,7 @@ import traceback
 import sys
 import Log
 import LightCharge
+import Calculator
 
 
 TIME_DATA_LOCATION_STR = "/home/silvermagnet2/light/tdataOutput.json"
@@ -84,6 +93,8 @@ EXCEPTION_LOCATION_STR = "/home/silvermagnet2/light/exception.txt"
 
 
 log = Log.Log()
+
+calculator = Calculator.Calculator()
   
 bpnMath = BpnMath.BpnMath()
 
@@ -174,8 +185,10 @@ try:
         
         nextLightCharges = []
     
-        for lightCharge in lightCharges:  
-            updatedLightCharge = lightCharge.getUpdatedLightCharge(lightCharges, dt)
+        #with a calculator pool every light charge is updated on its own fpga
+        updatedLightCharges = calculator.map(lambda lightCharge: lightCharge.getUpdatedLightCharge(lightCharges, dt), lightCharges)
+    
+        for updatedLightCharge in updatedLightCharges:  
             if(addPtToGraph):
                 position = []
                 for i in range(0, len(updatedLightCharge.position)):
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+RecordingBackend wraps another backend and writes every operation and its 
+result to an alu transcript, see AluTranscript. With a CalculatorPool the 
+operations of the different threads are written in the order they finish.
+'''
+
+import threading
+import AluBackend
+import AluTranscript
+
+
+class RecordingBackend(AluBackend.AluBackend):
+    
+    backend = None
+    
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.writer = AluTranscript.TranscriptWriter(path)
+        self.lock = threading.Lock()
+        
+    def calculate(self, operationType, operand1, operand2):
+        result = self.backend.calculate(operationType, operand1, operand2)
+        with self.lock:
+            self.writer.write(operationType, operand1, operand2, result)
+        return result
+    
+    def calculateMany(self, operations):
+        results = self.backend.calculateMany(operations)
+        with self.lock:
+            for i in range(0, len(operations)):
+                operationType, operand1, operand2 = operations[i]
+                self.writer.write(operationType, operand1, operand2, results[i])
+        return results
+    
+    #BigInt's ints are written as they are, without going through hex arrays
+    def calculateInt(self, operationType, operand1, operand2):
+        result = self.backend.calculateInt(operationType, operand1, operand2)
+        with self.lock:
+            self.writer.writeInt(operationType, operand1, operand2, result)
+        return result
+    
+    def calculateManyInt(self, operations):
+        results = self.backend.calculateManyInt(operations)
+        with self.lock:
+            for i in range(0, len(operations)):
+                operationType, operand1, operand2 = operations[i]
+                self.writer.writeInt(operationType, operand1, operand2, results[i])
+        return results
+    
+    def pinConstant(self, operand):
+        return self.backend.pinConstant(operand)
+    
+    def getFrameLength(self, operationType):
+        return self.backend.getFrameLength(operationType)
+    
+    def getPool(self):
+        return self.backend.getPool()
+    
+    #closes the transcript and returns the backend that was recorded
+    def stopRecording(self):
+        with self.lock:
+            self.writer.close()
+        return self.backend
+    
+    def close(self):
+        self.writer.close()
+        if(self.backend is not None):
+            self.backend.close()
+            self.backend = None
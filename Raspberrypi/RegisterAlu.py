@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+RegisterAlu is a software model of a register file extension of the ALU in
+alu.luc. The comments in alu.luc already describe the operations as 
+R[dest] = R[op1] + R[op2], and this class defines what the frames for that 
+look like so the host side can be written and measured before the fpga 
+implements it.
+
+A frame that doesn't have REGISTER_FLAG set in its first byte is a frame of 
+the current protocol and is answered the same way as the fpga answers it. A
+register frame looks like this
+
+    byte 0:  REGISTER_FLAG | RESPOND_FLAG | INLINE2_FLAG | INLINE1_FLAG | opcode
+    byte 1:  dest register
+    byte 2:  op1 register
+    byte 3:  op2 register
+    150 bytes of op1 if INLINE1_FLAG is set, it is stored in R[op1]
+    150 bytes of op2 if INLINE2_FLAG is set, it is stored in R[op2]
+    CALC_LENGTH bytes of padding for opcodes 0 - 5 so the result is ready
+    150 bytes of R[dest] if RESPOND_FLAG is set
+
+opcodes 0 - 5 are the same as in alu.luc and write their result to R[dest].
+The two unused opcodes of the 3 bit opcode field are LOAD, which stores the
+inline op1 into R[dest], and READ, which responds with R[op1].
+'''
+
+import AluBackend
+import SoftwareBackend
+
+
+class RegisterAlu:
+
+    NUM_REGISTERS = 16
+    
+    LOAD = 6
+    READ = 7
+    
+    OPCODE_MASK = 0x07
+    INLINE1_FLAG = 0x08
+    INLINE2_FLAG = 0x10
+    RESPOND_FLAG = 0x20
+    REGISTER_FLAG = 0x40
+    
+    HEADER_LENGTH = 4
+    OPERAND_LENGTH = AluBackend.AluBackend.OPERAND_LENGTH
+    CALC_LENGTH = AluBackend.AluBackend.OPERAND_LENGTH
+    
+    #1 opcode byte, 2 operands, calculation time and the response
+    LEGACY_FRAME_LENGTH = AluBackend.AluBackend.FRAME_LENGTH
+    
+    
+    def __init__(self, numRegisters=NUM_REGISTERS):
+        self.alu = SoftwareBackend.SoftwareBackend()
+        self.registers = [0] * numRegisters
+        self.resetCounters()
+        
+    def close(self):
+        pass
+        
+    def resetCounters(self):
+        self.numFrames = 0
+        self.numBytes = 0
+    
+    '''
+    returns the frame for a register operation. operand1 and operand2 should 
+    be hex arrays when they are sent inline with the frame, otherwise None
+    '''
+    @classmethod
+    def getFrame(cls, operationType, dest, src1, src2, operand1=None, 
+                 operand2=None, respond=True):
+        header = cls.REGISTER_FLAG | operationType
+        if(operand1 is not None):
+            header |= cls.INLINE1_FLAG
+        if(operand2 is not None):
+            header |= cls.INLINE2_FLAG
+        if(respond):
+            header |= cls.RESPOND_FLAG
+            
+        frame = [header, dest, src1, src2]
+        if(operand1 is not None):
+            frame.extend(operand1)
+        if(operand2 is not None):
+            frame.extend(operand2)
+        if(operationType < cls.LOAD):
+            frame.extend([0x00] * cls.CALC_LENGTH)
+        if(respond):
+            frame.extend([0x00] * cls.OPERAND_LENGTH)
+        return frame
+    
+    def getRegisterBytes(self, index):
+        return list(self.registers[index].to_bytes(self.OPERAND_LENGTH, "big"))
+    
+    def xfer(self, frame):
+        self.numFrames += 1
+        self.numBytes += len(frame)
+        
+        header = frame[0]
+        if(not (header & self.REGISTER_FLAG)):
+            return self.xferLegacy(frame)
+        
+        operationType = header & self.OPCODE_MASK
+        dest = frame[1]
+        src1 = frame[2]
+        src2 = frame[3]
+        position = self.HEADER_LENGTH
+        
+        if(header & self.INLINE1_FLAG):
+            operand1 = frame[position: position + self.OPERAND_LENGTH]
+            self.registers[src1] = int.from_bytes(bytes(operand1), "big")
+            position += self.OPERAND_LENGTH
+        if(header & self.INLINE2_FLAG):
+            operand2 = frame[position: position + self.OPERAND_LENGTH]
+            self.registers[src2] = int.from_bytes(bytes(operand2), "big")
+            position += self.OPERAND_LENGTH
+            
+        if(operationType == self.LOAD):
+            self.registers[dest] = self.registers[src1]
+        elif(operationType == self.READ):
+            dest = src1
+        else:
+            a = self.registers[src1]
+            b = self.registers[src2]
+            self.registers[dest] = self.alu.calculateInt(operationType, a, b)
+            
+        response = [0x00] * len(frame)
+        if(header & self.RESPOND_FLAG):
+            response[len(frame) - self.OPERAND_LENGTH: len(frame)] = self.getRegisterBytes(dest)
+        return response
+    
+    def xferLegacy(self, frame):
+        operationType = frame[0] & self.OPCODE_MASK
+        operand1 = frame[1: 1 + self.OPERAND_LENGTH]
+        operand2 = frame[1 + self.OPERAND_LENGTH: 1 + (2 * self.OPERAND_LENGTH)]
+        
+        response = [0x00] * (len(frame) - self.OPERAND_LENGTH)
+        response.extend(self.alu.calculate(operationType, operand1, operand2))
+        return response
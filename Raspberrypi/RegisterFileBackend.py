@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+RegisterFileBackend is the host side of the register file protocol described
+in RegisterAlu. Instead of sending both operands with every operation, it 
+keeps track of which values are already held in a register on the device and
+only sends the operands that aren't.
+
+    - pinConstant loads a value that never changes, like 
+      BigPreciseNum.decimalNum or BpnMath.pi, into a register that is never
+      overwritten. Operations on it only send the register index.
+    - the result of every operation stays in its dest register, so chained
+      operations like a *= b followed by a /= decimalNum don't send the
+      intermediate value back to the device.
+    - the remaining registers hold the most recently used operands and are
+      reused least recently used first.
+      
+loadRegister, calculateInRegisters and readRegister give direct access to the
+registers for code that wants to keep intermediate values on the device 
+without reading them back at all.
+
+Until the fpga implements the protocol, the device is a RegisterAlu which 
+models it in software and counts the bytes that would have been sent.
+'''
+
+from collections import OrderedDict
+import AluBackend
+import RegisterAlu
+
+
+class RegisterFileBackend(AluBackend.AluBackend):
+    
+    device = None
+    
+    def __init__(self, device=None, numRegisters=RegisterAlu.RegisterAlu.NUM_REGISTERS):
+        if(device is None):
+            device = RegisterAlu.RegisterAlu(numRegisters)
+        self.device = device
+        self.numRegisters = numRegisters
+        
+        #register index -> bytes of the value held in it, least recently used
+        #first. Registers that are not in here are free
+        self.registerValues = OrderedDict()
+        self.valueRegisters = {}
+        self.pinnedRegisters = set()
+        
+        self.numOperations = 0
+        
+    def close(self):
+        if(self.device is not None):
+            self.device.close()
+            self.device = None
+        
+    def getFreeRegister(self, excluded):
+        for index in range(0, self.numRegisters):
+            if(index not in self.registerValues and index not in excluded):
+                return index
+        for index in self.registerValues:
+            if(index not in self.pinnedRegisters and index not in excluded):
+                return index
+        raise Exception("no free register on the ALU")
+        
+    def setRegisterValue(self, index, value):
+        previousValue = self.registerValues.pop(index, None)
+        if(previousValue is not None and self.valueRegisters.get(previousValue) == index):
+            del self.valueRegisters[previousValue]
+        self.registerValues[index] = value
+        if(value not in self.valueRegisters):
+            self.valueRegisters[value] = index
+        
+    def touchRegister(self, index):
+        self.registerValues.move_to_end(index)
+        
+    '''
+    loads operand into a register that won't be overwritten. returns the 
+    register index, or None if every register that is left is needed as a
+    scratch register
+    '''
+    def pinConstant(self, operand):
+        value = bytes(operand)
+        if(value in self.valueRegisters):
+            index = self.valueRegisters[value]
+        else:
+            #keep 3 registers free for the operands and result of operations
+            if(len(self.pinnedRegisters) >= self.numRegisters - 3):
+                return None
+            index = self.getFreeRegister(self.pinnedRegisters)
+            self.loadRegister(index, operand)
+        self.pinnedRegisters.add(index)
+        return index
+    
+    def loadRegister(self, index, operand):
+        frame = RegisterAlu.RegisterAlu.getFrame(RegisterAlu.RegisterAlu.LOAD, 
+                    index, index, index, operand1=operand, respond=False)
+        self.device.xfer(frame)
+        self.setRegisterValue(index, bytes(operand))
+        
+    def readRegister(self, index):
+        frame = RegisterAlu.RegisterAlu.getFrame(RegisterAlu.RegisterAlu.READ,
+                    index, index, index)
+        response = self.device.xfer(frame)
+        result = response[len(response) - self.OPERAND_LENGTH: len(response)]
+        self.setRegisterValue(index, bytes(result))
+        return result
+    
+    '''
+    R[dest] = R[src1] op R[src2] without reading the result back. The host no
+    longer knows the value in dest, so it won't be reused as an operand 
+    until it is read with readRegister.
+    '''
+    def calculateInRegisters(self, operationType, dest, src1, src2):
+        frame = RegisterAlu.RegisterAlu.getFrame(operationType, dest, src1, 
+                    src2, respond=False)
+        self.device.xfer(frame)
+        self.numOperations += 1
+        
+        previousValue = self.registerValues.pop(dest, None)
+        if(previousValue is not None and self.valueRegisters.get(previousValue) == dest):
+            del self.valueRegisters[previousValue]
+    
+    def calculate(self, operationType, operand1, operand2):
+        value1 = bytes(operand1)
+        value2 = bytes(operand2)
+        
+        inline1 = None
+        if(value1 in self.valueRegisters):
+            src1 = self.valueRegisters[value1]
+        else:
+            src1 = self.getFreeRegister(set())
+            inline1 = operand1
+        self.setRegisterValue(src1, value1)
+            
+        inline2 = None
+        if(value2 in self.valueRegisters):
+            src2 = self.valueRegisters[value2]
+        else:
+            src2 = self.getFreeRegister({src1})
+            inline2 = operand2
+        self.setRegisterValue(src2, value2)
+        
+        self.touchRegister(src1)
+        self.touchRegister(src2)
+        
+        dest = self.getFreeRegister({src1, src2})
+        
+        frame = RegisterAlu.RegisterAlu.getFrame(operationType, dest, src1, src2,
+                    operand1=inline1, operand2=inline2)
+        response = self.device.xfer(frame)
+        result = response[len(response) - self.OPERAND_LENGTH: len(response)]
+        
+        self.setRegisterValue(dest, bytes(result))
+        self.numOperations += 1
+        
+        return result
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+ReplayBackend answers operations from an alu transcript instead of 
+calculating them, so a recorded run can be repeated without the fpga and at 
+the speed of a list lookup. This makes it possible to time changes to the 
+host side code on the same operations every time.
+
+The operations are expected in the order they were recorded and an operation
+that doesn't match the transcript raises an exception with its index. When 
+strict is False, operations that don't match are looked up by their opcode 
+and operands anywhere in the transcript instead, so a change that reorders 
+or drops operations can still be replayed as long as it doesn't need new 
+ones.
+'''
+
+import AluBackend
+import AluTranscript
+
+
+class ReplayBackend(AluBackend.AluBackend):
+    
+    def __init__(self, path, strict=True):
+        self.records = AluTranscript.readTranscript(path)
+        self.strict = strict
+        self.lookup = None
+        self.index = 0
+        self.numMismatches = 0
+        
+    def getLookup(self):
+        if(self.lookup is None):
+            self.lookup = {}
+            for operationType, operand1, operand2, result in self.records:
+                self.lookup[(operationType, operand1, operand2)] = result
+        return self.lookup
+        
+    def calculate(self, operationType, operand1, operand2):
+        key = (operationType, AluTranscript.getStripped(operand1), AluTranscript.getStripped(operand2))
+        return AluTranscript.getOperand(self.getResult(key))
+    
+    #BigInt's ints are compared with the records without making hex arrays
+    def calculateInt(self, operationType, operand1, operand2):
+        key = (operationType, AluTranscript.getStrippedInt(operand1), AluTranscript.getStrippedInt(operand2))
+        return AluTranscript.getOperandInt(self.getResult(key))
+    
+    def calculateManyInt(self, operations):
+        results = []
+        for operationType, operand1, operand2 in operations:
+            results.append(self.calculateInt(operationType, operand1, operand2))
+        return results
+    
+    #the stripped result for an operation's key, see the class comment
+    def getResult(self, key):
+        if(self.index < len(self.records) and self.records[self.index][:3] == key):
+            result = self.records[self.index][3]
+            self.index += 1
+            return result
+        
+        self.numMismatches += 1
+        if(self.strict):
+            raise Exception("operation " + str(self.index) + " doesn't match the transcript")
+        
+        result = self.getLookup().get(key)
+        if(result is None):
+            raise Exception("operation " + str(self.index) + " isn't in the transcript")
+        return result
+    
+    #starts the transcript over
+    def rewind(self):
+        self.index = 0
+        self.numMismatches = 0
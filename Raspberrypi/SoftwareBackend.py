@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+SoftwareBackend emulates the 1200 bit ALU of the alchitry au+ fpga on the host
+with native python ints so the simulation can run without the fpga. The 
+results are meant to be bit exact with the fpga, including where the fpga
+truncates or wraps around:
+
+    LT, EQ   -> 1 or 0 in the lowest byte of the result
+    ADD, SUB -> the result wraps around modulo 2^1200
+    MUL      -> mulitiplication.luc keeps a 2400 bit product but only returns
+                the lower 1200 bits
+    DIV      -> division.luc is a restoring divider with a 2400 bit remainder
+                that decides whether to restore from bit 2399. Dividing by 
+                zero returns all ones, and divisors with the top bit set can
+                wrap the remainder, so those are run through the same shift
+                and subtract loop as the fpga.
+'''
+
+import AluBackend
+
+
+class SoftwareBackend(AluBackend.AluBackend):
+
+    MODULUS = 1 << AluBackend.AluBackend.NUM_BITS
+    MASK = MODULUS - 1
+    
+    REMAINDER_BITS = 2 * AluBackend.AluBackend.NUM_BITS
+    REMAINDER_MASK = (1 << REMAINDER_BITS) - 1
+    REMAINDER_SIGN_BIT = 1 << (REMAINDER_BITS - 1)
+    
+    #divisors below this value can never wrap the 2400 bit remainder
+    SAFE_DIVISOR_LIMIT = 1 << (AluBackend.AluBackend.NUM_BITS - 1)
+    
+    
+    def calculate(self, operationType, operand1, operand2):
+        a = int.from_bytes(bytes(operand1), "big")
+        b = int.from_bytes(bytes(operand2), "big")
+        
+        result = self.calculateInt(operationType, a, b)
+        
+        return list(result.to_bytes(self.OPERAND_LENGTH, "big"))
+    
+    def calculateManyInt(self, operations):
+        results = []
+        for operationType, operand1, operand2 in operations:
+            results.append(self.calculateInt(operationType, operand1, operand2))
+        return results
+    
+    '''
+    a and b must be ints in the range [0, 2^1200). returns the int that the
+    fpga would return for the operation
+    '''
+    def calculateInt(self, operationType, a, b):
+        if(operationType == self.LESS_THAN):
+            return int(a < b)
+        elif(operationType == self.EQUALS):
+            return int(a == b)
+        elif(operationType == self.ADDITION):
+            return (a + b) & self.MASK
+        elif(operationType == self.SUBTRACTION):
+            return (a - b) & self.MASK
+        elif(operationType == self.MULTIPLICATION):
+            return (a * b) & self.MASK
+        elif(operationType == self.DIVISION):
+            return self.divide(a, b)
+        
+        raise Exception("invalid operation type")
+        
+    def divide(self, dividend, divisor):
+        if(divisor == 0):
+            return self.MASK
+        if(divisor < self.SAFE_DIVISOR_LIMIT):
+            return dividend // divisor
+        return self.restoringDivide(dividend, divisor)
+    
+    '''
+    step for step copy of division.luc. Every iteration subtracts the shifted
+    divisor from the 2400 bit remainder, sets the next quotient bit if bit 2399
+    is clear and restores the remainder otherwise. numIterations can be 
+    lowered to get the quotient of a division that hasn't finished yet.
+    '''
+    def restoringDivide(self, dividend, divisor, numIterations=AluBackend.AluBackend.NUM_BITS + 1):
+        remainder = dividend
+        divisorReg = divisor << self.NUM_BITS
+        quotient = 0
+        
+        for i in range(0, numIterations):
+            remainder = (remainder - divisorReg) & self.REMAINDER_MASK
+            quotient = (quotient << 1) & self.MASK
+            
+            if(remainder & self.REMAINDER_SIGN_BIT):
+                remainder = (remainder + divisorReg) & self.REMAINDER_MASK
+            else:
+                quotient |= 1
+                
+            divisorReg >>= 1
+            
+        return quotient
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+SpiBackend sends operations over SPI to the alchitry au+ fpga using the spidev
+library. Every operation is a single transfer of 1 opcode byte, the two 
+operands, and then padding bytes that give the fpga time to calculate and 
+write back the result. How much padding an operation needs is described by 
+FrameLayout. With short frames comparisons and additions use much shorter
+frames than multiplications and divisions, but only an fpga that is built
+with the current alu.luc reads the short frame flag. An older bitstream
+ignores it and is still calculating when a short frame ends, so every
+comparison would quietly read as 0. Short frames are off by default and
+checkShortFrames sends a few known operations with both frame lengths and
+goes back to the full frames if they don't match.
+
+calculateMany sends a whole list of operations with a single ioctl, see
+SpiDevice.xferFrames.
+
+calculate writes the operands into a transfer buffer that is allocated once
+and the response is read into a second reusable buffer, so the host only does
+a couple of slice assignments per operation. calculateView returns a 
+memoryview over the result in that buffer for callers that use the result 
+before the next operation.
+
+Faster clocks than MAX_SPEED_HZ might work with better wiring, but SPI 
+transfers aren't checked. calibrate tries the supported speeds from the 
+fastest down and keeps the first one where random operations match the 
+SoftwareBackend, and slowDown steps down to the next speed, which is what the
+CheckedBackend does when a result it checks turns out to be wrong.
+
+The spi device can be passed in, which is how the FakeSpiDevice is used to
+try out the SPI code path on a computer without the fpga.
+'''
+
+import AluBackend
+import FrameLayout
+
+
+class SpiBackend(AluBackend.AluBackend):
+
+    BUS = 0
+    DEVICE = 1
+
+    #acceptable spi speeds for the raspberry pi 2 that are compatible with
+    #the code on the alchitry fpga, fastest first
+    SUPPORTED_SPEEDS_HZ = [62500000,
+                           31200000,
+                           15600000,
+                           7800000, # selected
+                           3900000,
+                           1953000,
+                           976000,
+                           488000,
+                           244000,
+                           122000,
+                           61000,
+                           30500,
+                           15200,
+                           7629]
+    MAX_SPEED_HZ = 7800000
+    
+    NUM_CALIBRATION_TRIALS = 200
+    SPI_MODE = 3
+
+    spi = None
+    
+    #the frame lengths for each operation, see FrameLayout. Short frames need
+    #the fpga to be built with the current alu.luc
+    USE_SHORT_FRAMES = False
+
+    #checkShortFrames compares LT, EQ, ADD and SUB of these operands. Every
+    #byte is different, so a result that is cut short or read from the wrong
+    #place doesn't match by accident
+    PROBE_OPERAND1 = list(range(1, AluBackend.AluBackend.OPERAND_LENGTH + 1))
+    PROBE_OPERAND2 = list(range(AluBackend.AluBackend.OPERAND_LENGTH + 1, 1, -1))
+    
+    OPERAND1_START = 1
+    OPERAND2_START = OPERAND1_START + AluBackend.AluBackend.OPERAND_LENGTH
+    OPERAND2_END = OPERAND2_START + AluBackend.AluBackend.OPERAND_LENGTH
+
+    def __init__(self, bus=BUS, device=DEVICE, spi=None, useShortFrames=USE_SHORT_FRAMES):
+
+        if(spi is None):
+            import SpiDevice
+            spi = SpiDevice.SpiDevice(bus, device)
+        self.spi = spi
+
+        self.spi.setMaxSpeedHz(self.MAX_SPEED_HZ)
+        self.spi.setMode(self.SPI_MODE)
+
+        self.setShortFrames(useShortFrames)
+
+        #comparisons only send back the lowest byte of the result
+        self.comparisonResult = bytearray(self.OPERAND_LENGTH)
+        self.comparisonView = memoryview(self.comparisonResult)
+
+    def setShortFrames(self, useShortFrames):
+        self.useShortFrames = useShortFrames
+
+        #a transfer and a response buffer per operation type. The opcode is
+        #written once and the padding after the operands is never written,
+        #so it stays zero
+        self.layouts = FrameLayout.FrameLayout.getLayouts(useShortFrames)
+        self.txBuffers = []
+        self.rxBuffers = []
+        self.resultViews = []
+        for layout in self.layouts:
+            txBuffer = bytearray(layout.frameLength)
+            txBuffer[0] = layout.opcode
+            rxBuffer = bytearray(layout.frameLength)
+            self.txBuffers.append(txBuffer)
+            self.rxBuffers.append(rxBuffer)
+            self.resultViews.append(memoryview(rxBuffer)[layout.resultStart: layout.resultStart + layout.resultLength])
+
+    '''
+    sends LT, EQ, ADD and SUB with the short frames and with the full
+    frames and only keeps the short frames if the results are the same.
+    returns whether the short frames are used
+    '''
+    def checkShortFrames(self):
+        if(not self.useShortFrames):
+            return False
+
+        operations = [(self.LESS_THAN, self.PROBE_OPERAND1, self.PROBE_OPERAND2),
+                      (self.EQUALS, self.PROBE_OPERAND1, self.PROBE_OPERAND1),
+                      (self.ADDITION, self.PROBE_OPERAND1, self.PROBE_OPERAND2),
+                      (self.SUBTRACTION, self.PROBE_OPERAND1, self.PROBE_OPERAND2)]
+        shortResults = [self.calculate(*operation) for operation in operations]
+
+        self.setShortFrames(False)
+        results = [self.calculate(*operation) for operation in operations]
+        if(shortResults == results):
+            self.setShortFrames(True)
+        return self.useShortFrames
+
+    def getSpeed(self):
+        return self.spi.getMaxSpeedHz()
+    
+    def getFrameLength(self, operationType):
+        return self.layouts[operationType].frameLength
+    
+    def setSpeed(self, speed):
+        self.spi.setMaxSpeedHz(speed)
+        
+    '''
+    sets the next slower supported speed. returns False if the speed is 
+    already the slowest one
+    '''
+    def slowDown(self):
+        speed = self.getSpeed()
+        for supportedSpeed in self.SUPPORTED_SPEEDS_HZ:
+            if(supportedSpeed < speed):
+                self.setSpeed(supportedSpeed)
+                return True
+        return False
+    
+    '''
+    runs numTrials random operations at each supported speed up to maxSpeed,
+    fastest first, and keeps the first speed where they all match the 
+    SoftwareBackend. returns the speed
+    '''
+    def calibrate(self, numTrials=NUM_CALIBRATION_TRIALS, maxSpeed=SUPPORTED_SPEEDS_HZ[0]):
+        import AluCheck
+        import SoftwareBackend
+        
+        reference = SoftwareBackend.SoftwareBackend()
+        for speed in self.SUPPORTED_SPEEDS_HZ:
+            if(speed > maxSpeed):
+                continue
+            self.setSpeed(speed)
+            operations = AluCheck.getOperations(numTrials)
+            mismatches = AluCheck.compareBackends(self, reference, operations)
+            if(len(mismatches) == 0):
+                return speed
+        raise Exception("no spi speed passed the calibration")
+
+    def close(self):
+        if(self.spi is not None):
+            self.spi.close()
+            self.spi = None
+
+    '''
+    returns a memoryview over the result, which is overwritten by the next
+    operation
+    '''
+    def calculateView(self, operationType, operand1, operand2):
+        txBuffer = self.txBuffers[operationType]
+        txBuffer[self.OPERAND1_START: self.OPERAND2_START] = operand1
+        txBuffer[self.OPERAND2_START: self.OPERAND2_END] = operand2
+        
+        self.spi.xferInto(txBuffer, self.rxBuffers[operationType])
+        
+        resultView = self.resultViews[operationType]
+        if(len(resultView) < self.OPERAND_LENGTH):
+            self.comparisonResult[self.OPERAND_LENGTH - 1] = resultView[0]
+            return self.comparisonView
+        return resultView
+
+    def calculate(self, operationType, operand1, operand2):
+        return self.calculateView(operationType, operand1, operand2).tolist()
+    
+    def calculateInt(self, operationType, operand1, operand2):
+        result = self.calculateView(operationType, operand1.to_bytes(self.OPERAND_LENGTH, "big"), 
+                                    operand2.to_bytes(self.OPERAND_LENGTH, "big"))
+        return int.from_bytes(result, "big")
+    
+    def calculateMany(self, operations):
+        maxMessageLength = self.spi.getMaxMessageLength()
+        
+        #split the frames into messages that fit in the spidev buffer
+        messages = [[]]
+        messageLength = 0
+        for operationType, operand1, operand2 in operations:
+            frame = self.layouts[operationType].getFrame(operand1, operand2)
+            if(messageLength + len(frame) > maxMessageLength and len(messages[-1]) > 0):
+                messages.append([])
+                messageLength = 0
+            messages[-1].append(frame)
+            messageLength += len(frame)
+        
+        results = []
+        i = 0
+        for frames in messages:
+            if(len(frames) == 0):
+                continue
+            responses = self.spi.xferFrames(frames)
+            for response in responses:
+                operationType = operations[i][0]
+                results.append(self.layouts[operationType].getResult(response))
+                i += 1
+                
+        return results
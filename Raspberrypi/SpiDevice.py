@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+'''
+SpiDevice wraps spidev.SpiDev and adds xferFrames, which sends several frames
+in one SPI_IOC_MESSAGE ioctl. Every frame is its own spi_ioc_transfer with
+cs_change set, so the chip select is released between the frames and the fpga
+restarts its state machine for each frame exactly like it would for separate
+xfer calls. This saves the per call overhead of the ioctl and of python
+building the message for every single operation.
+
+spidev limits the total number of bytes in one message to its bufsiz module 
+parameter, 4096 bytes unless it is raised with spidev.bufsiz=65536 in 
+/boot/cmdline.txt. getMaxMessageLength reads the current value.
+
+xferInto transfers a preallocated bytearray and writes the response into
+another preallocated bytearray. spidev's xfer and xfer3 always build a new
+list or tuple for the response, so this path calls the ioctl directly with a 
+spi_ioc_transfer that is built once for each pair of buffers and reused.
+'''
+
+import ctypes
+import fcntl
+import spidev
+
+
+class SpiIocTransfer(ctypes.Structure):
+    _fields_ = [("tx_buf", ctypes.c_uint64),
+                ("rx_buf", ctypes.c_uint64),
+                ("len", ctypes.c_uint32),
+                ("speed_hz", ctypes.c_uint32),
+                ("delay_usecs", ctypes.c_uint16),
+                ("bits_per_word", ctypes.c_uint8),
+                ("cs_change", ctypes.c_uint8),
+                ("tx_nbits", ctypes.c_uint8),
+                ("rx_nbits", ctypes.c_uint8),
+                ("word_delay_usecs", ctypes.c_uint8),
+                ("pad", ctypes.c_uint8)]
+
+
+class SpiDevice:
+    
+    SPI_IOC_MAGIC = ord('k')
+    IOC_WRITE = 1
+    IOC_NRSHIFT = 0
+    IOC_TYPESHIFT = 8
+    IOC_SIZESHIFT = 16
+    IOC_DIRSHIFT = 30
+    
+    BITS_PER_WORD = 8
+    
+    BUFSIZ_LOCATION_STR = "/sys/module/spidev/parameters/bufsiz"
+    DEFAULT_BUFSIZ = 4096
+    
+    spi = None
+    
+    def __init__(self, bus, device):
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+        
+        self.bufferTransfers = {}
+        
+    def getMaxSpeedHz(self):
+        return self.spi.max_speed_hz
+    
+    def setMaxSpeedHz(self, speed):
+        self.spi.max_speed_hz = speed
+        
+    def setMode(self, mode):
+        self.spi.mode = mode
+        
+    def close(self):
+        self.spi.close()
+        
+    def xfer(self, values):
+        return self.spi.xfer(values)
+    
+    def getMaxMessageLength(self):
+        try:
+            with open(self.BUFSIZ_LOCATION_STR) as bufsizFile:
+                return int(bufsizFile.read())
+        except (OSError, ValueError):
+            return self.DEFAULT_BUFSIZ
+    
+    #_IOW(SPI_IOC_MAGIC, 0, char[SPI_MSGSIZE(N)]) from linux/spi/spidev.h
+    def getMessageRequest(self, numTransfers):
+        size = ctypes.sizeof(SpiIocTransfer) * numTransfers
+        return ((self.IOC_WRITE << self.IOC_DIRSHIFT) |
+                (size << self.IOC_SIZESHIFT) |
+                (self.SPI_IOC_MAGIC << self.IOC_TYPESHIFT) |
+                (0 << self.IOC_NRSHIFT))
+    
+    '''
+    frames is a list of byte lists. returns the list of responses in the same
+    order as the frames
+    '''
+    def xferFrames(self, frames):
+        numFrames = len(frames)
+        transfers = (SpiIocTransfer * numFrames)()
+        
+        #the buffers have to stay referenced until the ioctl returns
+        txBuffers = []
+        rxBuffers = []
+        for i in range(0, numFrames):
+            frameLength = len(frames[i])
+            txBuffer = (ctypes.c_ubyte * frameLength).from_buffer_copy(bytes(frames[i]))
+            rxBuffer = (ctypes.c_ubyte * frameLength)()
+            txBuffers.append(txBuffer)
+            rxBuffers.append(rxBuffer)
+            
+            transfers[i].tx_buf = ctypes.addressof(txBuffer)
+            transfers[i].rx_buf = ctypes.addressof(rxBuffer)
+            transfers[i].len = frameLength
+            transfers[i].speed_hz = self.spi.max_speed_hz
+            transfers[i].bits_per_word = self.BITS_PER_WORD
+            
+            #release chip select after every frame except the last one, 
+            #the last one is released when the message ends
+            if(i < numFrames - 1):
+                transfers[i].cs_change = 1
+                
+        fcntl.ioctl(self.spi.fileno(), self.getMessageRequest(numFrames), transfers)
+        
+        responses = []
+        for rxBuffer in rxBuffers:
+            responses.append(list(rxBuffer))
+        return responses
+
+    
+    def getBufferAddress(self, buffer):
+        return ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+    
+    '''
+    txBuffer and rxBuffer must be bytearrays of the same length. The response
+    is written into rxBuffer. A speed_hz of 0 tells spidev to use the current
+    max_speed_hz, so the transfer stays valid if the speed is changed.
+    '''
+    def xferInto(self, txBuffer, rxBuffer):
+        key = (id(txBuffer), id(rxBuffer))
+        if(key not in self.bufferTransfers):
+            transfer = SpiIocTransfer()
+            transfer.tx_buf = self.getBufferAddress(txBuffer)
+            transfer.rx_buf = self.getBufferAddress(rxBuffer)
+            transfer.len = len(txBuffer)
+            transfer.speed_hz = 0
+            transfer.bits_per_word = self.BITS_PER_WORD
+            
+            #the buffers are kept so their ids can't be reused
+            self.bufferTransfers[key] = (transfer, txBuffer, rxBuffer, 
+                                         self.getMessageRequest(1))
+            
+        transfer, txBuffer, rxBuffer, request = self.bufferTransfers[key]
+        fcntl.ioctl(self.spi.fileno(), request, transfer)
+        return rxBuffer
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+
+
+
+'''
+TrigTable is a file of sin and cos to the last decimal place at the knots 
+k / 2^stepBits between 0 and pi/4, like the look up tables most computers 
+keep for floats but without giving up any digits. BpnMath uses it when the 
+file is there. sin and cos of a reduced argument start from the nearest knot,
+sin(a + d) = sin(a) cos(d) + cos(a) sin(d), and since |d| <= 2^-(stepBits+1)
+the series of d need a lot fewer terms. arctan2 rotates by a knot angle 
+instead of the float angle, so it doesn't need sin and cos at all, and that
+makes the table an arcsin and arccos table too.
+
+The file starts with the header "LCTT", a version byte and the length of a 
+json key with BigPreciseNum's precision settings and scale, so a table made
+with other settings isn't used. Then every knot is two numbers, sin and cos,
+as the NUM_BITS / 8 bytes of their internal number. The file is memory 
+mapped, so only the knots a run uses are read, and several simulations 
+running at the same time share one copy.
+
+The table is calculated with the SoftwareBackend in a process per core. It 
+defaults to LightChargeTrigTable.bin next to this file and can be moved with
+LIGHT_CHARGE_TRIG_TABLE, setting it to an empty string turns it off.
+    $> python3 TrigTable.py generate
+    $> python3 TrigTable.py generate 14 4
+    $> python3 TrigTable.py info
+'''
+
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+import BigInt
+import BigPreciseNum
+
+
+class TrigTable:
+    
+    TABLE_ENV_STR = "LIGHT_CHARGE_TRIG_TABLE"
+    DEFAULT_FILE_NAME = "LightChargeTrigTable.bin"
+    HEADER = b"LCTT"
+    VERSION = 1
+    KEY_LENGTH_BYTES = 4
+    
+    #4096 knots per radian, 3218 knots and 1MB with 1200 bit numbers
+    DEFAULT_STEP_BITS = 12
+    
+    #BpnMath's arctan series has coefficients for what is left of an angle
+    #after rotating by a knot with at least this many step bits
+    MIN_STEP_BITS = 2
+    
+    
+    def __init__(self, path=None):
+        if(path is None):
+            path = getDefaultPath()
+        self.path = path
+        self.map = None
+        self.stepBits = 0
+        self.numKnots = 0
+        self.dataStart = 0
+        self.numBytes = BigInt.BigInt.NUM_BITS // 8
+        self.load()
+        
+    def isLoaded(self):
+        return self.map is not None
+    
+    #maps the file if it was made with the same settings, otherwise the 
+    #table stays unloaded and BpnMath uses the series
+    def load(self):
+        if(len(self.path) == 0 or not os.path.exists(self.path)):
+            return
+        try:
+            with open(self.path, "rb") as tableFile:
+                tableMap = mmap.mmap(tableFile.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        
+        keyStart = len(self.HEADER) + 1 + self.KEY_LENGTH_BYTES
+        if(tableMap[0:len(self.HEADER) + 1] != self.HEADER + bytes([self.VERSION])):
+            tableMap.close()
+            return
+        keyLength = int.from_bytes(tableMap[len(self.HEADER) + 1:keyStart], "big")
+        try:
+            key = json.loads(tableMap[keyStart:keyStart + keyLength].decode())
+        except ValueError:
+            tableMap.close()
+            return
+        
+        stepBits = key.pop("stepBits", None)
+        numKnots = key.pop("numKnots", None)
+        dataStart = keyStart + keyLength
+        if(key != getKey() or stepBits < self.MIN_STEP_BITS or 
+           len(tableMap) != dataStart + 2 * self.numBytes * numKnots):
+            tableMap.close()
+            return
+        
+        self.map = tableMap
+        self.stepBits = stepBits
+        self.numKnots = numKnots
+        self.dataStart = dataStart
+        
+    def close(self):
+        if(self.map is not None):
+            self.map.close()
+            self.map = None
+    
+    def getNumber(self, offset):
+        value = int.from_bytes(self.map[offset:offset + self.numBytes], "big")
+        return BigPreciseNum.BigPreciseNum.fromInternal(BigInt.BigInt.fromValue(value))
+    
+    #the knot closest to a float, which may be negative
+    def getNearestKnot(self, xFloat):
+        return round(xFloat * (1 << self.stepBits))
+    
+    def getKnotAngle(self, knot):
+        return BigPreciseNum.BigPreciseNum.fromRatio(knot, 1 << self.stepBits)
+    
+    #sin and cos of knot / 2^stepBits, negative knots use sin(-a) = -sin(a)
+    def getSinCos(self, knot):
+        if(abs(knot) >= self.numKnots):
+            raise Exception("knot " + str(knot) + " is outside of the trig table")
+        offset = self.dataStart + 2 * self.numBytes * abs(knot)
+        sinKnot = self.getNumber(offset)
+        cosKnot = self.getNumber(offset + self.numBytes)
+        if(knot < 0):
+            sinKnot = -sinKnot
+        return sinKnot, cosKnot
+    
+    
+def getDefaultPath():
+    defaultPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), TrigTable.DEFAULT_FILE_NAME)
+    return os.environ.get(TrigTable.TABLE_ENV_STR, defaultPath)
+
+#the settings a table is only valid for
+def getKey():
+    if(BigPreciseNum.BigPreciseNum.decimalNum is None):
+        BigPreciseNum.BigPreciseNum.initConstants()
+    return {"scale": BigPreciseNum.BigPreciseNum.scaleStr,
+            "numBits": BigInt.BigInt.NUM_BITS,
+            "numDigits": BigPreciseNum.BigPreciseNum.NUM_DIGITS,
+            "decimalPtLocation": BigPreciseNum.BigPreciseNum.DECIMAL_POINT_LOCATION}
+
+#the knots up to pi/4, plus one since a reduced argument can round past it
+def getNumKnots(stepBits):
+    return int(math.pi / 4 * (1 << stepBits)) + 2
+
+#every worker calculates with its own SoftwareBackend
+def initWorker():
+    import Calculator
+    import SoftwareBackend
+    backend = SoftwareBackend.SoftwareBackend()
+    Calculator.Calculator(backend).setBackend(backend)
+
+#the knots are at most just past pi/4, so the series is used directly 
+#without reducing the argument or an old table
+def calculateKnots(stepBits, start, stop):
+    import BpnMath
+    bpnMath = BpnMath.BpnMath()
+    numBytes = BigInt.BigInt.NUM_BITS // 8
+    
+    knots = bytearray()
+    for knot in range(start, stop):
+        angle = BigPreciseNum.BigPreciseNum.fromRatio(knot, 1 << stepBits)
+        for number in [bpnMath.getSeries(angle, 1), bpnMath.getSeries(angle, 0)]:
+            knots += number.internalNumber.getValue().to_bytes(numBytes, "big")
+    return bytes(knots)
+
+'''
+calculates the table in numProcesses processes, a block of knots at a time,
+and writes it to a temporary file first so a stopped run doesn't leave half
+a table behind
+'''
+def generate(path, stepBits=TrigTable.DEFAULT_STEP_BITS, numProcesses=None, blockSize=64):
+    if(stepBits < TrigTable.MIN_STEP_BITS):
+        raise Exception("a trig table needs at least " + str(TrigTable.MIN_STEP_BITS) + " step bits")
+    if(numProcesses is None):
+        numProcesses = os.cpu_count() or 1
+    numKnots = getNumKnots(stepBits)
+    key = dict(getKey(), stepBits=stepBits, numKnots=numKnots)
+    keyBytes = json.dumps(key).encode()
+    
+    blocks = [(stepBits, start, min(start + blockSize, numKnots)) for start in range(0, numKnots, blockSize)]
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "wb") as tableFile:
+        tableFile.write(TrigTable.HEADER + bytes([TrigTable.VERSION]))
+        tableFile.write(len(keyBytes).to_bytes(TrigTable.KEY_LENGTH_BYTES, "big"))
+        tableFile.write(keyBytes)
+        with multiprocessing.Pool(numProcesses, initializer=initWorker) as pool:
+            for knots in pool.starmap(calculateKnots, blocks):
+                tableFile.write(knots)
+    os.replace(temporaryPath, path)
+    return numKnots
+
+
+if __name__ == "__main__":
+    #neither generating nor reading a table needs the fpga
+    initWorker()
+    path = getDefaultPath()
+    if(len(sys.argv) >= 2 and sys.argv[1] == "generate" and len(path) > 0):
+        stepBits = TrigTable.DEFAULT_STEP_BITS
+        numProcesses = None
+        if(len(sys.argv) > 2):
+            stepBits = int(sys.argv[2])
+        if(len(sys.argv) > 3):
+            numProcesses = int(sys.argv[3])
+        
+        startTime = time.time()
+        numKnots = generate(path, stepBits, numProcesses)
+        print(str(numKnots) + " knots written to " + path + " in " + f'{time.time() - startTime:.1f}' + "s")
+    elif(len(sys.argv) == 2 and sys.argv[1] == "info"):
+        table = TrigTable(path)
+        if(table.isLoaded()):
+            print(path + ": " + str(table.numKnots) + " knots, " + str(1 << table.stepBits) + " per radian")
+        else:
+            print(path + ": no table for the current settings")
+    else:
+        print("usage: python3 TrigTable.py generate [stepBits] [numProcesses]")
+        print("       python3 TrigTable.py info")
+        print("the table is at " + TrigTable.TABLE_ENV_STR + ", or " + TrigTable.DEFAULT_FILE_NAME + " by default")
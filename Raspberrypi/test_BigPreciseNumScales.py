@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+'''
+Checks that the binary scale of BigPreciseNum is as precise as the decimal
+scale. CalculatorBenchmark.getScaleResults runs sqrt, sin, cos, arcsin, the
+derived constants and one LightCharge.getUpdatedLightCharge step in a new
+python process for each scale, and the results are compared to references
+from python's decimal module and to each other.
+
+    $> python3 -m pytest test_BigPreciseNumScales.py
+'''
+
+import pytest
+import CalculatorBenchmark
+
+
+#BigPreciseNum has 160 decimal places. Multiplications and divisions round 
+#towards zero and the series add up a couple of those roundings, so the last 
+#two places may be off
+FUNCTION_DIGITS = 158
+FUNCTIONS = ["sqrt(2)", "sin(1)", "cos(1)", "arcsin(0.5)"]
+
+#the derived constants lose digits to their intermediate products in both
+#scales, so the binary scale only has to get as many right as the decimal 
+#scale, less the one digit a different rounding of the last place can cost
+CONSTANTS = ["coulumb_constant", "electron_period", "charge"]
+
+#a step is badly conditioned. Moving one coordinate of a position by a 
+#single unit in the last place moves step[4] and step[6] at the 72nd digit 
+#in either scale, and the binary scale rounds the decimal literals of the
+#positions by up to that much. So the steps can only agree to about 72 
+#digits, with two to spare
+STEP_DIGITS = 70
+NUM_STEP_VALUES = 12
+
+
+@pytest.fixture(scope="module")
+def results():
+    return CalculatorBenchmark.getScaleResults()
+
+@pytest.mark.parametrize("name", FUNCTIONS)
+def testFunctions(results, name):
+    decimalDigits, binaryDigits = CalculatorBenchmark.getScaleDigits(results)[name]
+    assert decimalDigits >= FUNCTION_DIGITS
+    assert binaryDigits >= FUNCTION_DIGITS
+
+@pytest.mark.parametrize("name", CONSTANTS)
+def testConstants(results, name):
+    decimalDigits, binaryDigits = CalculatorBenchmark.getScaleDigits(results)[name]
+    assert binaryDigits + CalculatorBenchmark.SCALE_DIGIT_TOLERANCE >= decimalDigits
+
+def testStep(results):
+    stepDigits = CalculatorBenchmark.getStepDigits(results)
+    assert len(stepDigits) == NUM_STEP_VALUES
+    for name, digits in stepDigits.items():
+        assert digits >= STEP_DIGITS, name
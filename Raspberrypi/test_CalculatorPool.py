@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+
+'''
+Checks that Calculator.map spreads the items over the devices of a 
+CalculatorPool when the pool is wrapped by the cache, the recording or the 
+hybrid backend, the way LIGHT_CHARGE_CACHE_SIZE, LIGHT_CHARGE_RECORD and 
+LIGHT_CHARGE_HYBRID set the calculator up.
+
+    $> python3 -m pytest test_CalculatorPool.py
+'''
+
+import pytest
+import AluBackend
+import CachedBackend
+import Calculator
+import CalculatorPool
+import FakeSpiDevice
+import HybridBackend
+import RecordingBackend
+import SoftwareBackend
+import SpiBackend
+
+
+NUM_DEVICES = 2
+NUM_ITEMS = 8
+
+WRAPPERS = {"none": lambda backend, path: backend,
+            "cache": lambda backend, path: CachedBackend.CachedBackend(backend),
+            "recording": lambda backend, path: RecordingBackend.RecordingBackend(backend, path),
+            "hybrid": lambda backend, path: HybridBackend.HybridBackend(backend),
+            "all": lambda backend, path: CachedBackend.CachedBackend(RecordingBackend.RecordingBackend(HybridBackend.HybridBackend(backend), path))}
+
+
+#the calculator is a singleton, so the backend is set for the test and put
+#back afterwards. The software backend is only used if this is the first 
+#time the calculator is made
+@pytest.fixture
+def calculator():
+    calculator = Calculator.Calculator(SoftwareBackend.SoftwareBackend())
+    previousBackend = calculator.backend
+    yield calculator
+    calculator.setBackend(previousBackend)
+
+@pytest.mark.parametrize("wrapperName", list(WRAPPERS.keys()))
+def testMapFindsWrappedPool(calculator, wrapperName, tmp_path):
+    devices = [FakeSpiDevice.FakeSpiDevice(0, simulateClock=False) for i in range(0, NUM_DEVICES)]
+    pool = CalculatorPool.CalculatorPool([SpiBackend.SpiBackend(spi=device) for device in devices])
+    backend = WRAPPERS[wrapperName](pool, str(tmp_path / "map.alut"))
+    calculator.setBackend(backend)
+    
+    assert backend.getPool() is pool
+    
+    def calculateItem(item):
+        result = calculator.calculateInt(AluBackend.AluBackend.MULTIPLICATION, item, item)
+        return result, pool.affinity.deviceIndex
+    
+    results = calculator.map(calculateItem, list(range(0, NUM_ITEMS)))
+    backend.close()
+    
+    assert [result for result, deviceIndex in results] == [i * i for i in range(0, NUM_ITEMS)]
+    assert [deviceIndex for result, deviceIndex in results] == [i % NUM_DEVICES for i in range(0, NUM_ITEMS)]
+    for device in devices:
+        assert device.numFrames == NUM_ITEMS // NUM_DEVICES
+        
+def testMapWithoutPool(calculator):
+    calculator.setBackend(CachedBackend.CachedBackend(SoftwareBackend.SoftwareBackend()))
+    
+    assert calculator.backend.getPool() is None
+    assert calculator.map(lambda item: item + 1, [1, 2, 3]) == [2, 3, 4]
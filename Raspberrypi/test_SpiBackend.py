@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+'''
+The MIT License (MIT)
+
+Copyright (c) 2024 Julie Marty
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+
+
+'''
+Checks SpiBackend.calculateMany against the SoftwareBackend on a 
+FakeSpiDevice, with the current and with the short frames. The results have
+to come back in the order of the operations, for all six operation types, 
+whether the operations fit in one spidev message or have to be split into 
+several.
+
+    $> python3 -m pytest test_SpiBackend.py
+'''
+
+import pytest
+import AluBackend
+import AluCheck
+import FakeSpiDevice
+import SoftwareBackend
+import SpiBackend
+
+
+NUM_OPERATIONS = 200
+SEED = 0
+
+#big enough for every frame of NUM_OPERATIONS operations plus the edge cases
+LARGE_MESSAGE_LENGTH = 1 << 20
+
+
+def getBackend(useShortFrames, maxMessageLength=FakeSpiDevice.FakeSpiDevice.DEFAULT_MAX_MESSAGE_LENGTH):
+    device = FakeSpiDevice.FakeSpiDevice(0, simulateClock=False, maxMessageLength=maxMessageLength)
+    return SpiBackend.SpiBackend(spi=device, useShortFrames=useShortFrames), device
+
+def getExpected(operations):
+    reference = SoftwareBackend.SoftwareBackend()
+    return [reference.calculate(operationType, operand1, operand2) for operationType, operand1, operand2 in operations]
+
+def testOperationsCoverEveryType():
+    operationTypes = set(operation[0] for operation in AluCheck.getOperations(NUM_OPERATIONS, SEED))
+    assert operationTypes == set(AluCheck.OPERATION_TYPES)
+    assert len(operationTypes) == AluBackend.AluBackend.DIVISION + 1
+
+@pytest.mark.parametrize("useShortFrames", [False, True])
+def testCalculateManyInOneMessage(useShortFrames):
+    operations = AluCheck.getOperations(NUM_OPERATIONS, SEED)
+    backend, device = getBackend(useShortFrames, LARGE_MESSAGE_LENGTH)
+    
+    results = backend.calculateMany(operations)
+    
+    assert device.numCalls == 1
+    assert device.numFrames == len(operations)
+    assert [list(result) for result in results] == getExpected(operations)
+
+#the default bufsiz of 4096 bytes holds 6 full length frames, so the 
+#operations are split over many messages
+@pytest.mark.parametrize("useShortFrames", [False, True])
+def testCalculateManySplitsMessages(useShortFrames):
+    operations = AluCheck.getOperations(NUM_OPERATIONS, SEED)
+    backend, device = getBackend(useShortFrames)
+    
+    results = backend.calculateMany(operations)
+    
+    assert device.numCalls > 1
+    assert device.numCalls < len(operations)
+    assert device.numFrames == len(operations)
+    assert [list(result) for result in results] == getExpected(operations)
+    
+#a frame that alone is longer than the message limit still gets sent on its
+#own rather than being dropped
+def testCalculateManyOneFramePerMessage():
+    operations = AluCheck.getOperations(NUM_OPERATIONS, SEED)
+    backend, device = getBackend(False, AluBackend.AluBackend.FRAME_LENGTH)
+    
+    results = backend.calculateMany(operations)
+    
+    assert device.numCalls == len(operations)
+    assert [list(result) for result in results] == getExpected(operations)
+    
+def testCalculateManyEmpty():
+    backend, device = getBackend(False)
+    assert backend.calculateMany([]) == []
+    assert device.numCalls == 0
+
+@pytest.mark.parametrize("useShortFrames", [False, True])
+def testCalculateInt(useShortFrames):
+    operations = AluCheck.getOperations(NUM_OPERATIONS, SEED)
+    backend, device = getBackend(useShortFrames)
+    reference = SoftwareBackend.SoftwareBackend()
+    
+    for operationType, operand1, operand2 in operations:
+        a = int.from_bytes(bytes(operand1), "big")
+        b = int.from_bytes(bytes(operand2), "big")
+        assert backend.calculateInt(operationType, a, b) == reference.calculateInt(operationType, a, b)
+    assert device.numFrames == len(operations)
+    
+@pytest.mark.parametrize("useShortFrames", [False, True])
+def testCalculateManyInt(useShortFrames):
+    operations = AluCheck.getOperations(NUM_OPERATIONS, SEED)
+    backend, device = getBackend(useShortFrames)
+    reference = SoftwareBackend.SoftwareBackend()
+    
+    intOperations = []
+    for operationType, operand1, operand2 in operations:
+        intOperations.append((operationType, int.from_bytes(bytes(operand1), "big"), int.from_bytes(bytes(operand2), "big")))
+        
+    assert backend.calculateManyInt(intOperations) == reference.calculateManyInt(intOperations)
+    assert device.numCalls < len(operations)
+    
+#short frames are only kept by an fpga that reads the short frame flag, an 
+#older bitstream goes back to the full frames and still gets every result right
+@pytest.mark.parametrize("readsShortFrameFlag", [False, True])
+def testCheckShortFrames(readsShortFrameFlag):
+    import AluEmulator
+    emulator = AluEmulator.AluEmulator(readsShortFrameFlag=readsShortFrameFlag)
+    backend = SpiBackend.SpiBackend(spi=emulator, useShortFrames=True)
+    
+    assert backend.checkShortFrames() == readsShortFrameFlag
+    
+    operations = AluCheck.getOperations(0)
+    results = [backend.calculate(operationType, operand1, operand2) for operationType, operand1, operand2 in operations]
+    assert results == getExpected(operations)
+    
+def testShortFramesAreOffByDefault():
+    backend = SpiBackend.SpiBackend(spi=FakeSpiDevice.FakeSpiDevice(0, simulateClock=False))
+    assert not backend.checkShortFrames()
+    assert backend.getFrameLength(AluBackend.AluBackend.LESS_THAN) == AluBackend.AluBackend.FRAME_LENGTH